@@ -11,12 +11,19 @@ import * as nanoleafService from './services/nanoleaf.js';
 import * as switchbotService from './services/switchbot.js';
 import { connectDatabase } from './services/database.js';
 import { setDeviceHidden } from './services/deviceSync.js';
+import { applyBulkUpdates, parseBulkUpdates } from './services/bulkUpdate.js';
 import { migrateConfig } from './utils/migrateConfig.js';
 import { PollingManager } from './services/polling/index.js';
 import { setupWebSocket, type WebSocketBroadcaster } from './services/websocket/index.js';
+import type { DeviceState } from './types/index.js';
 
 const app = express();
 const server = createServer(app);
+// Keep idle connections well past Node's 5s default: the voice assistant
+// reuses its pooled connections (expiry 60s) between spoken commands.
+// headersTimeout must exceed keepAliveTimeout.
+server.keepAliveTimeout = 65_000;
+server.headersTimeout = 66_000;
 const PORT = process.env.PORT || 3001;
 
 
@@ -45,29 +52,47 @@ app.get('/api/devices', async (req, res) => {
   }
 });
 
-// Update any device by ID
-app.put('/api/devices/:id', async (req, res) => {
-  try {
-    const { id } = req.params;
+// Send a state update to any device by ID
+async function updateDeviceState(id: string, state: Partial<DeviceState>): Promise<void> {
+  if (id.startsWith('hue-')) {
+    await hueService.setLightState(id, state);
+  } else if (id.startsWith('switchbot-')) {
+    await switchbotService.setDeviceState(id, state);
+    // Blind Tilt status API is unreliable — use optimistic state
+    if (state.brightness !== undefined) {
+      pollingManager.setOptimisticState(id, {
+        brightness: state.brightness,
+        on: state.brightness === 0,
+      });
+    }
+  } else {
+    await nanoleafService.setDeviceState(id, state);
+  }
+
+  // Trigger immediate refresh to update cached state
+  pollingManager.triggerImmediateRefresh(id);
+}
 
-    if (id.startsWith('hue-')) {
-      await hueService.setLightState(id, req.body);
-    } else if (id.startsWith('switchbot-')) {
-      await switchbotService.setDeviceState(id, req.body);
-      // Blind Tilt status API is unreliable — use optimistic state
-      if (req.body.brightness !== undefined) {
-        pollingManager.setOptimisticState(id, {
-          brightness: req.body.brightness,
-          on: req.body.brightness === 0,
-        });
-      }
-    } else {
-      await nanoleafService.setDeviceState(id, req.body);
+// Update several devices in one request (room/group commands). Registered
+// before /api/devices/:id so "bulk" isn't taken as a device ID
+app.put('/api/devices/bulk', async (req, res) => {
+  try {
+    const updates = parseBulkUpdates(req.body);
+    if (!updates) {
+      return res.status(400).json({ error: 'Expected an array of { id, state } updates' });
     }
 
-    // Trigger immediate refresh to update cached state
-    pollingManager.triggerImmediateRefresh(id);
+    const results = await applyBulkUpdates(updates, updateDeviceState);
+    res.json({ results });
+  } catch (error) {
+    res.status(500).json({ error: (error as Error).message });
+  }
+});
 
+// Update any device by ID
+app.put('/api/devices/:id', async (req, res) => {
+  try {
+    await updateDeviceState(req.params.id, req.body);
     res.json({ success: true });
   } catch (error) {
     res.status(500).json({ error: (error as Error).message });
@@ -0,0 +1,69 @@
+/**
+ * Tests for bulk device updates
+ */
+
+import { describe, it, expect, vi } from 'vitest';
+import { applyBulkUpdates, parseBulkUpdates } from './bulkUpdate.js';
+
+describe('Bulk Update Service', () => {
+  describe('parseBulkUpdates', () => {
+    it('should accept an array of { id, state } updates', () => {
+      const body = [{ id: 'hue-1', state: { on: true } }];
+      expect(parseBulkUpdates(body)).toEqual(body);
+    });
+
+    it('should reject malformed bodies', () => {
+      expect(parseBulkUpdates({ id: 'hue-1', state: { on: true } })).toBeNull();
+      expect(parseBulkUpdates([null])).toBeNull();
+      expect(parseBulkUpdates(['hue-1'])).toBeNull();
+      expect(parseBulkUpdates([{ id: 'hue-1' }])).toBeNull();
+      expect(parseBulkUpdates([{ state: { on: true } }])).toBeNull();
+      expect(parseBulkUpdates([{ id: 'hue-1', state: null }])).toBeNull();
+    });
+  });
+
+  describe('applyBulkUpdates', () => {
+    it('should report each failure without stopping the rest', async () => {
+      const update = vi.fn(async (id: string) => {
+        if (id === 'hue-2') throw new Error('unreachable');
+      });
+
+      const results = await applyBulkUpdates(
+        [
+          { id: 'hue-1', state: { on: true } },
+          { id: 'hue-2', state: { on: true } },
+          { id: 'hue-3', state: { on: true } },
+        ],
+        update
+      );
+
+      expect(update).toHaveBeenCalledTimes(3);
+      expect(results).toEqual([
+        { id: 'hue-1', success: true },
+        { id: 'hue-2', success: false, error: 'unreachable' },
+        { id: 'hue-3', success: true },
+      ]);
+    });
+
+    it('should limit how many updates run at once', async () => {
+      let inFlight = 0;
+      let peak = 0;
+      const update = async () => {
+        inFlight++;
+        peak = Math.max(peak, inFlight);
+        await new Promise((resolve) => setTimeout(resolve, 5));
+        inFlight--;
+      };
+
+      const updates = Array.from({ length: 10 }, (_, i) => ({ id: `hue-${i}`, state: { on: true } }));
+      const results = await applyBulkUpdates(updates, update, 3);
+
+      expect(peak).toBe(3);
+      expect(results.map((r) => r.id)).toEqual(updates.map((u) => u.id));
+    });
+
+    it('should handle an empty request', async () => {
+      expect(await applyBulkUpdates([], vi.fn())).toEqual([]);
+    });
+  });
+});
@@ -0,0 +1,68 @@
+import type { DeviceState } from '../types/index.js';
+
+export interface BulkUpdate {
+  id: string;
+  state: Partial<DeviceState>;
+}
+
+export interface BulkUpdateResult {
+  id: string;
+  success: boolean;
+  error?: string;
+}
+
+// Device updates in flight at once for one bulk request; matches the voice
+// assistant's default BELLE_MAX_CONCURRENT_DEVICE_PUTS
+export const MAX_CONCURRENT_BULK_UPDATES = 8;
+
+/**
+ * Validate a bulk update request body.
+ * Returns the updates, or null if the body isn't an array of { id, state } objects.
+ */
+export function parseBulkUpdates(body: unknown): BulkUpdate[] | null {
+  if (!Array.isArray(body)) {
+    return null;
+  }
+
+  const valid = body.every(
+    (update) =>
+      typeof update === 'object' &&
+      update !== null &&
+      typeof update.id === 'string' &&
+      typeof update.state === 'object' &&
+      update.state !== null &&
+      !Array.isArray(update.state)
+  );
+
+  return valid ? (body as BulkUpdate[]) : null;
+}
+
+/**
+ * Apply updates with at most `limit` in flight at once.
+ * Each update gets its own result, in request order; one failure doesn't stop the rest.
+ */
+export async function applyBulkUpdates(
+  updates: BulkUpdate[],
+  update: (id: string, state: Partial<DeviceState>) => Promise<void>,
+  limit: number = MAX_CONCURRENT_BULK_UPDATES
+): Promise<BulkUpdateResult[]> {
+  const results: BulkUpdateResult[] = new Array(updates.length);
+  let next = 0;
+
+  async function worker() {
+    while (next < updates.length) {
+      const index = next++;
+      const { id, state } = updates[index];
+      try {
+        await update(id, state);
+        results[index] = { id, success: true };
+      } catch (error) {
+        results[index] = { id, success: false, error: (error as Error).message };
+      }
+    }
+  }
+
+  const workers = Math.min(Math.max(1, limit), updates.length);
+  await Promise.all(Array.from({ length: workers }, worker));
+  return results;
+}
@@ -10,6 +10,8 @@ class Settings(BaseSettings):
     host: str = "0.0.0.0"
     port: int = 3002
     debug: bool = False
+    worker_threads: int = 4  # Thread pool for asyncio.to_thread (inference, audio decode)
+    max_audio_b64_len: int = 10_000_000  # Max base64 audio payload (~7.5 MB decoded)
 
     # Logging settings
     log_level: str = "INFO"
@@ -17,6 +19,9 @@ class Settings(BaseSettings):
 
     # Smart Home API
     smart_home_api_url: str = "http://localhost:3001/api"
+    device_cache_file: str = "~/.cache/belle/devices.json"  # Survives restarts ("" = disabled)
+    max_concurrent_device_puts: int = 8  # Per-device PUTs in flight for a room/group command
+    bulk_device_updates: bool = True  # Room/group commands use one PUT /devices/bulk
 
     # Whisper STT settings
     whisper_model: str = "mlx-community/whisper-large-v3-mlx"
@@ -28,6 +33,8 @@ class Settings(BaseSettings):
     whisper_compression_ratio_threshold: float = 2.4  # Reject if text is too repetitive
     whisper_no_speech_threshold: float = 0.6  # Detect silence (higher = stricter)
     whisper_logprob_threshold: float = -1.0  # Reject low-confidence segments
+    whisper_silence_rms: float = 0.01  # Skip Whisper below this RMS energy (~-40 dB)
+    whisper_cache_size: int = 128  # Transcripts of repeated audio kept in memory (0 = disabled)
 
     # LLM settings
     llm_provider: str = "local"  # "local" | "openai" | "anthropic"
@@ -46,6 +53,8 @@ class Settings(BaseSettings):
     tts_model: str = "mlx-community/Kokoro-82M-bf16"
     tts_voice: str = "af_heart"
     tts_speed: float = 1.0
+    tts_cache_size: int = 64  # Synthesized replies kept in memory (0 = disabled)
+    tts_preload_phrases: list[str] = []  # Replies synthesized into the cache at startup
 
     # Audio settings
     sample_rate: int = 16000
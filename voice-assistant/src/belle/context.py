@@ -4,9 +4,11 @@ This module fetches and formats current device/room/group state
 to provide context to the LLM for smarter decision making.
 """
 
+import asyncio
 import logging
 
-from belle.http import Cache, get_client
+from belle.http import Cache, SingleFlight, get_api_semaphore, get_client
+from belle.tools.rooms import SHADE_DEVICE_TYPES, SHADE_NAME_RE
 
 logger = logging.getLogger(__name__)
 
@@ -14,12 +16,17 @@ logger = logging.getLogger(__name__)
 _context_cache = Cache(ttl=15.0)
 _context_json_cache = Cache(ttl=15.0)
 
+# In-flight fetch of devices/rooms/groups, shared by concurrent context builds
+# (several sessions asking right after a command cleared the caches)
+_fetch_flight = SingleFlight()
+
 
 async def _fetch_devices() -> list[dict]:
     """Fetch all devices from the smart home API."""
     try:
         client = await get_client()
-        response = await client.get("/devices")
+        async with get_api_semaphore():
+            response = await client.get("/devices")
         response.raise_for_status()
         return response.json()
     except Exception as e:
@@ -31,7 +38,8 @@ async def _fetch_rooms() -> list[dict]:
     """Fetch all rooms from the smart home API."""
     try:
         client = await get_client()
-        response = await client.get("/rooms")
+        async with get_api_semaphore():
+            response = await client.get("/rooms")
         response.raise_for_status()
         return response.json()
     except Exception as e:
@@ -43,7 +51,8 @@ async def _fetch_groups() -> list[dict]:
     """Fetch all groups from the smart home API."""
     try:
         client = await get_client()
-        response = await client.get("/groups")
+        async with get_api_semaphore():
+            response = await client.get("/groups")
         response.raise_for_status()
         return response.json()
     except Exception as e:
@@ -51,6 +60,16 @@ async def _fetch_groups() -> list[dict]:
         return []
 
 
+async def _fetch_all() -> tuple[list[dict], list[dict], list[dict]]:
+    """Fetch devices, rooms and groups in parallel."""
+    devices, rooms, groups = await asyncio.gather(
+        _fetch_devices(),
+        _fetch_rooms(),
+        _fetch_groups(),
+    )
+    return devices, rooms, groups
+
+
 def _format_device_state(device: dict) -> str:
     """Format a device's state concisely."""
     state = device.get("state", {})
@@ -105,18 +124,21 @@ def _format_group_summary(group: dict) -> str:
     return f"{name} ({len(devices)} devices)"
 
 
+def _is_shade(device: dict) -> bool:
+    """Check if a device is a shade/curtain/blind, by type or name keyword."""
+    return (
+        device.get("deviceType") in SHADE_DEVICE_TYPES
+        or SHADE_NAME_RE.search(device.get("name") or "") is not None
+    )
+
+
 def _get_device_capabilities(device: dict) -> list[str]:
     """Determine device capabilities based on type and state."""
     capabilities = ["on_off"]
     state = device.get("state", {})
-    device_type = device.get("deviceType", "")
-    name = device.get("name", "").lower()
 
     # Check for shade/curtain devices
-    shade_types = ["Curtain", "Curtain3", "Blind Tilt", "Roller Shade"]
-    shade_keywords = ["shade", "curtain", "blind", "persiana", "cortina"]
-
-    if device_type in shade_types or any(kw in name for kw in shade_keywords):
+    if _is_shade(device):
         return ["open", "close", "position"]
 
     # Light capabilities
@@ -144,29 +166,18 @@ async def get_smart_home_context_json() -> dict:
     
     Uses caching to minimize API calls.
     """
-    import asyncio
-
     # Check cache first
     cached = _context_json_cache.get()
     if cached is not None:
         return cached
 
-    # Fetch all data in parallel
-    devices, rooms, groups = await asyncio.gather(
-        _fetch_devices(),
-        _fetch_rooms(),
-        _fetch_groups(),
-    )
+    devices, rooms, groups = await _fetch_flight.run(_fetch_all)
 
     # Separate devices by type
-    shade_types = ["Curtain", "Curtain3", "Blind Tilt", "Roller Shade"]
-    shade_keywords = ["shade", "curtain", "blind", "persiana", "cortina"]
-
     light_list = []
     shade_list = []
 
     for d in devices:
-        device_type = d.get("deviceType", "")
         name = d.get("name", "Unknown")
         room_info = d.get("room", {})
         room_name = d.get("roomName") or (room_info.get("name") if room_info else None)
@@ -187,7 +198,7 @@ async def get_smart_home_context_json() -> dict:
         # Remove None values from state
         device_obj["state"] = {k: v for k, v in device_obj["state"].items() if v is not None}
 
-        if device_type in shade_types or any(kw in name.lower() for kw in shade_keywords):
+        if _is_shade(d):
             # Shades use brightness as position
             device_obj["state"] = {
                 "position": state.get("brightness", 0),
@@ -249,13 +260,7 @@ async def get_smart_home_context() -> str:
     if cached is not None:
         return cached
 
-    # Fetch all data in parallel
-    import asyncio
-    devices, rooms, groups = await asyncio.gather(
-        _fetch_devices(),
-        _fetch_rooms(),
-        _fetch_groups(),
-    )
+    devices, rooms, groups = await _fetch_flight.run(_fetch_all)
 
     lines = ["## Current Smart Home State"]
 
@@ -276,18 +281,15 @@ async def get_smart_home_context() -> str:
     shades = []
     other_devices = []
 
-    shade_types = ["Curtain", "Curtain3", "Blind Tilt", "Roller Shade"]
-
     if devices:
         for d in devices:
             state = d.get("state", {})
             name = d.get("name", "Unknown")
-            device_type = d.get("deviceType", "")
             room_info = d.get("room", {})
             room_name = d.get("roomName") or (room_info.get("name") if room_info else None)
 
             # Check if it's a shade
-            if device_type in shade_types or any(kw in name.lower() for kw in ["shade", "curtain", "blind", "persiana", "cortina"]):
+            if _is_shade(d):
                 # Format shade state (brightness = position, 100 = open, 0 = closed)
                 brightness = state.get("brightness", 0)
                 if brightness >= 100:
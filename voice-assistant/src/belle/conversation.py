@@ -10,6 +10,7 @@ logger = logging.getLogger(__name__)
 # Default settings
 DEFAULT_MAX_HISTORY = 10  # Max messages to keep per session
 DEFAULT_SESSION_TTL = 300.0  # 5 minutes of inactivity
+CLEANUP_INTERVAL = 1.0  # Min seconds between sweeps for expired sessions
 
 
 @dataclass
@@ -80,6 +81,8 @@ class ConversationManager:
         self.max_history = max_history
         self.session_ttl = session_ttl
         self._sessions: dict[str, ConversationSession] = {}
+        self._cleanup_interval = min(CLEANUP_INTERVAL, session_ttl)
+        self._last_cleanup = 0.0
 
     def get_session(self, session_id: str) -> ConversationSession:
         """
@@ -93,14 +96,21 @@ class ConversationManager:
         """
         self._cleanup_expired()
 
-        if session_id not in self._sessions:
-            self._sessions[session_id] = ConversationSession(
+        session = self._sessions.get(session_id)
+        if session is not None and session.is_expired(self.session_ttl):
+            # Expired since the last sweep
+            del self._sessions[session_id]
+            session = None
+
+        if session is None:
+            session = ConversationSession(
                 session_id=session_id,
                 max_history=self.max_history,
             )
+            self._sessions[session_id] = session
             logger.debug(f"Created new conversation session: {session_id}")
 
-        return self._sessions[session_id]
+        return session
 
     def get_history(self, session_id: str) -> list[dict[str, str]]:
         """Get conversation history for a session."""
@@ -133,8 +143,18 @@ class ConversationManager:
             del self._sessions[session_id]
             logger.debug(f"Removed conversation session: {session_id}")
 
-    def _cleanup_expired(self) -> None:
-        """Remove expired sessions."""
+    def _cleanup_expired(self, force: bool = False) -> None:
+        """
+        Remove expired sessions.
+
+        Sweeps at most once per cleanup interval (unless forced) so busy
+        servers don't scan every session on each request.
+        """
+        now = time.monotonic()
+        if not force and (now - self._last_cleanup) < self._cleanup_interval:
+            return
+        self._last_cleanup = now
+
         expired = [
             sid for sid, session in self._sessions.items()
             if session.is_expired(self.session_ttl)
@@ -145,7 +165,7 @@ class ConversationManager:
 
     def get_stats(self) -> dict[str, Any]:
         """Get manager statistics."""
-        self._cleanup_expired()
+        self._cleanup_expired(force=True)
         return {
             "active_sessions": len(self._sessions),
             "sessions": {
@@ -3,12 +3,13 @@
 import asyncio
 import logging
 import random
-from collections.abc import Callable
+from collections.abc import Awaitable, Callable
 from contextlib import asynccontextmanager
 from functools import wraps
 from typing import Any, TypeVar
 
 import httpx
+import orjson
 
 from belle.config import settings
 
@@ -234,27 +235,83 @@ def with_retry(
 # Shared HTTP client instance
 _client: httpx.AsyncClient | None = None
 
+# Request bodies are serialized with orjson, so the content type is set by hand
+_JSON_HEADERS = {"content-type": "application/json"}
+
+# Connection pool for the shared client. Group/room commands fan out one
+# request per device, so allow enough connections for a whole room at once
+MAX_CONNECTIONS = 100
+MAX_KEEPALIVE_CONNECTIONS = 20
+
+
+# Bounds in-flight API requests to the pool size. Callers beyond it wait here
+# indefinitely instead of timing out in httpx's connection pool (PoolTimeout)
+_api_semaphore = asyncio.Semaphore(MAX_CONNECTIONS)
+
+
+def get_api_semaphore() -> asyncio.Semaphore:
+    """Get the semaphore to hold around each Smart Home API request."""
+    return _api_semaphore
+
+
+# Bounds the per-device PUTs a single room/group command has in flight, so a
+# large room doesn't hit the bridge with every update at once (throttling)
+_device_put_semaphore = asyncio.Semaphore(max(1, settings.max_concurrent_device_puts))
+
+
+def get_device_put_semaphore() -> asyncio.Semaphore:
+    """Get the semaphore to hold around each fanned-out device PUT."""
+    return _device_put_semaphore
+
+
+def _use_http2(base_url: str) -> bool:
+    """
+    Check if HTTP/2 can be used for the API.
+
+    httpx only negotiates HTTP/2 over TLS, and needs the optional h2
+    package (httpx[http2]).
+    """
+    import importlib.util
+
+    return base_url.startswith("https://") and importlib.util.find_spec("h2") is not None
+
 
 async def get_client() -> httpx.AsyncClient:
     """
     Get the shared HTTP client instance.
     
-    Creates a new client if one doesn't exist. The client uses connection
-    pooling for better performance with multiple requests.
+    Creates a new client if one doesn't exist. Every tool and the context
+    builder share this client, so its connection pool keeps sockets to the
+    Smart Home API open across requests.
     """
     global _client
 
     if _client is None or _client.is_closed:
         _client = httpx.AsyncClient(
             base_url=settings.smart_home_api_url,
-            timeout=httpx.Timeout(10.0, connect=5.0),
-            limits=httpx.Limits(max_keepalive_connections=5, max_connections=10),
+            # The API is on the local network: fail fast on connect so the
+            # retry/circuit breaker logic kicks in sooner
+            timeout=httpx.Timeout(10.0, connect=3.0),
+            # Keep idle connections longer than httpx's 5s default so the
+            # pause between voice commands doesn't cost a new handshake.
+            # Below the server's 65s keep-alive so it never closes them first
+            limits=httpx.Limits(
+                max_keepalive_connections=MAX_KEEPALIVE_CONNECTIONS,
+                max_connections=MAX_CONNECTIONS,
+                keepalive_expiry=60.0,
+            ),
+            http2=_use_http2(settings.smart_home_api_url),
         )
         logger.debug(f"Created HTTP client for {settings.smart_home_api_url}")
 
     return _client
 
 
+async def put_json(client: httpx.AsyncClient, url: str, payload: Any) -> httpx.Response:
+    """PUT a JSON body to the Smart Home API, serialized with orjson."""
+    return await client.put(url, content=orjson.dumps(payload), headers=_JSON_HEADERS)
+
+
 async def close_client() -> None:
     """Close the shared HTTP client."""
     global _client
@@ -383,12 +440,98 @@ class Cache:
         self._timestamp = 0
 
 
+class LRUCache:
+    """
+    Keyed TTL cache with least-recently-used eviction.
+
+    Thread-safe so it can be shared between the event loop and the
+    worker threads that run STT/TTS inference.
+    """
+
+    def __init__(self, maxsize: int = 128, ttl: float | None = None):
+        """
+        Args:
+            maxsize: Maximum number of entries before evicting the oldest
+            ttl: Seconds an entry stays valid (None = no expiry)
+        """
+        import threading
+        from collections import OrderedDict
+
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict[Any, tuple[Any, float]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Any) -> Any | None:
+        """Get a cached value if present and not expired."""
+        import time
+
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+
+            value, timestamp = entry
+            if self.ttl is not None and (time.time() - timestamp) > self.ttl:
+                del self._data[key]
+                return None
+
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: Any, value: Any) -> None:
+        """Store a value, evicting the least recently used entry if full."""
+        import time
+
+        with self._lock:
+            self._data[key] = (value, time.time())
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        """Remove all entries."""
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class SingleFlight:
+    """
+    Share one in-flight call among concurrent callers.
+
+    Used for cache refreshes: callers arriving while a fetch is running
+    await that fetch instead of issuing their own request.
+    """
+
+    def __init__(self):
+        self._task: asyncio.Task | None = None
+
+    async def run(self, func: Callable[[], Any]) -> Any:
+        """Await the running call, or start func() if nothing is in flight."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(func())
+        # Shielded so one cancelled caller doesn't cancel the call for the rest
+        return await asyncio.shield(self._task)
+
+
+def _log_background_refresh_error(task: asyncio.Task) -> None:
+    """Log (and so retrieve) the error of a background cache refresh."""
+    if not task.cancelled() and task.exception() is not None:
+        logger.warning(f"Background cache refresh failed: {task.exception()}")
+
+
 class SmartCache:
     """
     Cache with adaptive TTL based on activity.
 
     - Shorter TTL after recent modifications (data likely changing)
     - Longer TTL when idle (data likely stable)
+
+    Ages are measured with time.monotonic(), so wall-clock adjustments
+    can't expire or extend entries.
     """
 
     def __init__(
@@ -396,27 +539,31 @@ class SmartCache:
         base_ttl: float = 30.0,
         short_ttl: float = 5.0,
         activity_window: float = 60.0,
+        max_stale: float = 0.0,
     ):
         """
         Args:
             base_ttl: Normal TTL when idle
             short_ttl: Shorter TTL after recent activity
             activity_window: How long to use short TTL after modification
+            max_stale: How long past its TTL get_or_refresh() may still serve
+                data while refreshing it in the background (0 = never)
         """
         self.base_ttl = base_ttl
         self.short_ttl = short_ttl
         self.activity_window = activity_window
+        self.max_stale = max_stale
 
         self._data: Any = None
         self._timestamp: float = 0
-        self._last_modification: float = 0
+        self._last_modification: float | None = None
+        self._flight = SingleFlight()
+        self._background: asyncio.Task | None = None
 
-    def _get_effective_ttl(self) -> float:
+    def _get_effective_ttl(self, now: float) -> float:
         """Get current TTL based on recent activity."""
-        import time
-        if self._last_modification > 0:
-            time_since_mod = time.time() - self._last_modification
-            if time_since_mod < self.activity_window:
+        if self._last_modification is not None:
+            if now - self._last_modification < self.activity_window:
                 return self.short_ttl
         return self.base_ttl
 
@@ -427,17 +574,53 @@ class SmartCache:
         if self._data is None:
             return None
 
-        effective_ttl = self._get_effective_ttl()
-        if (time.time() - self._timestamp) > effective_ttl:
+        now = time.monotonic()
+        if (now - self._timestamp) > self._get_effective_ttl(now):
             return None
 
         return self._data
 
-    def set(self, data: Any) -> None:
-        """Set cache data."""
+    def set(self, data: Any, age: float = 0.0) -> None:
+        """Set cache data, optionally as already `age` seconds old (e.g. read from a file)."""
         import time
         self._data = data
-        self._timestamp = time.time()
+        self._timestamp = time.monotonic() - age
+
+    async def refresh(self, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Run fetch(), which should store its result with set(), and return the result.
+
+        Concurrent callers share a single fetch instead of each hitting
+        the API when the cache expires.
+        """
+        return await self._flight.run(fetch)
+
+    async def get_or_refresh(self, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Get cached data, or refresh it with fetch() if expired.
+
+        Data expired by less than max_stale is returned right away while
+        fetch() runs in the background (stale-while-revalidate).
+        """
+        import time
+
+        if self._data is not None:
+            now = time.monotonic()
+            age = now - self._timestamp
+            ttl = self._get_effective_ttl(now)
+            if age <= ttl:
+                return self._data
+            if age <= ttl + self.max_stale:
+                self._refresh_in_background(fetch)
+                return self._data
+        return await self.refresh(fetch)
+
+    def _refresh_in_background(self, fetch: Callable[[], Awaitable[Any]]) -> None:
+        """Start a refresh nobody awaits, unless one is already running."""
+        if self._background is not None and not self._background.done():
+            return
+        self._background = asyncio.create_task(self.refresh(fetch))
+        self._background.add_done_callback(_log_background_refresh_error)
 
     def clear(self) -> None:
         """Clear the cache (typically after a modification)."""
@@ -445,7 +628,7 @@ class SmartCache:
         self._data = None
         self._timestamp = 0
         # Record modification time to use shorter TTL
-        self._last_modification = time.time()
+        self._last_modification = time.monotonic()
 
     def invalidate_only(self) -> None:
         """Invalidate cache without recording as modification."""
@@ -459,7 +642,12 @@ def normalize_name(name: str) -> str:
     return re.sub(r'\s+', ' ', name.lower().strip())
 
 
-def find_by_name(items: list[dict], name: str, name_field: str = "name") -> dict | None:
+def find_by_name(
+    items: list[dict],
+    name: str,
+    name_field: str = "name",
+    normalized_names: list[str] | None = None,
+) -> dict | None:
     """
     Find an item by name with case-insensitive matching.
 
@@ -469,6 +657,8 @@ def find_by_name(items: list[dict], name: str, name_field: str = "name") -> dict
         items: List of dicts to search
         name: Name to search for
         name_field: Field name containing the item name
+        normalized_names: Precomputed normalize_name() of each item's name,
+            in item order (see NameIndex)
 
     Returns:
         Matching item or None
@@ -476,15 +666,17 @@ def find_by_name(items: list[dict], name: str, name_field: str = "name") -> dict
     from difflib import SequenceMatcher
 
     name_normalized = normalize_name(name)
+    if normalized_names is None:
+        normalized_names = [normalize_name(item.get(name_field, "")) for item in items]
+    named_items = list(zip(normalized_names, items))
 
     # First try exact match (normalized)
-    for item in items:
-        if normalize_name(item.get(name_field, "")) == name_normalized:
+    for item_normalized, item in named_items:
+        if item_normalized == name_normalized:
             return item
 
     # Then try partial match (name contains search or search contains name)
-    for item in items:
-        item_normalized = normalize_name(item.get(name_field, ""))
+    for item_normalized, item in named_items:
         if name_normalized in item_normalized or item_normalized in name_normalized:
             return item
 
@@ -497,9 +689,14 @@ def find_by_name(items: list[dict], name: str, name_field: str = "name") -> dict
     best_match = None
     best_ratio = 0.6  # Minimum threshold
 
-    for item in items:
-        item_name = normalize_name(item.get(name_field, ""))
-        ratio = SequenceMatcher(None, name_normalized, item_name).ratio()
+    # The cheap upper bounds skip the full ratio() for names that can't beat
+    # the current best (argument order kept: ratio() isn't symmetric)
+    matcher = SequenceMatcher(None, name_normalized)
+    for item_name, item in named_items:
+        matcher.set_seq2(item_name)
+        if matcher.real_quick_ratio() <= best_ratio or matcher.quick_ratio() <= best_ratio:
+            continue
+        ratio = matcher.ratio()
         if ratio > best_ratio:
             best_ratio = ratio
             best_match = item
@@ -511,6 +708,34 @@ def find_by_name(items: list[dict], name: str, name_field: str = "name") -> dict
     return None
 
 
+class NameIndex:
+    """
+    Normalized-name lookup table for one fetched list.
+
+    Exact (normalized) name matches are a dict hit. Anything else goes
+    through find_by_name, reusing the names normalized here; a list other
+    than the one the index was built from is searched from scratch.
+    """
+
+    def __init__(self, items: list[dict], name_field: str = "name"):
+        self.items = items
+        self.name_field = name_field
+        self._names = [normalize_name(item.get(name_field, "")) for item in items]
+        self._by_name: dict[str, dict] = {}
+        for item_name, item in zip(self._names, items):
+            # First item wins on duplicates, as in find_by_name
+            self._by_name.setdefault(item_name, item)
+
+    def find(self, items: list[dict], name: str) -> dict | None:
+        """Find an item in items by name (see find_by_name)."""
+        if items is not self.items:
+            return find_by_name(items, name, self.name_field)
+        item = self._by_name.get(normalize_name(name))
+        if item is not None:
+            return item
+        return find_by_name(items, name, self.name_field, normalized_names=self._names)
+
+
 def get_close_matches_for_name(
     items: list[dict],
     name: str,
@@ -531,18 +756,23 @@ def get_close_matches_for_name(
     Returns:
         List of similar names, sorted by similarity
     """
+    import heapq
     from difflib import SequenceMatcher
 
     name_normalized = normalize_name(name)
     matches = []
 
+    # As in difflib.get_close_matches, only compute the full ratio() when
+    # the cheap upper bounds pass (argument order kept: ratio() isn't symmetric)
+    matcher = SequenceMatcher(None, name_normalized)
     for item in items:
         item_name = item.get(name_field, "")
-        item_normalized = normalize_name(item_name)
-        ratio = SequenceMatcher(None, name_normalized, item_normalized).ratio()
+        matcher.set_seq2(normalize_name(item_name))
+        if matcher.real_quick_ratio() < cutoff or matcher.quick_ratio() < cutoff:
+            continue
+        ratio = matcher.ratio()
         if ratio >= cutoff:
             matches.append((item_name, ratio))
 
-    # Sort by similarity (highest first) and return names
-    matches.sort(key=lambda x: x[1], reverse=True)
-    return [m[0] for m in matches[:n]]
+    # Highest similarity first
+    return [m[0] for m in heapq.nlargest(n, matches, key=lambda x: x[1])]
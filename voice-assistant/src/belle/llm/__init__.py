@@ -6,21 +6,68 @@ Providers:
 - anthropic: Anthropic API (requires BELLE_ANTHROPIC_API_KEY)
 """
 
+import copy
 import logging
+import re
 from typing import Any
 
 from belle.config import settings
+from belle.http import LRUCache
 from belle.llm.common import ToolCall
 
 logger = logging.getLogger(__name__)
 
-__all__ = ["chat_async", "preload_model", "ToolCall"]
+__all__ = ["chat_async", "clear_response_cache", "preload_model", "ToolCall"]
 
 # Re-export local-only symbols for backward compatibility with tests
 from belle.llm.local import _extract_json_objects, _parse_tool_calls  # noqa: F401
 
-
-async def chat_async(
+# Responses for repeated phrases ("hello", "thank you") are reused for a short
+# window. Only plain replies to non-commands are cached — anything that called
+# or should have called a tool must run again so the device is controlled.
+_response_cache = LRUCache(maxsize=512, ttl=60.0)
+
+# Words that signal a question about live device state (EN + PT); answers to
+# these come from the current context and must not be replayed
+_LIVE_STATE_KEYWORDS = frozenset({
+    "is", "are", "what", "what's", "whats", "which", "status", "how",
+    "está", "esta", "estão", "estao", "qual", "quais", "como",
+})
+
+# Words that signal a device command (EN + PT). A command the model answered
+# without a tool call ("Done!") must not be replayed, or repeating it would
+# never reach the device.
+_COMMAND_KEYWORDS = frozenset({
+    "turn", "switch", "set", "dim", "brighten", "open", "close", "toggle",
+    "on", "off", "light", "lights", "lamp", "lamps", "shade", "shades",
+    "blind", "blinds", "curtain", "curtains", "brightness", "color", "colour",
+    "room", "group", "scene",
+    "liga", "ligar", "ligue", "desliga", "desligar", "desligue", "acende",
+    "acender", "acenda", "apaga", "apagar", "apague", "abre", "abrir", "abra",
+    "fecha", "fechar", "feche", "aumenta", "aumentar", "diminui", "diminuir",
+    "luz", "luzes", "lâmpada", "lampada", "lâmpadas", "lampadas", "cortina",
+    "cortinas", "persiana", "persianas", "brilho", "cor", "quarto", "sala",
+    "grupo", "cena",
+})
+
+
+def _cache_key(user_message: str) -> str:
+    """Normalize a transcript into a response cache key."""
+    return f"{settings.llm_provider}:{user_message.strip().lower()}"
+
+
+def _is_cacheable(user_message: str, conversation_history: list[dict] | None) -> bool:
+    """Check if a message's response can be served from the cache."""
+    if conversation_history:
+        return False
+    text = user_message.strip().lower()
+    if not text or text.endswith("?"):
+        return False
+    words = re.findall(r"[\w'’]+", text)
+    return not any(word in _LIVE_STATE_KEYWORDS or word in _COMMAND_KEYWORDS for word in words)
+
+
+async def _chat_uncached(
     user_message: str,
     conversation_history: list[dict] | None = None,
 ) -> dict[str, Any]:
@@ -41,6 +88,35 @@ async def chat_async(
         return await _chat(user_message, conversation_history)
 
 
+async def chat_async(
+    user_message: str,
+    conversation_history: list[dict] | None = None,
+) -> dict[str, Any]:
+    """Route chat to the configured LLM provider, reusing recent identical replies."""
+    cacheable = _is_cacheable(user_message, conversation_history)
+    if cacheable:
+        cached = _response_cache.get(_cache_key(user_message))
+        if cached is not None:
+            logger.info("LLM response cache hit")
+            # Copied so a caller mutating its reply can't corrupt the cache
+            return copy.deepcopy(cached)
+
+    result = await _chat_uncached(user_message, conversation_history)
+
+    if result.get("tool_calls"):
+        # Device state changed, earlier replies may be stale
+        _response_cache.clear()
+    elif cacheable:
+        _response_cache.set(_cache_key(user_message), copy.deepcopy(result))
+
+    return result
+
+
+def clear_response_cache() -> None:
+    """Clear cached LLM responses."""
+    _response_cache.clear()
+
+
 def preload_model() -> None:
     """Pre-load the model for the configured provider.
 
@@ -1,5 +1,6 @@
 """Anthropic LLM provider with native tool calling."""
 
+import functools
 import json
 import logging
 from typing import Any
@@ -33,11 +34,15 @@ def _get_client():
     return AsyncAnthropic(api_key=settings.anthropic_api_key)
 
 
+@functools.cache
 def _convert_tools_for_anthropic() -> list[dict]:
     """Convert tools from OpenAI format to Anthropic format.
 
     OpenAI: {"type": "function", "function": {"name", "description", "parameters"}}
     Anthropic: {"name", "description", "input_schema"}
+
+    The tool definitions are static, so the converted list is built once and
+    shared by every request.
     """
     anthropic_tools = []
     for tool in ALL_TOOLS:
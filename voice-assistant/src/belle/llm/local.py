@@ -1,11 +1,11 @@
 """Local MLX/Qwen LLM provider."""
 
+import asyncio
 import json
 import logging
 import re
+import threading
 import time
-
-from belle.mlx_lock import mlx_lock
 from typing import Any
 
 from pydantic import ValidationError
@@ -20,6 +20,7 @@ from belle.llm.common import (
     format_response,
     get_followup_instruction,
 )
+from belle.mlx_lock import mlx_async_lock, mlx_lock, prefetch_model
 from belle.tools import ALL_TOOLS
 
 logger = logging.getLogger(__name__)
@@ -28,23 +29,113 @@ logger = logging.getLogger(__name__)
 _model = None
 _tokenizer = None
 
+# Startup preload and the first request may race to load the model
+_load_lock = threading.Lock()
+
+# KV cache of the last prompt. The next prompt usually shares a long prefix
+# (system prompt, tool instructions, device context, and for follow-ups the
+# whole first turn), which is then not prefilled again.
+_prompt_cache = None
+_prompt_cache_tokens: list[int] = []
+
+# Files mlx_lm.load fetches from a Hugging Face repo
+_MODEL_FILES = [
+    "*.json",
+    "*.safetensors",
+    "*.py",
+    "tokenizer.model",
+    "*.tiktoken",
+    "*.txt",
+    "*.jsonl",
+]
+
 
 def _load_model():
     """Load LLM model lazily on first use."""
-    global _model, _tokenizer
-
     if _model is not None:
         return _model, _tokenizer
 
+    with _load_lock:
+        if _model is not None:
+            return _model, _tokenizer
+        return _load_weights()
+
+
+def _load_weights():
+    """Load the model and tokenizer; callers hold _load_lock."""
+    global _model, _tokenizer
+
     logger.info(f"Loading LLM model: {settings.llm_model}")
 
     from mlx_lm import load
 
-    _model, _tokenizer = load(settings.llm_model)
+    # Fetch weights before taking the lock so other loaders aren't blocked on I/O
+    prefetch_model(settings.llm_model, _MODEL_FILES)
+
+    # Loading evaluates the weights on the GPU, which must not overlap other MLX work
+    with mlx_lock:
+        model, tokenizer = load(settings.llm_model)
+    # _model published last: callers that see it set skip the lock
+    _tokenizer = tokenizer
+    _model = model
     logger.info("LLM model loaded successfully")
     return _model, _tokenizer
 
 
+def _common_prefix_len(a: list[int], b: list[int]) -> int:
+    """Return the number of leading tokens two prompts share."""
+    n = 0
+    for x, y in zip(a, b):
+        if x != y:
+            break
+        n += 1
+    return n
+
+
+def _generate_cached(model, tokenizer, prompt_tokens: list[int], **kwargs) -> str:
+    """
+    Generate text, reusing the KV cache for the prefix shared with the last prompt.
+
+    Must be called with mlx_lock held.
+    """
+    global _prompt_cache, _prompt_cache_tokens
+
+    from mlx_lm import generate
+    from mlx_lm.models.cache import can_trim_prompt_cache, make_prompt_cache, trim_prompt_cache
+
+    # Always prefill at least one token so generation has logits to start from
+    reuse = min(_common_prefix_len(_prompt_cache_tokens, prompt_tokens), len(prompt_tokens) - 1)
+    if _prompt_cache is not None and reuse > 0 and can_trim_prompt_cache(_prompt_cache):
+        # Drop everything after the shared prefix (rest of old prompt + its reply)
+        trim_prompt_cache(_prompt_cache, _prompt_cache[0].offset - reuse)
+    else:
+        _prompt_cache = make_prompt_cache(model)
+        reuse = 0
+
+    logger.debug(f"Reusing {reuse}/{len(prompt_tokens)} cached prompt tokens")
+    _prompt_cache_tokens = list(prompt_tokens)
+
+    try:
+        return generate(
+            model,
+            tokenizer,
+            prompt=prompt_tokens[reuse:],
+            prompt_cache=_prompt_cache,
+            **kwargs,
+        )
+    except Exception:
+        # Cache contents are unknown after a failure; start fresh next time
+        _prompt_cache = None
+        _prompt_cache_tokens = []
+        raise
+
+
+def _generate_locked(model, tokenizer, prompt_tokens: list[int], **kwargs) -> str:
+    """Run _generate_cached under mlx_lock (worker thread entry point)."""
+    with mlx_lock:
+        return _generate_cached(model, tokenizer, prompt_tokens, **kwargs)
+
+
 def _extract_json_objects(text: str) -> list[dict]:
     """
     Extract JSON objects from text using json-repair for robustness.
@@ -182,10 +273,9 @@ async def chat_async(
     conversation_history: list[dict] | None = None,
 ) -> dict[str, Any]:
     """Process a user message using the local MLX model."""
-    from mlx_lm import generate
     from mlx_lm.sample_utils import make_sampler
 
-    model, tokenizer = _load_model()
+    model, tokenizer = await asyncio.to_thread(_load_model)
 
     sampler = make_sampler(temp=settings.llm_temperature)
 
@@ -193,21 +283,24 @@ async def chat_async(
     messages = build_messages(user_message, conversation_history, system_prompt_with_context)
 
     # Apply chat template with native Qwen tool support
-    prompt = tokenizer.apply_chat_template(
+    prompt_tokens = tokenizer.apply_chat_template(
         messages,
         tools=ALL_TOOLS,
-        tokenize=False,
+        tokenize=True,
         add_generation_prompt=True,
     )
 
-    logger.debug(f"Generated prompt: {prompt[:500]}...")
+    logger.debug(f"Generated prompt: {len(prompt_tokens)} tokens")
 
+    # Generation runs in a worker thread so the event loop keeps serving
+    # other sessions; mlx_async_lock queues waiters on the loop, not in the pool
     start_time = time.time()
-    with mlx_lock:
-        response_text = generate(
+    async with mlx_async_lock:
+        response_text = await asyncio.to_thread(
+            _generate_locked,
             model,
             tokenizer,
-            prompt=prompt,
+            prompt_tokens,
             max_tokens=settings.llm_max_tokens,
             sampler=sampler,
             verbose=False,
@@ -241,19 +334,20 @@ async def chat_async(
         followup_instruction = get_followup_instruction(tool_results)
         messages.append({"role": "user", "content": followup_instruction})
 
-        followup_prompt = tokenizer.apply_chat_template(
+        followup_tokens = tokenizer.apply_chat_template(
             messages,
             tools=ALL_TOOLS,
-            tokenize=False,
+            tokenize=True,
             add_generation_prompt=True,
         )
 
         start_time = time.time()
-        with mlx_lock:
-            final_response = generate(
+        async with mlx_async_lock:
+            final_response = await asyncio.to_thread(
+                _generate_locked,
                 model,
                 tokenizer,
-                prompt=followup_prompt,
+                followup_tokens,
                 max_tokens=150,
                 sampler=sampler,
                 verbose=False,
@@ -1,29 +1,42 @@
 """FastAPI server for Belle voice assistant."""
 
 import asyncio
-import base64
+import hashlib
 import io
-import json
+import struct
+import uuid
 import wave
-from contextlib import asynccontextmanager
+from collections.abc import Awaitable, Callable
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import aclosing, asynccontextmanager
+from dataclasses import dataclass, field
+from functools import partial
+from math import gcd
 from typing import Any
 
 import numpy as np
+import orjson
+import pybase64
 from fastapi import FastAPI, HTTPException, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 from belle import __version__
 from belle.config import settings
 from belle.conversation import get_conversation_manager
-from belle.http import close_client
+from belle.http import LRUCache, close_client
 from belle.llm import chat_async
 from belle.llm import preload_model as preload_llm
 from belle.logging_config import clear_request_id, get_logger, set_request_id, setup_logging
 from belle.stt import is_silent_audio, is_valid_speech, transcribe_audio_async
 from belle.stt import preload_model as preload_stt
 from belle.tools import get_all_devices
-from belle.tts import is_tts_available, synthesize_speech_to_wav_async
+from belle.tts import (
+    KOKORO_SAMPLE_RATE,
+    is_tts_available,
+    synthesize_speech_stream_async,
+    synthesize_speech_to_wav_async,
+)
 from belle.tts import preload_model as preload_tts
 
 # Configure logging with optional JSON output
@@ -38,17 +51,29 @@ logger = get_logger(__name__)
 async def lifespan(app: FastAPI):
     """Application lifespan - preload models on startup, cleanup on shutdown."""
     logger.info("Starting Belle voice assistant...")
-    logger.info(f"Version: {__version__}")
-    logger.info(f"Smart Home API: {settings.smart_home_api_url}")
+    logger.info("Version: %s", __version__)
+    logger.info("Smart Home API: %s", settings.smart_home_api_url)
+
+    # Size the pool behind asyncio.to_thread explicitly; the default
+    # (cpu_count + 4) oversubscribes cores already busy with MLX inference
+    asyncio.get_running_loop().set_default_executor(
+        ThreadPoolExecutor(max_workers=settings.worker_threads, thread_name_prefix="belle-io")
+    )
 
     # Preload models in background to speed up first request
     # Note: This is optional - models will load lazily on first use
     if not settings.debug:
         logger.info("Pre-loading models (this may take a moment)...")
-        await asyncio.to_thread(preload_stt)
-        await asyncio.to_thread(preload_llm)
+        # Independent loads run concurrently; MLX work inside them is
+        # serialized by mlx_lock
+        tasks = [
+            asyncio.to_thread(preload_stt),
+            asyncio.to_thread(preload_llm),
+            asyncio.to_thread(_warm_audio_decoder),
+        ]
         if settings.tts_enabled:
-            await asyncio.to_thread(preload_tts)
+            tasks.append(asyncio.to_thread(preload_tts))
+        await asyncio.gather(*tasks)
         logger.info("Models pre-loaded successfully")
 
     yield
@@ -79,8 +104,8 @@ app.add_middleware(
 class TranscribeRequest(BaseModel):
     """Request to transcribe audio."""
 
-    audio: str  # Base64-encoded audio
-    format: str = "wav"  # Audio format (wav, webm, etc.)
+    audio: str = Field(max_length=settings.max_audio_b64_len)  # Base64-encoded audio
+    format: str = "wav"  # Audio format (wav, webm, pcm16_16k, etc.)
     language: str | None = None  # Optional language hint
 
 
@@ -111,8 +136,8 @@ class ChatResponse(BaseModel):
 class VoiceRequest(BaseModel):
     """Request for full voice interaction (STT + LLM + TTS)."""
 
-    audio: str  # Base64-encoded audio
-    format: str = "wav"
+    audio: str = Field(max_length=settings.max_audio_b64_len)  # Base64-encoded audio
+    format: str = "wav"  # Audio format (wav, webm, pcm16_16k, etc.)
     language: str | None = None
     session_id: str | None = None  # Optional session ID for multi-turn conversations
 
@@ -154,24 +179,21 @@ async def list_devices():
 async def transcribe(request: TranscribeRequest):
     """Transcribe audio to text."""
     request_id = set_request_id()
-    logger.info(f"[{request_id}] Transcribe request received")
+    logger.info("[%s] Transcribe request received", request_id)
     try:
-        # Decode base64 audio
-        audio_bytes = base64.b64decode(request.audio)
-
-        # Convert to numpy array
-        audio_array = _decode_audio(audio_bytes, request.format)
+        # Decode base64 audio to a numpy array (off the event loop)
+        audio_array = await _prepare_audio(request.audio, request.format)
 
         # Transcribe
         result = await transcribe_audio_async(audio_array, request.language)
 
-        logger.info(f"[{request_id}] Transcription complete: {result['text'][:50]}...")
+        logger.info("[%s] Transcription complete: %s...", request_id, result["text"][:50])
         return TranscribeResponse(
             text=result["text"],
             language=result["language"],
         )
     except Exception as e:
-        logger.error(f"[{request_id}] Transcription error: {e}")
+        logger.error("[%s] Transcription error: %s", request_id, e)
         raise HTTPException(status_code=500, detail=str(e))
     finally:
         clear_request_id()
@@ -182,109 +204,174 @@ async def transcribe(request: TranscribeRequest):
 async def chat_endpoint(request: ChatRequest):
     """Chat with Belle using text."""
     request_id = set_request_id()
-    logger.info(f"[{request_id}] Chat request: {request.message[:50]}...")
+    logger.info("[%s] Chat request: %s...", request_id, request.message[:50])
     try:
         # Get conversation history if session_id provided
         conversation_history = None
         if request.session_id:
             conversation_manager = get_conversation_manager()
             conversation_history = conversation_manager.get_history(request.session_id)
-            logger.info(f"[{request_id}] Using session {request.session_id} with {len(conversation_history)} history messages")
+            logger.info(
+                "[%s] Using session %s with %s history messages",
+                request_id, request.session_id, len(conversation_history),
+            )
 
         result = await chat_async(request.message, conversation_history)
+        response = result["response"]
+
+        # Start TTS right away so synthesis overlaps the bookkeeping below
+        tts_task = None
+        if request.include_audio and settings.tts_enabled:
+            tts_task = asyncio.create_task(synthesize_speech_to_wav_async(response))
 
         # Store exchange in session history
         if request.session_id:
-            conversation_manager.add_exchange(
-                request.session_id,
-                request.message,
-                result["response"],
-            )
+            conversation_manager.add_exchange(request.session_id, request.message, response)
 
         audio_b64 = None
-        if request.include_audio and settings.tts_enabled:
-            audio_bytes = await synthesize_speech_to_wav_async(result["response"])
+        if tts_task is not None:
+            audio_bytes = await tts_task
             if audio_bytes:
-                audio_b64 = base64.b64encode(audio_bytes).decode("utf-8")
+                audio_b64 = pybase64.b64encode_as_string(audio_bytes)
 
-        logger.info(f"[{request_id}] Chat response: {result['response'][:50]}...")
+        logger.info("[%s] Chat response: %s...", request_id, response[:50])
         return ChatResponse(
-            response=result["response"],
+            response=response,
             audio=audio_b64,
             actions=result.get("actions", []),
             session_id=request.session_id,
         )
     except Exception as e:
-        logger.error(f"[{request_id}] Chat error: {e}")
+        logger.error("[%s] Chat error: %s", request_id, e)
         raise HTTPException(status_code=500, detail=str(e))
     finally:
         clear_request_id()
 
 
+@dataclass(slots=True)
+class VoiceResult:
+    """Outcome of one pass through the voice pipeline."""
+
+    transcript: str
+    language: str
+    response: str
+    actions: list[dict[str, Any]] = field(default_factory=list)
+    audio: bytes | None = None  # WAV bytes if TTS ran
+
+
+async def _run_voice_pipeline(
+    audio: np.ndarray,
+    language: str | None,
+    session_id: str | None,
+    log_prefix: str,
+    synthesize: bool = True,
+    emit: Callable[[dict[str, Any]], Awaitable[None]] | None = None,
+) -> VoiceResult | None:
+    """
+    Run STT -> LLM -> TTS on decoded audio.
+
+    Shared by the /voice endpoint and the WebSocket handler. Conversation
+    history is used and updated when session_id is given.
+
+    Args:
+        audio: Decoded audio (float32, mono, 16kHz)
+        language: Optional language hint for Whisper
+        session_id: Conversation session, or None for a single-turn request
+        log_prefix: Prefix for log lines (request or session ID)
+        synthesize: Whether to generate TTS audio for the reply
+        emit: Optional callback that receives the transcript message as soon
+            as STT finishes, before the LLM and TTS run
+
+    Returns:
+        VoiceResult, or None if the audio had no valid speech
+    """
+    # Pre-Whisper silence check (fast, prevents hallucinations)
+    if is_silent_audio(audio):
+        logger.info("%s Silent audio, skipping Whisper", log_prefix)
+        return None
+
+    # Transcribe
+    transcription = await transcribe_audio_async(audio, language)
+    logger.info("%s STT: %s", log_prefix, transcription["text"])
+
+    # Filter out non-speech audio
+    if not is_valid_speech(transcription):
+        logger.info("%s No valid speech detected, skipping LLM", log_prefix)
+        return None
+
+    if emit is not None:
+        await emit({
+            "type": "transcript",
+            "text": transcription["text"],
+            "language": transcription["language"],
+        })
+
+    # Get conversation history if session_id provided
+    conversation_history = None
+    if session_id:
+        conversation_manager = get_conversation_manager()
+        conversation_history = conversation_manager.get_history(session_id)
+        logger.info(
+            "%s Using session %s with %s history messages",
+            log_prefix, session_id, len(conversation_history),
+        )
+
+    # Chat with LLM
+    chat_result = await chat_async(transcription["text"], conversation_history)
+    result = VoiceResult(
+        transcript=transcription["text"],
+        language=transcription["language"],
+        response=chat_result["response"],
+        actions=chat_result.get("actions", []),
+    )
+    logger.info("%s LLM: %s...", log_prefix, result.response[:50])
+
+    # Start TTS right away so synthesis overlaps the bookkeeping below
+    tts_task = None
+    if synthesize and settings.tts_enabled:
+        logger.info("%s Generating TTS...", log_prefix)
+        tts_task = asyncio.create_task(synthesize_speech_to_wav_async(result.response))
+
+    # Store exchange in session history
+    if session_id:
+        conversation_manager.add_exchange(session_id, result.transcript, result.response)
+
+    if tts_task is not None:
+        result.audio = await tts_task
+
+    return result
+
+
 # Full voice interaction endpoint
 @app.post("/voice", response_model=VoiceResponse)
 async def voice_endpoint(request: VoiceRequest):
     """Full voice interaction: STT -> LLM -> TTS."""
     request_id = set_request_id()
-    logger.info(f"[{request_id}] Voice request received")
+    logger.info("[%s] Voice request received", request_id)
     try:
         # Decode audio
-        audio_bytes = base64.b64decode(request.audio)
-        audio_array = _decode_audio(audio_bytes, request.format)
-
-        # Pre-Whisper silence check (fast, prevents hallucinations)
-        if is_silent_audio(audio_array):
-            logger.info(f"[{request_id}] Silent audio, skipping Whisper")
-            return VoiceResponse(transcript="", response="", actions=[])
+        audio_array = await _prepare_audio(request.audio, request.format)
 
-        # Transcribe
-        transcription = await transcribe_audio_async(audio_array, request.language)
-
-        logger.info(f"[{request_id}] STT: {transcription['text']}")
-
-        # Filter out non-speech audio
-        if not is_valid_speech(transcription):
-            logger.info(f"[{request_id}] No valid speech detected, skipping LLM")
+        result = await _run_voice_pipeline(
+            audio_array, request.language, request.session_id, f"[{request_id}]"
+        )
+        if result is None:
             return VoiceResponse(transcript="", response="", actions=[])
 
-        # Get conversation history if session_id provided
-        conversation_history = None
-        if request.session_id:
-            conversation_manager = get_conversation_manager()
-            conversation_history = conversation_manager.get_history(request.session_id)
-            logger.info(f"[{request_id}] Using session {request.session_id} with {len(conversation_history)} history messages")
-
-        # Chat with LLM
-        chat_result = await chat_async(transcription["text"], conversation_history)
-
-        # Store exchange in session history
-        if request.session_id:
-            conversation_manager.add_exchange(
-                request.session_id,
-                transcription["text"],
-                chat_result["response"],
-            )
-
-        logger.info(f"[{request_id}] LLM: {chat_result['response'][:50]}...")
-
-        # Generate TTS if enabled
         audio_b64 = None
-        if settings.tts_enabled:
-            logger.info(f"[{request_id}] Generating TTS...")
-            audio_bytes = await synthesize_speech_to_wav_async(chat_result["response"])
-            if audio_bytes:
-                audio_b64 = base64.b64encode(audio_bytes).decode("utf-8")
+        if result.audio:
+            audio_b64 = pybase64.b64encode_as_string(result.audio)
 
-        logger.info(f"[{request_id}] Voice pipeline complete")
+        logger.info("[%s] Voice pipeline complete", request_id)
         return VoiceResponse(
-            transcript=transcription["text"],
-            response=chat_result["response"],
+            transcript=result.transcript,
+            response=result.response,
             audio=audio_b64,
-            actions=chat_result.get("actions", []),
+            actions=result.actions,
             session_id=request.session_id,
         )
     except Exception as e:
-        logger.error(f"[{request_id}] Voice interaction error: {e}")
+        logger.error("[%s] Voice interaction error: %s", request_id, e)
         raise HTTPException(status_code=500, detail=str(e))
     finally:
         clear_request_id()
@@ -303,97 +390,114 @@ async def websocket_endpoint(websocket: WebSocket):
     - Client sends: {"type": "text", "message": "..."} for text-only chat
     - Client sends: {"type": "clear_history"} to clear conversation history
 
+    Streaming TTS: add "stream_audio": true to an audio/text message to get
+    "response" with "audio": null, then {"type": "audio_start", "sample_rate": 24000,
+    "codec": "pcm16"}, a binary frame of FRAME_TTS_CHUNK (0x02) plus raw PCM as
+    each segment is synthesized, and a final {"type": "audio_end"}.
+
+    Binary audio: instead of base64 JSON, a client may send a binary frame of
+    FRAME_AUDIO (0x00) followed by the audio file bytes (format auto-detected).
+    The reply is the usual "response" message with "audio": null, followed by
+    a binary frame of FRAME_AUDIO plus the WAV bytes when TTS is enabled.
+
     Multi-turn conversations are enabled by default for WebSocket connections.
     Each WebSocket connection maintains its own conversation history.
     """
     await websocket.accept()
 
     # Generate unique session ID for this WebSocket connection
-    session_id = f"ws-{id(websocket)}"
+    session_id = f"ws-{uuid.uuid4().hex}"
     conversation_manager = get_conversation_manager()
-    logger.info(f"WebSocket client connected (session: {session_id})")
+    logger.info("WebSocket client connected (session: %s)", session_id)
 
     try:
         while True:
-            # Receive message
-            data = await websocket.receive_text()
-            message = json.loads(data)
+            # Receive message (JSON text, or a tagged binary audio frame)
+            frame = await websocket.receive()
+            if frame["type"] == "websocket.disconnect":
+                raise WebSocketDisconnect(frame.get("code", 1000))
+
+            audio_payload = frame.get("bytes")
+            if audio_payload is not None:
+                if audio_payload[:1] != FRAME_AUDIO:
+                    await _send_json(websocket, {
+                        "type": "error",
+                        "message": "Unknown binary frame type",
+                    })
+                    continue
+                message = {"type": "audio", "format": "auto"}
+            else:
+                message = orjson.loads(frame["text"])
 
             msg_type = message.get("type")
 
             if msg_type == "clear_history":
                 # Clear conversation history
                 conversation_manager.clear_session(session_id)
-                await websocket.send_json({
-                    "type": "history_cleared",
-                    "message": "Conversation history cleared",
-                })
+                await websocket.send_text(_MSG_HISTORY_CLEARED)
                 continue
 
             if msg_type == "audio":
                 # Voice interaction
                 try:
-                    audio_bytes = base64.b64decode(message.get("data", ""))
                     audio_format = message.get("format", "wav")
                     language = message.get("language")
 
-                    # Decode audio
-                    audio_array = _decode_audio(audio_bytes, audio_format)
-
-                    # Pre-Whisper silence check (fast, prevents hallucinations)
-                    if is_silent_audio(audio_array):
-                        logger.info(f"WS [{session_id}] Silent audio, skipping Whisper")
-                        await websocket.send_json({"type": "no_speech"})
+                    # Bound the work a single message can cause before decoding
+                    if audio_payload is not None:
+                        too_large = len(audio_payload) - 1 > settings.max_audio_b64_len * 3 // 4
+                    else:
+                        too_large = len(message.get("data", "")) > settings.max_audio_b64_len
+                    if too_large:
+                        await _send_json(websocket, {
+                            "type": "error",
+                            "message": "Audio payload too large",
+                        })
                         continue
 
-                    # Transcribe
-                    transcription = await transcribe_audio_async(audio_array, language)
-                    logger.info(f"WS [{session_id}] STT: {transcription['text']}")
-
-                    # Filter out non-speech audio
-                    if not is_valid_speech(transcription):
-                        logger.info(f"WS [{session_id}] No valid speech detected, skipping")
-                        await websocket.send_json({"type": "no_speech"})
-                        continue
-
-                    # Send transcription immediately
-                    await websocket.send_json({
-                        "type": "transcript",
-                        "text": transcription["text"],
-                        "language": transcription["language"],
-                    })
-
-                    # Get conversation history and process with LLM
-                    conversation_history = conversation_manager.get_history(session_id)
-                    chat_result = await chat_async(transcription["text"], conversation_history)
-                    logger.info(f"WS [{session_id}] LLM: {chat_result['response'][:50]}...")
-
-                    # Store exchange in history
-                    conversation_manager.add_exchange(
+                    # Decode audio
+                    if audio_payload is not None:
+                        audio_array = await asyncio.to_thread(
+                            _decode_audio_cached, memoryview(audio_payload)[1:], audio_format
+                        )
+                    else:
+                        audio_array = await _prepare_audio(message.get("data", ""), audio_format)
+
+                    stream_audio = settings.tts_enabled and message.get("stream_audio", False)
+
+                    result = await _run_voice_pipeline(
+                        audio_array,
+                        language,
                         session_id,
-                        transcription["text"],
-                        chat_result["response"],
+                        f"WS [{session_id}]",
+                        synthesize=not stream_audio,
+                        emit=partial(_send_json, websocket),
                     )
+                    if result is None:
+                        await websocket.send_text(_MSG_NO_SPEECH)
+                        continue
 
-                    # Generate TTS
                     audio_b64 = None
-                    if settings.tts_enabled:
-                        audio_bytes = await synthesize_speech_to_wav_async(chat_result["response"])
-                        if audio_bytes:
-                            audio_b64 = base64.b64encode(audio_bytes).decode("utf-8")
+                    if result.audio and audio_payload is None:
+                        audio_b64 = pybase64.b64encode_as_string(result.audio)
 
                     # Send full response
-                    await websocket.send_json({
+                    await _send_json(websocket, {
                         "type": "response",
-                        "transcript": transcription["text"],
-                        "response": chat_result["response"],
+                        "transcript": result.transcript,
+                        "response": result.response,
                         "audio": audio_b64,
-                        "actions": chat_result.get("actions", []),
+                        "actions": result.actions,
                     })
 
+                    if stream_audio:
+                        await _stream_tts(websocket, result.response)
+                    elif result.audio and audio_payload is not None:
+                        await websocket.send_bytes(FRAME_AUDIO + result.audio)
+
                 except Exception as e:
-                    logger.error(f"WS audio processing error: {e}")
-                    await websocket.send_json({
+                    logger.error("WS audio processing error: %s", e)
+                    await _send_json(websocket, {
                         "type": "error",
                         "message": str(e),
                     })
@@ -403,61 +507,133 @@ async def websocket_endpoint(websocket: WebSocket):
                 try:
                     text = message.get("message", "")
                     include_audio = message.get("include_audio", False)
+                    stream_audio = (
+                        include_audio and settings.tts_enabled and message.get("stream_audio", False)
+                    )
 
-                    logger.info(f"WS [{session_id}] Text: {text[:50]}...")
+                    logger.info("WS [%s] Text: %s...", session_id, text[:50])
 
                     # Get conversation history and process with LLM
                     conversation_history = conversation_manager.get_history(session_id)
                     chat_result = await chat_async(text, conversation_history)
-                    logger.info(f"WS [{session_id}] LLM: {chat_result['response'][:50]}...")
+                    response = chat_result["response"]
+                    logger.info("WS [%s] LLM: %s...", session_id, response[:50])
+
+                    # Start TTS right away so synthesis overlaps the bookkeeping below
+                    tts_task = None
+                    if include_audio and settings.tts_enabled and not stream_audio:
+                        tts_task = asyncio.create_task(synthesize_speech_to_wav_async(response))
 
                     # Store exchange in history
-                    conversation_manager.add_exchange(
-                        session_id,
-                        text,
-                        chat_result["response"],
-                    )
+                    conversation_manager.add_exchange(session_id, text, response)
 
                     audio_b64 = None
-                    if include_audio and settings.tts_enabled:
-                        audio_bytes = await synthesize_speech_to_wav_async(chat_result["response"])
+                    if tts_task is not None:
+                        audio_bytes = await tts_task
                         if audio_bytes:
-                            audio_b64 = base64.b64encode(audio_bytes).decode("utf-8")
+                            audio_b64 = pybase64.b64encode_as_string(audio_bytes)
 
-                    await websocket.send_json({
+                    await _send_json(websocket, {
                         "type": "response",
                         "transcript": text,
-                        "response": chat_result["response"],
+                        "response": response,
                         "audio": audio_b64,
                         "actions": chat_result.get("actions", []),
                     })
 
+                    if stream_audio:
+                        await _stream_tts(websocket, response)
+
                 except Exception as e:
-                    logger.error(f"WS [{session_id}] text processing error: {e}")
-                    await websocket.send_json({
+                    logger.error("WS [%s] text processing error: %s", session_id, e)
+                    await _send_json(websocket, {
                         "type": "error",
                         "message": str(e),
                     })
 
             elif msg_type == "ping":
-                await websocket.send_json({"type": "pong"})
+                await websocket.send_text(_MSG_PONG)
 
             else:
-                await websocket.send_json({
+                await _send_json(websocket, {
                     "type": "error",
                     "message": f"Unknown message type: {msg_type}",
                 })
 
     except WebSocketDisconnect:
-        logger.info(f"WebSocket client disconnected (session: {session_id})")
+        logger.info("WebSocket client disconnected (session: %s)", session_id)
         # Clean up conversation history for this session
         conversation_manager.remove_session(session_id)
     except Exception as e:
-        logger.error(f"WebSocket error (session: {session_id}): {e}")
+        logger.error("WebSocket error (session: %s): %s", session_id, e)
         # Clean up on error too
         conversation_manager.remove_session(session_id)
 
 
+# Type tags prefixed to binary WebSocket frames
+FRAME_AUDIO = b"\x00"  # A whole audio file (client audio in, WAV reply out)
+FRAME_TTS_CHUNK = b"\x02"  # One segment of streamed PCM16 speech
+
+
+# Constant WebSocket messages, serialized once
+_MSG_PONG = orjson.dumps({"type": "pong"}).decode()
+_MSG_NO_SPEECH = orjson.dumps({"type": "no_speech"}).decode()
+_MSG_AUDIO_END = orjson.dumps({"type": "audio_end"}).decode()
+_MSG_HISTORY_CLEARED = orjson.dumps({
+    "type": "history_cleared",
+    "message": "Conversation history cleared",
+}).decode()
+
+
+async def _send_json(websocket: WebSocket, message: dict[str, Any]) -> None:
+    """Send a JSON text frame, serialized with orjson."""
+    await websocket.send_text(orjson.dumps(message).decode())
+
+
+async def _stream_tts(websocket: WebSocket, text: str) -> None:
+    """Send synthesized speech as tagged binary PCM16 frames between start/end markers."""
+    await _send_json(websocket, {
+        "type": "audio_start",
+        "sample_rate": KOKORO_SAMPLE_RATE,
+        "codec": "pcm16",
+    })
+    # aclosing stops synthesis if the client goes away
+    async with aclosing(synthesize_speech_stream_async(text)) as stream:
+        async for chunk in stream:
+            await websocket.send_bytes(FRAME_TTS_CHUNK + chunk)
+    await websocket.send_text(_MSG_AUDIO_END)
+
+
+# Headerless 16kHz mono int16 PCM, Whisper's native input layout
+PCM16_16K = "pcm16_16k"
+
+# Container formats decoded through PyAV/FFmpeg (optional "audio" extra)
+COMPRESSED_FORMATS = ("webm", "ogg", "mp3", "m4a", "flac")
+
+# Scale factors for integer PCM -> float32 in [-1, 1)
+_INT16_SCALE = np.float32(1.0 / 32768.0)
+_INT32_SCALE = np.float32(1.0 / 2147483648.0)
+_UINT8_SCALE = np.float32(1.0 / 128.0)
+
+# WAV format tags and integer PCM sample layouts (sample width -> dtype, scale)
+_WAVE_FORMAT_PCM = 0x0001
+_WAVE_FORMAT_EXTENSIBLE = 0xFFFE
+_PCM_DTYPES = {
+    1: (np.dtype(np.uint8), _UINT8_SCALE),
+    2: (np.dtype("<i2"), _INT16_SCALE),
+    4: (np.dtype("<i4"), _INT32_SCALE),
+}
+
+# Container signatures in the first four bytes. WAV also needs "WAVE" at
+# offset 8 since other RIFF payloads (AVI, WebP) share the prefix.
+_MAGIC4 = {
+    b"RIFF": "wav",
+    b"OggS": "ogg",  # OGG (including Opus audio)
+    b"\x1a\x45\xdf\xa3": "webm",  # WebM/Matroska
+    b"fLaC": "flac",
+}
+
+
 def _detect_audio_format(audio_bytes: bytes) -> str | None:
     """
     Detect audio format from magic bytes.
@@ -468,49 +644,82 @@ def _detect_audio_format(audio_bytes: bytes) -> str | None:
     if len(audio_bytes) < 12:
         return None
 
-    # WAV: "RIFF" + size + "WAVE"
-    if audio_bytes[:4] == b"RIFF" and audio_bytes[8:12] == b"WAVE":
-        return "wav"
-
-    # OGG (including WebM audio): "OggS"
-    if audio_bytes[:4] == b"OggS":
-        return "ogg"
-
-    # WebM/Matroska: 0x1A 0x45 0xDF 0xA3
-    if audio_bytes[:4] == b"\x1a\x45\xdf\xa3":
-        return "webm"
+    fmt = _MAGIC4.get(audio_bytes[:4])
+    if fmt == "wav" and audio_bytes[8:12] != b"WAVE":
+        fmt = None
+    if fmt:
+        return fmt
 
-    # MP3: Frame sync (0xFF 0xFB, 0xFF 0xFA, 0xFF 0xF3, 0xFF 0xF2) or ID3 tag
+    # MP3: ID3 tag or frame sync (11 set bits)
     if audio_bytes[:3] == b"ID3" or (audio_bytes[0] == 0xFF and (audio_bytes[1] & 0xE0) == 0xE0):
         return "mp3"
 
     # M4A/AAC: "ftyp" at offset 4
-    if len(audio_bytes) >= 8 and audio_bytes[4:8] == b"ftyp":
+    if audio_bytes[4:8] == b"ftyp":
         return "m4a"
 
-    # FLAC: "fLaC"
-    if audio_bytes[:4] == b"fLaC":
-        return "flac"
-
     return None
 
 
+def _decode_b64_audio(audio_b64: str, format: str | None = None) -> np.ndarray:
+    """Decode a base64 audio payload to a float32 mono 16kHz array."""
+    audio_bytes = pybase64.b64decode(audio_b64, validate=True)
+    return _decode_audio_cached(audio_bytes, format)
+
+
+async def _prepare_audio(audio_b64: str, format: str | None = None) -> np.ndarray:
+    """
+    Decode a base64 audio payload in a worker thread.
+
+    Base64 decoding, WAV parsing and resampling are CPU-bound; running them
+    inline would stall every other WebSocket session on the event loop.
+    """
+    return await asyncio.to_thread(_decode_b64_audio, audio_b64, format)
+
+
+# Decoded arrays keyed by payload hash. Only used in debug mode (test
+# harnesses replaying the same clip) so user audio is never retained.
+_decode_cache = LRUCache(maxsize=128)
+
+
+def _decode_audio_cached(audio_bytes: bytes, format: str | None = None) -> np.ndarray:
+    """Decode audio, reusing the result for identical payloads when debugging."""
+    if not settings.debug:
+        return _decode_audio(audio_bytes, format)
+
+    key = (hashlib.blake2b(audio_bytes, digest_size=16).digest(), (format or "auto").lower())
+    audio = _decode_cache.get(key)
+    if audio is None:
+        audio = _decode_audio(audio_bytes, format)
+        # Shared between requests, so guard against in-place edits
+        audio.flags.writeable = False
+        _decode_cache.set(key, audio)
+    return audio
+
+
 def _decode_audio(audio_bytes: bytes, format: str | None = None) -> np.ndarray:
     """
     Decode audio bytes to numpy array.
 
     Args:
         audio_bytes: Raw audio bytes
-        format: Audio format (wav, webm, etc.) or None for auto-detection
+        format: Audio format (wav, webm, etc.) or None for auto-detection.
+            "pcm16_16k" is headerless 16kHz mono int16, used as is.
 
     Returns:
         Audio as numpy array (float32, mono, resampled to 16kHz)
     """
+    # Fast path for clients that capture in Whisper's native layout:
+    # nothing to detect, parse or resample
+    if format and format.lower() == PCM16_16K:
+        samples = np.frombuffer(audio_bytes, dtype="<i2")
+        return np.multiply(samples, _INT16_SCALE, dtype=np.float32)
+
     # Auto-detect format if not specified or set to "auto"
     if not format or format.lower() == "auto":
         detected = _detect_audio_format(audio_bytes)
         if detected:
-            logger.debug(f"Auto-detected audio format: {detected}")
+            logger.debug("Auto-detected audio format: %s", detected)
             format = detected
         else:
             # Fall back to assuming raw PCM
@@ -518,24 +727,19 @@ def _decode_audio(audio_bytes: bytes, format: str | None = None) -> np.ndarray:
             format = "raw"
 
     if format.lower() == "wav":
-        # Parse WAV file
-        with wave.open(io.BytesIO(audio_bytes), "rb") as wav:
-            sample_rate = wav.getframerate()
-            n_channels = wav.getnchannels()
-            sample_width = wav.getsampwidth()
-            frames = wav.readframes(wav.getnframes())
-
-        # Convert to numpy
-        if sample_width == 2:
-            audio = np.frombuffer(frames, dtype=np.int16).astype(np.float32) / 32768.0
-        elif sample_width == 4:
-            audio = np.frombuffer(frames, dtype=np.int32).astype(np.float32) / 2147483648.0
+        audio, sample_rate = _read_wav(audio_bytes)
+
+        # Convert to mono (sum stereo channels straight into the mono buffer)
+        n_channels = audio.shape[1]
+        if n_channels == 1:
+            audio = audio.reshape(-1)
+        elif n_channels == 2:
+            mono = np.empty(len(audio), dtype=np.float32)
+            np.add(audio[:, 0], audio[:, 1], out=mono)
+            mono *= 0.5
+            audio = mono
         else:
-            audio = np.frombuffer(frames, dtype=np.uint8).astype(np.float32) / 128.0 - 1.0
-
-        # Convert stereo to mono
-        if n_channels == 2:
-            audio = audio.reshape(-1, 2).mean(axis=1)
+            audio = audio.mean(axis=1, dtype=np.float32)
 
         # Resample to 16kHz if needed
         if sample_rate != 16000:
@@ -543,25 +747,185 @@ def _decode_audio(audio_bytes: bytes, format: str | None = None) -> np.ndarray:
 
         return audio
 
-    elif format.lower() in ("webm", "ogg", "mp3", "m4a"):
-        # For other formats, we'd need ffmpeg or similar
-        # For MVP, recommend using WAV from the browser
-        raise ValueError(
-            f"Format '{format}' not directly supported. "
-            "Please convert to WAV in the browser using Web Audio API."
-        )
+    elif format.lower() in COMPRESSED_FORMATS:
+        return _decode_compressed_audio(audio_bytes, format)
 
     else:
         # Assume raw PCM int16 at 16kHz
-        audio = np.frombuffer(audio_bytes, dtype=np.int16).astype(np.float32) / 32768.0
-        return audio
+        samples = np.frombuffer(audio_bytes, dtype=np.int16)
+        return np.multiply(samples, _INT16_SCALE, dtype=np.float32)
+
+
+def _parse_wav_header(buf: bytes) -> tuple[int, int, int, int, int, int]:
+    """
+    Locate the fmt and data chunks of a RIFF/WAVE buffer.
+
+    Returns:
+        Tuple of (format_tag, sample_rate, n_channels, sample_width,
+        data_offset, data_len). WAVE_FORMAT_EXTENSIBLE is resolved to its
+        sub-format tag.
+
+    Raises:
+        ValueError: If the buffer is not a well-formed WAV file
+    """
+    if len(buf) < 12 or buf[:4] != b"RIFF" or buf[8:12] != b"WAVE":
+        raise ValueError("Not a WAV file")
+
+    fmt = None
+    pos = 12
+    while pos + 8 <= len(buf):
+        chunk_id, size = struct.unpack_from("<4sI", buf, pos)
+        body = pos + 8
+
+        if chunk_id == b"fmt ":
+            if size < 16:
+                raise ValueError("Malformed WAV fmt chunk")
+            format_tag, n_channels, sample_rate, _, _, bits = struct.unpack_from(
+                "<HHIIHH", buf, body
+            )
+            if format_tag == _WAVE_FORMAT_EXTENSIBLE and size >= 40:
+                # Sub-format GUID starts with the actual format tag
+                (format_tag,) = struct.unpack_from("<H", buf, body + 24)
+            if n_channels == 0:
+                raise ValueError("Malformed WAV fmt chunk")
+            fmt = (format_tag, sample_rate, n_channels, (bits + 7) // 8)
+
+        elif chunk_id == b"data":
+            if fmt is None:
+                raise ValueError("WAV data chunk precedes fmt chunk")
+            # Streaming writers may leave the size unset; clamp to the buffer
+            return (*fmt, body, min(size, len(buf) - body))
+
+        # Chunks are padded to an even length
+        pos = body + size + (size & 1)
+
+    raise ValueError("WAV file has no data chunk")
+
+
+def _read_wav(audio_bytes: bytes) -> tuple[np.ndarray, int]:
+    """
+    Read a WAV file into a float32 (frames, channels) array.
+
+    Integer PCM (what browsers and most recorders produce) is viewed straight
+    out of the request buffer and converted in one ufunc pass. Other
+    encodings (float, 24-bit) go through libsndfile when soundfile is
+    installed.
+
+    Returns:
+        Tuple of (audio, sample_rate)
+    """
+    format_tag, sample_rate, n_channels, sample_width, offset, data_len = _parse_wav_header(
+        audio_bytes
+    )
+
+    pcm = _PCM_DTYPES.get(sample_width) if format_tag == _WAVE_FORMAT_PCM else None
+    if pcm is not None:
+        dtype, scale = pcm
+        count = data_len // (sample_width * n_channels) * n_channels
+        samples = np.frombuffer(audio_bytes, dtype=dtype, count=count, offset=offset)
+        # Cast and scale in a single ufunc pass
+        audio = np.multiply(samples, scale, dtype=np.float32)
+        if sample_width == 1:
+            np.subtract(audio, np.float32(1.0), out=audio)
+        return audio.reshape(-1, n_channels), sample_rate
+
+    try:
+        import soundfile as sf
+    except ImportError:
+        raise ValueError(
+            f"WAV encoding not supported (format {format_tag}, {sample_width * 8}-bit) "
+            "without soundfile. Install it with: uv sync --extra audio"
+        )
+
+    audio, sample_rate = sf.read(io.BytesIO(audio_bytes), dtype="float32", always_2d=True)
+    return audio, sample_rate
+
+
+def _decode_compressed_audio(audio_bytes: bytes, format: str) -> np.ndarray:
+    """
+    Decode a compressed container (WebM/Opus, OGG, MP3, M4A, FLAC) with PyAV.
+
+    FFmpeg decodes and resamples straight to 16kHz mono int16, so no
+    separate downmix/resample pass is needed.
+
+    Raises:
+        ValueError: If PyAV is not installed or the audio cannot be decoded
+    """
+    try:
+        import av
+    except ImportError:
+        raise ValueError(
+            f"Format '{format}' not directly supported without PyAV. "
+            "Install it with: uv sync --extra audio, "
+            "or convert to WAV in the browser using Web Audio API."
+        )
+
+    try:
+        with av.open(io.BytesIO(audio_bytes)) as container:
+            stream = container.streams.audio[0]
+            resampler = av.AudioResampler(format="s16", layout="mono", rate=16000)
+            chunks = []
+            for frame in container.decode(stream):
+                for resampled in resampler.resample(frame):
+                    chunks.append(resampled.to_ndarray().reshape(-1))
+            # Flush samples buffered inside the resampler
+            for resampled in resampler.resample(None):
+                chunks.append(resampled.to_ndarray().reshape(-1))
+    except (av.error.FFmpegError, IndexError) as e:
+        raise ValueError(f"Failed to decode '{format}' audio: {e}")
+
+    if not chunks:
+        return np.zeros(0, dtype=np.float32)
+
+    return np.multiply(np.concatenate(chunks), _INT16_SCALE, dtype=np.float32)
+
+
+def _warm_audio_decoder() -> None:
+    """
+    Exercise the audio decode path once so the first request doesn't pay for it.
+
+    Decodes a short 44.1kHz stereo WAV (conversion, downmix and resample) and
+    imports PyAV up front when it is installed, since loading the FFmpeg
+    libraries is the slowest part of the first compressed upload.
+    """
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav:
+        wav.setnchannels(2)
+        wav.setsampwidth(2)
+        wav.setframerate(44100)
+        wav.writeframes(np.zeros(2 * 441, dtype=np.int16).tobytes())
+    _decode_audio(buffer.getvalue(), "wav")
+
+    try:
+        import av  # noqa: F401
+    except ImportError:
+        pass
+
+    logger.debug("Audio decoder warmed up")
 
 
 def _resample(audio: np.ndarray, orig_sr: int, target_sr: int) -> np.ndarray:
-    """Simple linear interpolation resampling."""
+    """
+    Resample audio with a polyphase anti-aliasing filter.
+
+    Uses scipy's resample_poly when available (installed with the audio
+    extra), falling back to linear interpolation otherwise.
+    """
     if orig_sr == target_sr:
         return audio
 
+    try:
+        from scipy.signal import resample_poly
+    except ImportError:
+        return _resample_linear(audio, orig_sr, target_sr)
+
+    g = gcd(orig_sr, target_sr)
+    resampled = resample_poly(audio, target_sr // g, orig_sr // g, window=("kaiser", 8.0))
+    return resampled.astype(np.float32, copy=False)
+
+
+def _resample_linear(audio: np.ndarray, orig_sr: int, target_sr: int) -> np.ndarray:
+    """Simple linear interpolation resampling."""
     # Calculate ratio and new length
     ratio = target_sr / orig_sr
     new_length = int(len(audio) * ratio)
@@ -570,18 +934,23 @@ def _resample(audio: np.ndarray, orig_sr: int, target_sr: int) -> np.ndarray:
     indices = np.linspace(0, len(audio) - 1, new_length)
 
     # Interpolate
-    return np.interp(indices, np.arange(len(audio)), audio)
+    return np.interp(indices, np.arange(len(audio)), audio).astype(np.float32, copy=False)
 
 
 def main():
     """Entry point for the application."""
     import uvicorn
 
-    logger.info(f"Starting Belle on {settings.host}:{settings.port}")
+    logger.info("Starting Belle on %s:%s", settings.host, settings.port)
+    # uvloop/httptools/websockets come with uvicorn[standard]; pin them rather
+    # than relying on auto-detection silently falling back to asyncio/h11
     uvicorn.run(
         "belle.main:app",
         host=settings.host,
         port=settings.port,
+        loop="uvloop",
+        http="httptools",
+        ws="websockets",
         reload=settings.debug,
         log_level="debug" if settings.debug else "info",
     )
@@ -4,8 +4,46 @@ MLX Metal command buffers are not thread-safe — concurrent operations from
 different threads cause 'A command encoder is already encoding to this
 command buffer' assertion failures. This lock must be held during any MLX
 inference (STT, LLM, TTS).
+
+Async callers additionally take mlx_async_lock before handing MLX work to a
+worker thread. Requests waiting for the GPU then queue on the event loop
+instead of each parking a pool thread on mlx_lock, leaving the pool free
+for audio decoding and other sessions.
 """
 
+import asyncio
+import logging
 import threading
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
 
 mlx_lock = threading.Lock()
+mlx_async_lock = asyncio.Lock()
+
+
+def prefetch_model(repo: str, allow_patterns: list[str]) -> None:
+    """
+    Download a model's files into the Hugging Face cache without touching MLX.
+
+    Loaders call this before taking mlx_lock, so concurrent preloads overlap
+    their downloads and disk reads instead of queueing behind each other.
+    Failures are logged and left for the real load to report.
+
+    Args:
+        repo: Hugging Face repo ID or local path
+        allow_patterns: Files the loader actually reads; anything else in the
+            repo (PyTorch checkpoints, other quantizations) is skipped
+    """
+    if Path(repo).exists():
+        return
+
+    try:
+        from huggingface_hub import snapshot_download
+    except ImportError:
+        return
+
+    try:
+        snapshot_download(repo, allow_patterns=allow_patterns)
+    except Exception as e:
+        logger.warning(f"Could not prefetch model {repo}: {e}")
@@ -1,34 +1,96 @@
 """Speech-to-Text module using Whisper with MLX optimization."""
 
+import asyncio
+import contextvars
+import copy
+import functools
+import hashlib
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import BinaryIO
 
 import numpy as np
 
 from belle.config import settings
-from belle.mlx_lock import mlx_lock
+from belle.http import LRUCache
+from belle.mlx_lock import mlx_async_lock, mlx_lock, prefetch_model
 
 logger = logging.getLogger(__name__)
 
+# Scale factor for int16 PCM -> float32 in [-1, 1)
+_INT16_SCALE = np.float32(1.0 / 32768.0)
+
 # Lazy-loaded model
 _model = None
 _processor = None
 
+# mlx_whisper.transcribe, resolved once when the model is loaded
+_transcribe_fn = None
+
+# Transcription options derived from settings, built once with the model
+_base_options: dict | None = None
+
+# Files mlx_whisper reads from a model repo (weights ship as .npz or .safetensors)
+_MODEL_FILES = ["*.json", "*.npz", "*.safetensors"]
+
+# Results for repeated audio (replayed test prompts, re-sent clips), keyed by
+# a digest of the samples and language hint
+_transcript_cache = LRUCache(maxsize=settings.whisper_cache_size)
+
+# Transcriptions run on their own thread so they never occupy a default
+# executor worker needed by audio decoding or other blocking calls
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="whisper")
+
+
+def _build_options(model_path: str) -> dict:
+    """Build the mlx_whisper options shared by every transcription."""
+    options = {
+        "path_or_hf_repo": model_path,
+        "verbose": settings.debug,
+        # Temperature for decoding (0 = deterministic greedy)
+        "temperature": settings.whisper_temperature,
+        # Disable to prevent repetition loops / hallucinations
+        "condition_on_previous_text": settings.whisper_condition_on_previous,
+        # Anti-hallucination thresholds
+        "compression_ratio_threshold": settings.whisper_compression_ratio_threshold,
+        "no_speech_threshold": settings.whisper_no_speech_threshold,
+        "logprob_threshold": settings.whisper_logprob_threshold,
+    }
+
+    # Initial prompt (disabled by default to prevent hallucinations).
+    # mlx_whisper only takes it as text and tokenizes it per call (it rebuilds
+    # the decoder prompt from it), so the stripped string is all we can reuse.
+    initial_prompt = (settings.whisper_initial_prompt or "").strip()
+    if initial_prompt:
+        options["initial_prompt"] = initial_prompt
+
+    # Default language from config; None lets Whisper auto-detect
+    if settings.whisper_language:
+        options["language"] = settings.whisper_language
+
+    return options
+
 
 def _load_model():
     """Load Whisper model lazily on first use."""
-    global _model, _processor
+    global _model, _processor, _base_options, _transcribe_fn
 
     if _model is not None:
         return _model, _processor
 
-    logger.info(f"Loading Whisper model: {settings.whisper_model}")
+    import mlx_whisper
 
+    logger.info(f"Loading Whisper model: {settings.whisper_model}")
 
-    # mlx_whisper handles model loading internally
-    _model = settings.whisper_model
+    # mlx_whisper loads the weights itself on first transcription; make sure
+    # they are on disk so that first request doesn't also pay for the download
+    prefetch_model(settings.whisper_model, _MODEL_FILES)
     _processor = None  # mlx_whisper doesn't need separate processor
+    _base_options = _build_options(settings.whisper_model)
+    _transcribe_fn = mlx_whisper.transcribe
+    # Published last: callers that see _model set rely on the fields above
+    _model = settings.whisper_model
 
     logger.info("Whisper model loaded successfully")
     return _model, _processor
@@ -53,48 +115,86 @@ def transcribe_audio(
             - language: Detected or specified language code
             - segments: List of transcription segments with timestamps
     """
-    import mlx_whisper
+    audio, key, result = _precheck(audio, language)
+    if result is not None:
+        return result
 
-    model_path, _ = _load_model()
+    result = _transcribe(audio, language)
+    if key is not None:
+        _transcript_cache.set(key, copy.deepcopy(result))
+    return result
 
-    # Handle different input types
+
+def _precheck(audio: object, language: str | None) -> tuple[object, bytes | None, dict | None]:
+    """
+    Convert raw PCM, then answer silent or repeated audio without Whisper.
+
+    Returns:
+        Tuple of (audio, cache key, result); result is None when Whisper
+        still has to run.
+    """
     if isinstance(audio, bytes):
-        # Convert bytes to numpy array
-        audio = np.frombuffer(audio, dtype=np.int16).astype(np.float32) / 32768.0
-    elif isinstance(audio, (str, Path)):
-        # mlx_whisper can handle file paths directly
-        pass
+        # Zero-copy little-endian int16 view (a trailing odd byte is dropped),
+        # then cast and scale to float32 in one pass
+        samples = np.frombuffer(audio, dtype="<i2", count=len(audio) // 2)
+        audio = np.multiply(samples, _INT16_SCALE, dtype=np.float32)
+
+    # An RMS check costs microseconds; Whisper on silence costs a full decode
+    # and tends to hallucinate text
+    if isinstance(audio, np.ndarray) and is_silent_audio(audio, settings.whisper_silence_rms):
+        logger.debug("Skipping Whisper for silent audio")
+        return audio, None, {
+            "text": "",
+            "language": language or "unknown",
+            "segments": [],
+            "confidence": _calculate_confidence([]),
+        }
 
-    # Build transcription options with anti-hallucination settings
-    options = {
-        "path_or_hf_repo": model_path,
-        "verbose": settings.debug,
-        # Temperature for decoding (0 = deterministic greedy)
-        "temperature": settings.whisper_temperature,
-        # Disable to prevent repetition loops / hallucinations
-        "condition_on_previous_text": settings.whisper_condition_on_previous,
-        # Anti-hallucination thresholds
-        "compression_ratio_threshold": settings.whisper_compression_ratio_threshold,
-        "no_speech_threshold": settings.whisper_no_speech_threshold,
-        "logprob_threshold": settings.whisper_logprob_threshold,
-    }
+    key = _transcript_cache_key(audio, language)
+    if key is not None:
+        cached = _transcript_cache.get(key)
+        if cached is not None:
+            logger.debug("Transcription cache hit")
+            # Copied so a caller mutating its result can't corrupt the cache
+            return audio, key, copy.deepcopy(cached)
 
-    # Initial prompt (disabled by default to prevent hallucinations)
-    if settings.whisper_initial_prompt:
-        options["initial_prompt"] = settings.whisper_initial_prompt
+    return audio, key, None
 
-    # Language can be explicitly set per-request or via config
-    if language:
-        options["language"] = language
-    elif settings.whisper_language:
-        options["language"] = settings.whisper_language
-    # If no language specified, Whisper will auto-detect (helped by initial_prompt)
+
+def _transcript_cache_key(audio: object, language: str | None) -> bytes | None:
+    """
+    Build the transcription cache key for in-memory audio.
+
+    Returns None when the result shouldn't be cached: file inputs, or
+    sampling temperature above 0 (output isn't deterministic).
+    """
+    if settings.whisper_temperature > 0 or not isinstance(audio, np.ndarray):
+        return None
+
+    digest = hashlib.blake2b(np.ascontiguousarray(audio).data, digest_size=16)
+    digest.update(f"\0{audio.dtype.str}\0{language or ''}".encode())
+    return digest.digest()
+
+
+def _transcribe(
+    audio: np.ndarray | bytes | str | Path | BinaryIO,
+    language: str | None = None,
+) -> dict:
+    """Run Whisper on the audio (uncached)."""
+    _load_model()
+
+    # Raw PCM was converted by _precheck; file paths and file-like objects
+    # are handed to mlx_whisper as is
+
+    # Prebuilt anti-hallucination options; a per-request language overrides
+    # the configured one (if neither is set, Whisper auto-detects)
+    options = {**_base_options, "language": language} if language else _base_options
 
     logger.debug(f"Transcribing audio with options: {options}")
 
     # Perform transcription (hold MLX lock to prevent Metal command buffer conflicts)
     with mlx_lock:
-        result = mlx_whisper.transcribe(audio, **options)
+        result = _transcribe_fn(audio, **options)
 
     # Calculate confidence metrics from segments
     segments = result.get("segments", [])
@@ -127,24 +227,23 @@ def _calculate_confidence(segments: list[dict]) -> dict:
             "quality": "low",
         }
 
-    # Extract metrics from segments
-    logprobs = [s.get("avg_logprob", -1.0) for s in segments if "avg_logprob" in s]
-    no_speech_probs = [s.get("no_speech_prob", 0.5) for s in segments if "no_speech_prob" in s]
-
-    avg_logprob = sum(logprobs) / len(logprobs) if logprobs else -1.0
-    avg_no_speech = sum(no_speech_probs) / len(no_speech_probs) if no_speech_probs else 0.5
+    # Extract metrics from segments (C-level reductions instead of list + sum)
+    logprobs = np.fromiter(
+        (s["avg_logprob"] for s in segments if "avg_logprob" in s), dtype=np.float64
+    )
+    no_speech_probs = np.fromiter(
+        (s["no_speech_prob"] for s in segments if "no_speech_prob" in s), dtype=np.float64
+    )
 
-    # Normalize to 0-1 score
-    # avg_logprob typically ranges from -1.0 (low confidence) to 0 (high confidence)
-    # Convert to 0-1 where 1 is best
-    logprob_score = max(0.0, min(1.0, (avg_logprob + 1.0)))
+    avg_logprob = float(logprobs.mean()) if logprobs.size else -1.0
+    avg_no_speech = float(no_speech_probs.mean()) if no_speech_probs.size else 0.5
 
-    # no_speech_prob: 0 = definitely speech, 1 = definitely not speech
-    # Invert so 1 = confident it's speech
-    speech_score = 1.0 - avg_no_speech
-
-    # Combined confidence score (weighted average)
-    confidence_score = 0.7 * logprob_score + 0.3 * speech_score
+    # Combined confidence score (weighted average):
+    # - avg_logprob typically ranges from -1.0 (low confidence) to 0 (high
+    #   confidence); shift and clamp to 0-1 where 1 is best
+    # - no_speech_prob: 0 = definitely speech, 1 = definitely not speech;
+    #   invert so 1 = confident it's speech
+    confidence_score = 0.7 * max(0.0, min(1.0, avg_logprob + 1.0)) + 0.3 * (1.0 - avg_no_speech)
 
     # Quality label
     if confidence_score >= 0.7:
@@ -181,7 +280,9 @@ def is_silent_audio(audio: np.ndarray, threshold: float = 0.01) -> bool:
     """
     if len(audio) == 0:
         return True
-    rms = np.sqrt(np.mean(audio**2))
+    # Sum of squares via a dot product: one pass, no squared temporary
+    flat = audio.ravel()
+    rms = float(np.sqrt(np.dot(flat, flat) / flat.size))
     logger.debug(f"Audio RMS energy: {rms:.6f} (threshold: {threshold})")
     return rms < threshold
 
@@ -272,6 +373,9 @@ def transcribe_audio_file(file_path: str | Path, language: str | None = None) ->
     """
     Transcribe an audio file to text.
 
+    mlx_whisper already decodes long files in 30-second windows. Windows are
+    not transcribed concurrently, since all MLX work is serialized on mlx_lock.
+
     Args:
         file_path: Path to the audio file (WAV, MP3, etc.)
         language: Optional language code
@@ -279,15 +383,49 @@ def transcribe_audio_file(file_path: str | Path, language: str | None = None) ->
     Returns:
         Transcription result dict
     """
+    audio = _read_native_audio_file(Path(file_path))
+    if audio is not None:
+        return transcribe_audio(audio, language=language)
     return transcribe_audio(str(file_path), language=language)
 
 
+# Containers libsndfile reads without an ffmpeg subprocess
+_SOUNDFILE_SUFFIXES = frozenset({".wav", ".flac"})
+
+
+def _read_native_audio_file(path: Path) -> np.ndarray | None:
+    """
+    Read a 16 kHz WAV/FLAC file in-process with soundfile.
+
+    Returns None when mlx_whisper should load the file itself (through
+    ffmpeg): other formats or sample rates, or soundfile not installed.
+    """
+    if path.suffix.lower() not in _SOUNDFILE_SUFFIXES:
+        return None
+    try:
+        import soundfile as sf
+    except ImportError:
+        return None
+
+    try:
+        if sf.info(str(path)).samplerate != 16000:
+            return None  # Whisper's rate; leave resampling to ffmpeg
+        data, _ = sf.read(str(path), dtype="float32", always_2d=True)
+    except RuntimeError as e:  # libsndfile errors, including missing files
+        logger.debug(f"soundfile could not read {path}: {e}")
+        return None
+
+    if data.shape[1] == 1:
+        return data[:, 0]
+    return data.mean(axis=1, dtype=np.float32)
+
+
 async def transcribe_audio_async(
     audio: np.ndarray | bytes,
     language: str | None = None,
 ) -> dict:
     """
-    Async wrapper for transcription (runs in thread pool).
+    Async wrapper for transcription (runs on the dedicated Whisper thread).
 
     Args:
         audio: Audio data
@@ -296,12 +434,46 @@ async def transcribe_audio_async(
     Returns:
         Transcription result dict
     """
-    import asyncio
+    # Silent and repeated audio are answered without waiting for the GPU
+    audio, key, result = _precheck(audio, language)
+    if result is not None:
+        return result
+
+    # Requests are not micro-batched: mlx_whisper.transcribe takes one clip
+    # (its temperature fallback and segment stats are per clip), so concurrent
+    # requests queue on mlx_async_lock and run back to back instead.
+    loop = asyncio.get_running_loop()
+    # Carry the request context (log request ID) over, as asyncio.to_thread does
+    func = functools.partial(contextvars.copy_context().run, _transcribe, audio, language)
+    async with mlx_async_lock:
+        result = await loop.run_in_executor(_executor, func)
+
+    if key is not None:
+        _transcript_cache.set(key, copy.deepcopy(result))
+    return result
+
 
-    return await asyncio.to_thread(transcribe_audio, audio, language)
+def clear_cache() -> None:
+    """Clear cached transcriptions."""
+    _transcript_cache.clear()
 
 
 def preload_model() -> None:
     """Pre-load the Whisper model to avoid cold start latency."""
     _load_model()
+    _warm_up()
     logger.info("Whisper model pre-loaded")
+
+
+def _warm_up() -> None:
+    """
+    Run one second of silence through Whisper.
+
+    mlx_whisper loads the weights and compiles its Metal kernels on the first
+    transcription; doing that here keeps it off the first user request. Goes
+    straight to _transcribe since the silence gate would skip it.
+    """
+    try:
+        _transcribe(np.zeros(16000, dtype=np.float32), "en")
+    except Exception as e:
+        logger.warning(f"Whisper warm-up failed: {e}")
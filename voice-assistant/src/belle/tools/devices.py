@@ -1,11 +1,29 @@
 """Device control tools for Belle."""
 
+import asyncio
 import logging
+import os
+import re
+import time
+from dataclasses import dataclass
+from pathlib import Path
 from typing import Any
 
 import httpx
-
-from belle.http import SmartCache, find_by_name, get_client, get_close_matches_for_name
+import orjson
+
+from belle.config import settings
+from belle.http import (
+    LRUCache,
+    NameIndex,
+    SmartCache,
+    find_by_name,
+    get_api_semaphore,
+    get_client,
+    get_close_matches_for_name,
+    put_json,
+)
+from belle.tools.rooms import SHADE_DEVICE_TYPES, SHADE_NAME_RE, describe_state_update
 
 logger = logging.getLogger(__name__)
 
@@ -144,47 +162,225 @@ DEVICE_TOOLS = [
 _device_cache = SmartCache(base_ttl=30.0, short_ttl=5.0, activity_window=60.0)
 
 
+@dataclass(slots=True, frozen=True)
+class _DeviceViews:
+    """Lookups derived from one fetched device list, rebuilt on refresh."""
+
+    devices: list[dict]  # The list these views were built from
+    by_name: NameIndex
+    # get_all_devices projection, built once per fetch and shared by callers.
+    # Plain dicts: tool results and /devices serialize them as JSON objects,
+    # which tuples or slotted classes would not survive without converting back
+    summaries: list[dict]
+    names: list[str]  # "available_devices" in not-found errors
+    shade_names: list[str]  # control_shade suggestions
+    capabilities: dict[str, dict]  # Device ID -> _get_device_capabilities
+
+
+# Views of the last fetched list; only used while that list is the one in hand
+_device_views: _DeviceViews | None = None
+
+# Names recently not found, with the device list they missed in and their
+# suggestions, so the LLM retrying a typo doesn't rerun the fuzzy matching.
+# A refresh builds a new list, which invalidates them.
+_device_misses = LRUCache(maxsize=64, ttl=5.0)
+
+# Whether the device list persisted by a previous run was checked yet
+_restore_attempted = False
+
+
+def _summarize_device(device: dict) -> dict:
+    """Project a device to the fields listed by get_all_devices."""
+    state = device.get("state") or {}
+    room = device.get("room")
+    return {
+        "id": device.get("id"),
+        "name": device.get("name"),
+        "type": device.get("type"),
+        "room": room.get("name") if room else None,
+        "on": state.get("on"),
+        "brightness": state.get("brightness"),
+        "reachable": device.get("reachable", True),
+    }
+
+
+def _build_views(devices: list[dict]) -> _DeviceViews:
+    """Build the name index and summaries for a fetched device list."""
+    return _DeviceViews(
+        devices=devices,
+        by_name=NameIndex(devices),
+        summaries=[_summarize_device(d) for d in devices],
+        names=[d.get("name") for d in devices],
+        shade_names=_shade_names(devices),
+        capabilities={
+            d["id"]: _get_device_capabilities(d) for d in devices if d.get("id") is not None
+        },
+    )
+
+
+def _current_views(devices: list[dict]) -> _DeviceViews | None:
+    """Get the views built from devices, or None if they are for another list."""
+    views = _device_views
+    if views is not None and views.devices is devices:
+        return views
+    return None
+
+
+def _device_names(devices: list[dict]) -> list[str]:
+    """Get the names of devices, from the views when they were built from this list."""
+    views = _current_views(devices)
+    return views.names if views else [d.get("name") for d in devices]
+
+
+def _find_device(devices: list[dict], device_name: str) -> dict | None:
+    """Find a device by name, using the index built on refresh when it applies."""
+    miss = _device_misses.get(device_name)
+    if miss is not None and miss[0] is devices:
+        return None
+    views = _device_views
+    if views is not None:
+        return views.by_name.find(devices, device_name)
+    return find_by_name(devices, device_name)
+
+
+def _suggest_devices(devices: list[dict], device_name: str) -> list[str]:
+    """Get suggestions for a device name that wasn't found, remembering the miss."""
+    miss = _device_misses.get(device_name)
+    if miss is not None and miss[0] is devices:
+        return miss[1]
+    suggestions = get_close_matches_for_name(devices, device_name)
+    _device_misses.set(device_name, (devices, suggestions))
+    return suggestions
+
+
 async def _refresh_device_cache() -> list[dict]:
-    """Refresh the device cache from the server."""
+    """
+    Refresh the device cache from the server.
+
+    Concurrent callers share a single request instead of each hitting
+    the API when the cache expires.
+    """
+    return await _device_cache.refresh(_fetch_devices)
+
+
+async def _fetch_devices() -> list[dict]:
+    """Fetch devices from the server and store them in the cache."""
+    global _device_views
+
     client = await get_client()
-    response = await client.get("/devices")
+    async with get_api_semaphore():
+        response = await client.get("/devices")
     response.raise_for_status()
-    devices = response.json()
+    devices = [_project_device(d) for d in orjson.loads(response.content)]
+    _device_views = _build_views(devices)
     _device_cache.set(devices)
+
+    asyncio.get_running_loop().run_in_executor(None, _persist_devices, orjson.dumps(devices))
+    return devices
+
+
+# Device fields the tools read; everything else in the API payload is dropped
+# before caching
+_DEVICE_FIELDS = ("id", "name", "type", "deviceType", "state", "reachable", "capabilities")
+
+
+def _project_device(device: dict) -> dict:
+    """Keep only the device fields the tools use (room reduced to its name)."""
+    projected = {key: device[key] for key in _DEVICE_FIELDS if key in device}
+    room = device.get("room")
+    if room:
+        projected["room"] = {"name": room.get("name")}
+    return projected
+
+
+def _device_cache_path() -> Path | None:
+    """Get the persisted device list location, or None if disabled."""
+    if not settings.device_cache_file:
+        return None
+    return Path(settings.device_cache_file).expanduser()
+
+
+def _persist_devices(data: bytes) -> None:
+    """Atomically write the fetched device list for the next process start."""
+    path = _device_cache_path()
+    if path is None:
+        return
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        tmp.write_bytes(data)
+        os.replace(tmp, path)
+    except OSError as e:
+        logger.debug(f"Could not persist device cache: {e}")
+
+
+def _restore_devices() -> list[dict] | None:
+    """
+    Prime the cache from the list persisted by a previous run.
+
+    The file's mtime counts as the fetch time, so a list older than the
+    cache TTL is ignored.
+    """
+    global _device_views
+
+    path = _device_cache_path()
+    if path is None:
+        return None
+    try:
+        age = time.time() - path.stat().st_mtime
+        if age > _device_cache.base_ttl:
+            return None
+        devices = orjson.loads(path.read_bytes())
+    except (OSError, orjson.JSONDecodeError):
+        return None
+    if not isinstance(devices, list):
+        return None
+
+    logger.debug(f"Restored {len(devices)} devices from {path}")
+    _device_views = _build_views(devices)
+    _device_cache.set(devices, age=max(age, 0.0))
     return devices
 
 
 async def _get_cached_devices() -> list[dict]:
     """Get devices from cache or refresh if stale."""
+    global _restore_attempted
+
     cached = _device_cache.get()
     if cached is not None:
         return cached
+
+    # First miss after startup: a list saved moments ago by the previous run
+    # saves the API round trip
+    if not _restore_attempted:
+        _restore_attempted = True
+        restored = _restore_devices()
+        if restored is not None:
+            return restored
+
     return await _refresh_device_cache()
 
 
-async def get_all_devices() -> dict[str, Any]:
+async def get_all_devices(force: bool = False) -> dict[str, Any]:
     """
     Get all available devices.
 
+    Served from the device cache, which control operations clear, so a
+    listing followed by a control call in the same turn costs one fetch.
+
+    Args:
+        force: Fetch from the server even if the cache is fresh
+
     Returns:
         dict with 'devices' list and 'count'
     """
     try:
-        devices = await _refresh_device_cache()  # Always get fresh data
+        devices = await (_refresh_device_cache() if force else _get_cached_devices())
+        views = _current_views(devices)
+        summaries = views.summaries if views else [_summarize_device(d) for d in devices]
         return {
             "success": True,
-            "devices": [
-                {
-                    "id": d.get("id"),
-                    "name": d.get("name"),
-                    "type": d.get("type"),
-                    "room": d.get("room", {}).get("name") if d.get("room") else None,
-                    "on": d.get("state", {}).get("on"),
-                    "brightness": d.get("state", {}).get("brightness"),
-                    "reachable": d.get("reachable", True),
-                }
-                for d in devices
-            ],
+            "devices": summaries,
             "count": len(devices),
         }
     except httpx.HTTPError as e:
@@ -204,15 +400,15 @@ async def get_device_status(device_name: str) -> dict[str, Any]:
     """
     try:
         devices = await _get_cached_devices()
-        device = find_by_name(devices, device_name)
+        device = _find_device(devices, device_name)
 
         if not device:
-            suggestions = get_close_matches_for_name(devices, device_name)
+            suggestions = _suggest_devices(devices, device_name)
             return {
                 "success": False,
                 "error": f"Device '{device_name}' not found",
                 "suggestions": suggestions if suggestions else None,
-                "available_devices": [d.get("name") for d in devices],
+                "available_devices": _device_names(devices),
             }
 
         return {
@@ -232,6 +428,11 @@ async def get_device_status(device_name: str) -> dict[str, Any]:
         return {"success": False, "error": str(e)}
 
 
+# Words suggesting a missed device name was really a room ("kitchen lights");
+# substring matches, so "lights", "bedroom" etc. are covered too
+_ROOM_HINT_RE = re.compile(r"light|room|kitchen|living|office|dining", re.IGNORECASE)
+
+
 async def control_device(
     device_name: str,
     on: bool | None = None,
@@ -254,24 +455,22 @@ async def control_device(
     """
     try:
         devices = await _get_cached_devices()
-        device = find_by_name(devices, device_name)
+        device = _find_device(devices, device_name)
 
         if not device:
             # Check if the search term might be a room name
-            search_lower = device_name.lower()
-            room_indicators = ["lights", "light", "room", "kitchen", "living", "bedroom", "bathroom", "office", "dining"]
-            might_be_room = any(word in search_lower for word in room_indicators)
+            might_be_room = _ROOM_HINT_RE.search(device_name) is not None
 
             error_msg = f"Device '{device_name}' not found"
             if might_be_room:
                 error_msg += ". This looks like a room request - use control_room instead"
 
-            suggestions = get_close_matches_for_name(devices, device_name)
+            suggestions = _suggest_devices(devices, device_name)
             return {
                 "success": False,
                 "error": error_msg,
                 "suggestions": suggestions if suggestions else None,
-                "available_devices": [d.get("name") for d in devices[:10]],  # Limit to first 10
+                "available_devices": _device_names(devices)[:10],  # Limit to first 10
                 "hint": "Use control_room to control all lights in a room" if might_be_room else None,
             }
 
@@ -306,35 +505,27 @@ async def control_device(
         logger.info(f"Controlling device '{device_name}' (id={device_id}) with state: {state_update}")
 
         client = await get_client()
-        response = await client.put(f"/devices/{device_id}", json=state_update)
-
-        # Log response details for debugging
-        logger.info(f"API response status: {response.status_code}")
-        try:
-            response_data = response.json()
-            logger.info(f"API response body: {response_data}")
-        except Exception:
-            logger.info(f"API response text: {response.text}")
+        async with get_api_semaphore():
+            response = await put_json(client, f"/devices/{device_id}", state_update)
+
+        # Log response details for debugging; the body is only decoded when it
+        # will actually be written out
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"API response status: {response.status_code}")
+            try:
+                logger.debug(f"API response body: {orjson.loads(response.content)}")
+            except orjson.JSONDecodeError:
+                logger.debug(f"API response text: {response.text}")
 
         response.raise_for_status()
 
         # Clear cache to get fresh state
         _device_cache.clear()
 
-        action_desc = []
-        if "on" in state_update:
-            action_desc.append("on" if state_update["on"] else "off")
-        if "brightness" in state_update:
-            action_desc.append(f"brightness {state_update['brightness']}%")
-        if "color" in state_update:
-            action_desc.append("color changed")
-        if "colorTemp" in state_update:
-            action_desc.append(f"color temp {state_update['colorTemp']}K")
-
         return {
             "success": True,
             "device": device_name,
-            "action": ", ".join(action_desc),
+            "action": describe_state_update(state_update),
             "state": state_update,
         }
 
@@ -346,6 +537,14 @@ async def control_device(
         return {"success": False, "error": str(e)}
 
 
+def _shade_names(devices: list[dict]) -> list[str]:
+    """Get the names of shade, curtain and blind devices."""
+    return [
+        d.get("name", "") for d in devices
+        if d.get("deviceType") in SHADE_DEVICE_TYPES or SHADE_NAME_RE.search(d.get("name", ""))
+    ]
+
+
 def _is_blind_tilt(device: dict) -> bool:
     """Check if a device is a Blind Tilt type."""
     return device.get("deviceType") == "Blind Tilt"
@@ -353,6 +552,9 @@ def _is_blind_tilt(device: dict) -> bool:
 
 TILT_POSITIONS = ["closed-up", "half-open", "open", "half-closed", "closed-down"]
 
+# Tilt position for each 25% step of a 0-100 position request
+_TILT_BY_QUARTER = ("closed-down", "half-closed", "open", "half-open", "closed-up")
+
 
 async def control_shade(
     device_name: str,
@@ -372,23 +574,16 @@ async def control_shade(
     """
     try:
         devices = await _get_cached_devices()
-        device = find_by_name(devices, device_name)
+        device = _find_device(devices, device_name)
 
         if not device:
-            # Filter to show only shade-type devices
-            shade_devices = [
-                d.get("name") for d in devices
-                if d.get("deviceType") in ["Curtain", "Curtain3", "Blind Tilt", "Roller Shade"]
-                or "shade" in d.get("name", "").lower()
-                or "curtain" in d.get("name", "").lower()
-                or "blind" in d.get("name", "").lower()
-                or "persiana" in d.get("name", "").lower()
-                or "cortina" in d.get("name", "").lower()
-            ]
+            # Show only shade-type devices
+            views = _current_views(devices)
+            shade_devices = views.shade_names if views else _shade_names(devices)
             return {
                 "success": False,
                 "error": f"Shade '{device_name}' not found",
-                "available_shades": shade_devices if shade_devices else [d.get("name") for d in devices],
+                "available_shades": shade_devices or _device_names(devices),
             }
 
         # Check if this is a Blind Tilt device
@@ -422,12 +617,12 @@ async def control_shade(
         elif action == "position":
             if position is None:
                 return {"success": False, "error": "Position is required for 'position' action"}
+            position = max(0, min(100, position))
             if is_blind_tilt:
-                # Map position percentage to nearest tilt position
-                tilt_map = {0: "closed-down", 25: "half-closed", 50: "open", 75: "half-open", 100: "closed-up"}
-                nearest = min(tilt_map.keys(), key=lambda k: abs(k - position))
-                state_update["tiltPosition"] = tilt_map[nearest]
-                state_update["on"] = tilt_map[nearest] == "open"
+                # Round to the nearest 25% step (ties go down)
+                tilt = _TILT_BY_QUARTER[(position + 12) // 25]
+                state_update["tiltPosition"] = tilt
+                state_update["on"] = tilt == "open"
             else:
                 state_update["brightness"] = position
                 state_update["on"] = position > 0
@@ -441,7 +636,8 @@ async def control_shade(
         logger.info(f"Controlling shade '{device_display_name}' (id={device_id}) with action: {action}, state: {state_update}")
 
         client = await get_client()
-        response = await client.put(f"/devices/{device_id}", json=state_update)
+        async with get_api_semaphore():
+            response = await put_json(client, f"/devices/{device_id}", state_update)
         response.raise_for_status()
 
         # Clear cache to get fresh state
@@ -472,10 +668,6 @@ async def control_shade(
         return {"success": False, "error": str(e)}
 
 
-# Shade device types for capability detection
-SHADE_DEVICE_TYPES = ["Curtain", "Curtain3", "Blind Tilt", "Roller Shade"]
-
-
 def _get_device_capabilities(device: dict) -> dict[str, Any]:
     """
     Analyze a device and return its capabilities.
@@ -485,12 +677,11 @@ def _get_device_capabilities(device: dict) -> dict[str, Any]:
     """
     state = device.get("state", {})
     device_type = device.get("deviceType") or device.get("type", "")
-    name_lower = device.get("name", "").lower()
 
     # Check if it's a shade device
     is_shade = (
         device_type in SHADE_DEVICE_TYPES
-        or any(kw in name_lower for kw in ["shade", "curtain", "blind", "persiana", "cortina"])
+        or SHADE_NAME_RE.search(device.get("name", "")) is not None
     )
 
     # Check if it's a Blind Tilt (special handling)
@@ -509,6 +700,29 @@ def _get_device_capabilities(device: dict) -> dict[str, Any]:
     return capabilities
 
 
+# Help templates for get_device_help, keyed by the capability they need
+_LIGHT_HELP = (
+    ("on_off", "• Turn on/off: 'turn on {name}', 'turn off {name}'"),
+    ("brightness", "• Set brightness: 'set {name} to 50%', 'dim {name}', 'brighten {name}'"),
+    ("color", "• Set color: 'set {name} to red', 'make {name} blue'"),
+    ("color_temp", "• Set warmth: 'make {name} warmer', 'set {name} to cool white'"),
+)
+_SHADE_HELP = (
+    "• Open/close: 'open the {name}', 'close the {name}'",
+    "• Set position: 'set {name} to 50%'",
+)
+_BLIND_TILT_HELP = (
+    "• Note: This is a blind with tilting slats. 'Open' sets horizontal slats, 'close' tilts them down."
+)
+_SUMMARY_PARTS = (
+    ("on_off", "turn it on/off"),
+    ("brightness", "adjust brightness"),
+    ("color", "change color"),
+    ("color_temp", "adjust color temperature"),
+    ("is_shade", "open/close it"),
+)
+
+
 async def get_device_help(device_name: str) -> dict[str, Any]:
     """
     Get help about what you can do with a device.
@@ -521,43 +735,36 @@ async def get_device_help(device_name: str) -> dict[str, Any]:
     """
     try:
         devices = await _get_cached_devices()
-        device = find_by_name(devices, device_name)
+        device = _find_device(devices, device_name)
 
         if not device:
-            suggestions = get_close_matches_for_name(devices, device_name)
+            suggestions = _suggest_devices(devices, device_name)
             return {
                 "success": False,
                 "error": f"Device '{device_name}' not found",
                 "suggestions": suggestions if suggestions else None,
             }
 
-        caps = _get_device_capabilities(device)
+        views = _current_views(devices)
+        caps = views.capabilities.get(device.get("id")) if views else None
+        if caps is None:
+            caps = _get_device_capabilities(device)
         device_display_name = device.get("name")
         device_type = device.get("deviceType") or device.get("type", "unknown")
 
         # Build help text based on capabilities
-        actions = []
-
         if caps["is_shade"]:
-            actions.append("• Open/close: 'open the {name}', 'close the {name}'")
-            actions.append("• Set position: 'set {name} to 50%'")
+            actions = list(_SHADE_HELP)
             if caps["is_blind_tilt"]:
-                actions.append("• Note: This is a blind with tilting slats. 'Open' sets horizontal slats, 'close' tilts them down.")
+                actions.append(_BLIND_TILT_HELP)
         else:
-            if caps["on_off"]:
-                actions.append("• Turn on/off: 'turn on {name}', 'turn off {name}'")
-            if caps["brightness"]:
-                actions.append("• Set brightness: 'set {name} to 50%', 'dim {name}', 'brighten {name}'")
-            if caps["color"]:
-                actions.append("• Set color: 'set {name} to red', 'make {name} blue'")
-            if caps["color_temp"]:
-                actions.append("• Set warmth: 'make {name} warmer', 'set {name} to cool white'")
+            actions = [template for cap, template in _LIGHT_HELP if caps[cap]]
 
         if not actions:
-            actions.append("• Turn on/off: 'turn on {name}', 'turn off {name}'")
+            actions.append(_LIGHT_HELP[0][1])
 
-        # Format help text
         help_lines = [a.format(name=device_display_name) for a in actions]
+        abilities = ", ".join(part for cap, part in _SUMMARY_PARTS if caps[cap])
 
         return {
             "success": True,
@@ -565,13 +772,8 @@ async def get_device_help(device_name: str) -> dict[str, Any]:
             "type": device_type,
             "capabilities": caps,
             "help": help_lines,
-            "summary": f"{device_display_name} is a {device_type}. You can: " + ", ".join(
-                ["turn it on/off"] if caps["on_off"] else []
-                + (["adjust brightness"] if caps["brightness"] else [])
-                + (["change color"] if caps["color"] else [])
-                + (["adjust color temperature"] if caps["color_temp"] else [])
-                + (["open/close it"] if caps["is_shade"] else [])
-            ) or "control it with basic on/off commands",
+            "summary": f"{device_display_name} is a {device_type}. You can: "
+            + (abilities or "control it with basic on/off commands"),
         }
 
     except httpx.HTTPError as e:
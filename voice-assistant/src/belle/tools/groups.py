@@ -1,12 +1,26 @@
 """Device group control tools for Belle."""
 
+import asyncio
 import logging
 from typing import Any
 
 import httpx
 
-from belle.http import SmartCache, find_by_name, get_client, get_close_matches_for_name
-from belle.tools.rooms import SHADE_DEVICE_TYPES
+from belle.http import (
+    NameIndex,
+    SmartCache,
+    find_by_name,
+    get_api_semaphore,
+    get_client,
+    get_close_matches_for_name,
+)
+from belle.tools.rooms import (
+    SHADE_DEVICE_TYPES,
+    SHADE_NAME_RE,
+    describe_state_update,
+    put_device_state,
+    put_device_states,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -61,26 +75,49 @@ GROUP_TOOLS = [
 
 
 # Shared cache instance
-# Smart cache: 30s normally, 5s after control operations
-_group_cache = SmartCache(base_ttl=30.0, short_ttl=5.0, activity_window=60.0)
+# Smart cache: 30s normally, 5s after control operations. An expired list is
+# still served for up to 5 minutes while a fresh one is fetched in the background
+_group_cache = SmartCache(base_ttl=30.0, short_ttl=5.0, activity_window=60.0, max_stale=300.0)
+
+# Name index for the last fetched group list, rebuilt on refresh
+_group_index: NameIndex | None = None
 
 
 async def _refresh_group_cache() -> list[dict]:
-    """Refresh the group cache from the server."""
+    """
+    Refresh the group cache from the server.
+
+    Concurrent callers share a single request instead of each hitting
+    the API when the cache expires.
+    """
+    return await _group_cache.refresh(_fetch_groups)
+
+
+async def _fetch_groups() -> list[dict]:
+    """Fetch groups from the server and store them in the cache."""
+    global _group_index
+
     client = await get_client()
-    response = await client.get("/groups")
+    async with get_api_semaphore():
+        response = await client.get("/groups")
     response.raise_for_status()
     groups = response.json()
+    _group_index = NameIndex(groups)
     _group_cache.set(groups)
     return groups
 
 
+def _find_group(groups: list[dict], group_name: str) -> dict | None:
+    """Find a group by name, using the index built on refresh when it applies."""
+    index = _group_index
+    if index is not None:
+        return index.find(groups, group_name)
+    return find_by_name(groups, group_name)
+
+
 async def _get_cached_groups() -> list[dict]:
     """Get groups from cache or refresh if stale."""
-    cached = _group_cache.get()
-    if cached is not None:
-        return cached
-    return await _refresh_group_cache()
+    return await _group_cache.get_or_refresh(_fetch_groups)
 
 
 async def get_all_groups() -> dict[str, Any]:
@@ -131,7 +168,7 @@ async def control_group(
     """
     try:
         groups = await _get_cached_groups()
-        group = find_by_name(groups, group_name)
+        group = _find_group(groups, group_name)
 
         if not group:
             suggestions = get_close_matches_for_name(groups, group_name)
@@ -174,43 +211,32 @@ async def control_group(
                 "devices_controlled": 0,
             }
 
-        # Control each light device individually (skipping shades)
+        # Control each light device individually (skipping shades), all at once
+        # so the group switches in about one round trip instead of one per light
         client = await get_client()
-        results = []
         logger.info(f"Controlling {len(light_devices)} lights in group '{group.get('name')}' with state: {state_update}")
 
-        for membership in light_devices:
-            device = membership.get("device", membership)
-            device_id = device.get("externalId") or device.get("id")
-            device_name = device.get("name")
-            try:
-                response = await client.put(f"/devices/{device_id}", json=state_update)
-                response.raise_for_status()
-                results.append({"device": device_name, "success": True})
-            except httpx.HTTPStatusError as e:
-                logger.error(f"HTTP error for '{device_name}': {e.response.status_code}")
-                results.append({"device": device_name, "success": False, "error": str(e)})
-            except httpx.HTTPError as e:
-                logger.error(f"Error for '{device_name}': {e}")
-                results.append({"device": device_name, "success": False, "error": str(e)})
-
-        # Clear cache
-        _group_cache.clear()
-
-        action_desc = []
-        if "on" in state_update:
-            action_desc.append("on" if state_update["on"] else "off")
-        if "brightness" in state_update:
-            action_desc.append(f"brightness {state_update['brightness']}%")
-        if "colorTemp" in state_update:
-            action_desc.append(f"color temp {state_update['colorTemp']}K")
+        results = await put_device_states(
+            client, [(m.get("device", m), state_update) for m in light_devices]
+        )
+        if results is None:
+            results = list(await asyncio.gather(
+                *(
+                    put_device_state(client, m.get("device", m), state_update, kind="light")
+                    for m in light_devices
+                )
+            ))
+
+        # Membership doesn't change when a group's lights do: update the cached
+        # device states in place instead of dropping the cache and refetching
+        _apply_state_update(light_devices, results, state_update)
 
         success_count = sum(1 for r in results if r.get("success"))
 
         return {
             "success": success_count > 0,
             "group": group.get("name"),
-            "action": ", ".join(action_desc),
+            "action": describe_state_update(state_update),
             "devices_controlled": success_count,
             "total_devices": len(light_devices),
             "results": results,
@@ -221,13 +247,30 @@ async def control_group(
         return {"success": False, "error": str(e)}
 
 
+def _apply_state_update(
+    memberships: list[dict],
+    results: list[dict],
+    state_update: dict[str, Any],
+) -> None:
+    """Merge a state update into the cached devices whose result reports success."""
+    accepted = {result.get("device") for result in results if result.get("success")}
+    for membership in memberships:
+        device = membership.get("device", membership)
+        if device.get("name") not in accepted:
+            continue
+        state = device.get("state")
+        if isinstance(state, dict):
+            state.update(state_update)
+        else:
+            device["state"] = dict(state_update)
+
+
 def _is_shade_device(device: dict) -> bool:
     """Check if a device is a shade/curtain/blind."""
     device_type = device.get("deviceType") or device.get("type")
     if device_type in SHADE_DEVICE_TYPES:
         return True
-    name_lower = (device.get("name") or "").lower()
-    return any(kw in name_lower for kw in ["shade", "curtain", "blind", "persiana", "cortina"])
+    return SHADE_NAME_RE.search(device.get("name") or "") is not None
 
 
 # Map tool names to functions
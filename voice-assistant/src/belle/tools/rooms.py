@@ -1,16 +1,32 @@
 """Room control tools for Belle."""
 
+import asyncio
 import logging
+import re
 from typing import Any
 
 import httpx
-
-from belle.http import SmartCache, find_by_name, get_client, get_close_matches_for_name
+import orjson
+
+from belle.config import settings
+from belle.http import (
+    NameIndex,
+    SmartCache,
+    find_by_name,
+    get_api_semaphore,
+    get_client,
+    get_close_matches_for_name,
+    get_device_put_semaphore,
+    put_json,
+)
 
 logger = logging.getLogger(__name__)
 
 # Shade device types
-SHADE_DEVICE_TYPES = ["Curtain", "Curtain3", "Blind Tilt", "Roller Shade"]
+SHADE_DEVICE_TYPES = frozenset({"Curtain", "Curtain3", "Blind Tilt", "Roller Shade"})
+
+# Name keywords marking a shade whose type isn't one of the above (EN + PT)
+SHADE_NAME_RE = re.compile(r"shade|curtain|blind|persiana|cortina", re.IGNORECASE)
 
 # Tool definitions for the LLM
 ROOM_TOOLS = [
@@ -91,26 +107,68 @@ ROOM_TOOLS = [
 
 
 # Shared cache instance
-# Smart cache: 30s normally, 5s after control operations
-_room_cache = SmartCache(base_ttl=30.0, short_ttl=5.0, activity_window=60.0)
+# Smart cache: 30s normally, 5s after control operations. An expired list is
+# still served for up to 5 minutes while a fresh one is fetched in the background.
+# Room commands don't clear it: the list includes each device's last known
+# state, but callers only read membership, names and types from it, which a
+# state change doesn't touch
+_room_cache = SmartCache(base_ttl=30.0, short_ttl=5.0, activity_window=60.0, max_stale=300.0)
+
+# Name index for the last fetched room list, rebuilt on refresh
+_room_index: NameIndex | None = None
 
 
 async def _refresh_room_cache() -> list[dict]:
-    """Refresh the room cache from the server."""
+    """
+    Refresh the room cache from the server.
+
+    Concurrent callers share a single request instead of each hitting
+    the API when the cache expires.
+    """
+    return await _room_cache.refresh(_fetch_rooms)
+
+
+async def _fetch_rooms() -> list[dict]:
+    """Fetch rooms from the server and store them in the cache."""
+    global _room_index
+
     client = await get_client()
-    response = await client.get("/rooms")
+    async with get_api_semaphore():
+        response = await client.get("/rooms")
     response.raise_for_status()
     rooms = response.json()
+    _room_index = NameIndex(rooms)
     _room_cache.set(rooms)
     return rooms
 
 
+def _find_room(rooms: list[dict], room_name: str) -> dict | None:
+    """Find a room by name, using the index built on refresh when it applies."""
+    index = _room_index
+    if index is not None:
+        return index.find(rooms, room_name)
+    return find_by_name(rooms, room_name)
+
+
 async def _get_cached_rooms() -> list[dict]:
     """Get rooms from cache or refresh if stale."""
-    cached = _room_cache.get()
-    if cached is not None:
-        return cached
-    return await _refresh_room_cache()
+    return await _room_cache.get_or_refresh(_fetch_rooms)
+
+
+# How each state-update field reads in an action description, in output order
+_ACTION_FORMATTERS = (
+    ("on", lambda on: "on" if on else "off"),
+    ("brightness", "brightness {}%".format),
+    ("color", lambda _: "color changed"),
+    ("colorTemp", "color temp {}K".format),
+)
+
+
+def describe_state_update(state_update: dict[str, Any]) -> str:
+    """Describe a light state update for a tool result, e.g. "on, brightness 50%"."""
+    return ", ".join(
+        fmt(state_update[key]) for key, fmt in _ACTION_FORMATTERS if key in state_update
+    )
 
 
 async def get_all_rooms() -> dict[str, Any]:
@@ -141,6 +199,89 @@ async def get_all_rooms() -> dict[str, Any]:
         return {"success": False, "error": str(e)}
 
 
+async def put_device_state(
+    client: httpx.AsyncClient,
+    device: dict,
+    state_update: dict[str, Any],
+    kind: str = "device",
+) -> dict[str, Any]:
+    """Send a state update to one device, returning its result entry."""
+    device_id = device.get("externalId") or device.get("id")
+    device_name = device.get("name")
+    try:
+        logger.info(f"  Sending to {kind} '{device_name}' (id={device_id}): {state_update}")
+        async with get_device_put_semaphore(), get_api_semaphore():
+            response = await put_json(client, f"/devices/{device_id}", state_update)
+        logger.info(f"  Response for '{device_name}': {response.status_code}")
+        response.raise_for_status()
+        return {"device": device_name, "success": True}
+    except httpx.HTTPStatusError as e:
+        logger.error(f"  HTTP error for '{device_name}': {e.response.status_code} - {e.response.text}")
+        return {"device": device_name, "success": False, "error": str(e)}
+    except httpx.HTTPError as e:
+        logger.error(f"  Error for '{device_name}': {e}")
+        return {"device": device_name, "success": False, "error": str(e)}
+
+
+# Whether the API accepts PUT /devices/bulk. Cleared when it answers 404/405
+# (an older server); commands then send one PUT per device
+_bulk_supported = True
+
+
+async def put_device_states(
+    client: httpx.AsyncClient,
+    updates: list[tuple[dict, dict[str, Any]]],
+) -> list[dict[str, Any]] | None:
+    """
+    Send (device, state update) pairs in a single PUT /devices/bulk request.
+
+    Returns:
+        Result entries in the order of updates, or None when bulk updates are
+        disabled or unsupported and the caller should PUT each device itself
+    """
+    global _bulk_supported
+
+    if not (settings.bulk_device_updates and _bulk_supported):
+        return None
+
+    names = [device.get("name") for device, _ in updates]
+    payload = [
+        {"id": device.get("externalId") or device.get("id"), "state": state_update}
+        for device, state_update in updates
+    ]
+    try:
+        async with get_api_semaphore():
+            response = await put_json(client, "/devices/bulk", payload)
+        if response.status_code in (404, 405):
+            logger.info("Smart Home API has no bulk update endpoint, sending one PUT per device")
+            _bulk_supported = False
+            return None
+        response.raise_for_status()
+        entries = orjson.loads(response.content)["results"]
+    except (httpx.HTTPError, orjson.JSONDecodeError, KeyError, TypeError) as e:
+        logger.error(f"  Bulk update of {len(updates)} devices failed: {e}")
+        return [{"device": name, "success": False, "error": str(e)} for name in names]
+
+    # Every device needs a result; a short or malformed reply can't be paired up
+    if (
+        not isinstance(entries, list)
+        or len(entries) != len(updates)
+        or not all(isinstance(entry, dict) for entry in entries)
+    ):
+        error = f"Bulk update returned unexpected results for {len(updates)} devices"
+        logger.error(f"  {error}: {entries!r}")
+        return [{"device": name, "success": False, "error": error} for name in names]
+
+    results = []
+    for name, entry in zip(names, entries):
+        if entry.get("success"):
+            results.append({"device": name, "success": True})
+        else:
+            logger.error(f"  Error for '{name}': {entry.get('error')}")
+            results.append({"device": name, "success": False, "error": entry.get("error")})
+    return results
+
+
 async def control_room(
     room_name: str,
     on: bool | None = None,
@@ -161,7 +302,7 @@ async def control_room(
     """
     try:
         rooms = await _get_cached_rooms()
-        room = find_by_name(rooms, room_name)
+        room = _find_room(rooms, room_name)
 
         if not room:
             suggestions = get_close_matches_for_name(rooms, room_name)
@@ -200,43 +341,22 @@ async def control_room(
         if not state_update:
             return {"success": False, "error": "No state changes specified"}
 
-        # Control each device in the room
+        # Control every device in the room at once, so the room takes about
+        # one round trip instead of one per device
         client = await get_client()
-        results = []
         logger.info(f"Controlling {len(devices)} devices in room '{room.get('name')}' with state: {state_update}")
 
-        for device in devices:
-            device_id = device.get("externalId") or device.get("id")
-            device_name = device.get("name")
-            try:
-                logger.info(f"  Sending to device '{device_name}' (id={device_id})")
-                response = await client.put(f"/devices/{device_id}", json=state_update)
-                logger.info(f"  Response for '{device_name}': {response.status_code}")
-                response.raise_for_status()
-                results.append({"device": device_name, "success": True})
-            except httpx.HTTPStatusError as e:
-                logger.error(f"  HTTP error for '{device_name}': {e.response.status_code} - {e.response.text}")
-                results.append({"device": device_name, "success": False, "error": str(e)})
-            except httpx.HTTPError as e:
-                logger.error(f"  Error for '{device_name}': {e}")
-                results.append({"device": device_name, "success": False, "error": str(e)})
-
-        # Clear cache
-        _room_cache.clear()
+        results = await put_device_states(client, [(device, state_update) for device in devices])
+        if results is None:
+            results = list(await asyncio.gather(
+                *(put_device_state(client, device, state_update) for device in devices)
+            ))
 
         success_count = sum(1 for r in results if r["success"])
-        action_desc = []
-        if "on" in state_update:
-            action_desc.append("on" if state_update["on"] else "off")
-        if "brightness" in state_update:
-            action_desc.append(f"brightness {state_update['brightness']}%")
-        if "colorTemp" in state_update:
-            action_desc.append(f"color temp {state_update['colorTemp']}K")
-
         return {
             "success": success_count > 0,
             "room": room.get("name"),
-            "action": ", ".join(action_desc),
+            "action": describe_state_update(state_update),
             "devices_controlled": success_count,
             "total_devices": len(devices),
             "results": results,
@@ -252,8 +372,7 @@ def _is_shade_device(device: dict) -> bool:
     device_type = device.get("deviceType") or device.get("type")
     if device_type in SHADE_DEVICE_TYPES:
         return True
-    name_lower = (device.get("name") or "").lower()
-    return any(kw in name_lower for kw in ["shade", "curtain", "blind", "persiana", "cortina"])
+    return SHADE_NAME_RE.search(device.get("name") or "") is not None
 
 
 def _is_blind_tilt(device: dict) -> bool:
@@ -285,7 +404,8 @@ def _get_shade_state_update(device: dict, action: str, position: int | None) ->
         if is_blind_tilt:
             # Convert visual openness to Blind Tilt position
             # 100% openness -> position 50, 0% openness -> position 0
-            state_update["brightness"] = int(position / 2)
+            # (out-of-range values from the LLM are clamped)
+            state_update["brightness"] = max(0, min(50, position // 2))
         else:
             state_update["brightness"] = position
         state_update["on"] = position > 0
@@ -311,7 +431,7 @@ async def control_room_shades(
     """
     try:
         rooms = await _get_cached_rooms()
-        room = find_by_name(rooms, room_name)
+        room = _find_room(rooms, room_name)
 
         if not room:
             suggestions = get_close_matches_for_name(rooms, room_name)
@@ -338,31 +458,18 @@ async def control_room_shades(
         if action == "position" and position is None:
             return {"success": False, "error": "Position is required for 'position' action"}
 
-        # Control each shade device in the room
+        # Control every shade in the room at once, so they start moving together
         client = await get_client()
-        results = []
         logger.info(f"Controlling {len(shade_devices)} shades in room '{room.get('name')}' with action: {action}")
 
-        for device in shade_devices:
-            device_id = device.get("externalId") or device.get("id")
-            device_name = device.get("name")
-            state_update = _get_shade_state_update(device, action, position)
-
-            try:
-                logger.info(f"  Sending to shade '{device_name}' (id={device_id}): {state_update}")
-                response = await client.put(f"/devices/{device_id}", json=state_update)
-                logger.info(f"  Response for '{device_name}': {response.status_code}")
-                response.raise_for_status()
-                results.append({"device": device_name, "success": True})
-            except httpx.HTTPStatusError as e:
-                logger.error(f"  HTTP error for '{device_name}': {e.response.status_code} - {e.response.text}")
-                results.append({"device": device_name, "success": False, "error": str(e)})
-            except httpx.HTTPError as e:
-                logger.error(f"  Error for '{device_name}': {e}")
-                results.append({"device": device_name, "success": False, "error": str(e)})
-
-        # Clear cache
-        _room_cache.clear()
+        updates = [
+            (device, _get_shade_state_update(device, action, position)) for device in shade_devices
+        ]
+        results = await put_device_states(client, updates)
+        if results is None:
+            results = list(await asyncio.gather(
+                *(put_device_state(client, device, state, "shade") for device, state in updates)
+            ))
 
         success_count = sum(1 for r in results if r["success"])
 
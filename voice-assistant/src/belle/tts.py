@@ -1,28 +1,62 @@
 """Text-to-Speech module using Kokoro-82M via mlx-audio for Belle's voice."""
 
+import asyncio
+import contextlib
+import functools
+import hashlib
 import io
 import logging
+import threading
 import time
 import wave
+from collections.abc import AsyncIterator, Iterator
 
 import numpy as np
 
 from belle.config import settings
-from belle.mlx_lock import mlx_lock
+from belle.http import LRUCache
+from belle.mlx_lock import mlx_async_lock, mlx_lock, prefetch_model
 
 logger = logging.getLogger(__name__)
 
 # Lazy-loaded pipeline
 _pipeline = None
 
+# Startup preload and the first request may race to load the pipeline
+_load_lock = threading.Lock()
+
+# Synthesized WAVs for repeated replies ("Done!", "Ok, lights are off")
+_wav_cache = LRUCache(maxsize=settings.tts_cache_size)
+
+# Longer replies rarely repeat; keep them from evicting the short ones
+_WAV_CACHE_MAX_CHARS = 200
+
+# In-flight WAV syntheses by cache key, shared by concurrent identical requests
+_wav_flights: dict[bytes, asyncio.Task] = {}
+
+# Files mlx_audio's load_model reads from a model repo
+_MODEL_FILES = [
+    "*.json",
+    "*.safetensors",
+    "*.py",
+    "*.model",
+    "*.tiktoken",
+    "*.txt",
+    "*.jsonl",
+    "*.yaml",
+]
+
 # Kokoro sample rate
 KOKORO_SAMPLE_RATE = 24000
 
+# Kokoro only splits on newlines by default, so a one-paragraph reply is a
+# single segment; streaming splits after each sentence so the first one can
+# play while the rest is synthesized
+_STREAM_SPLIT_PATTERN = r"\n+|(?<=[.!?])\s+"
+
 
 def _load_model():
     """Load Kokoro TTS pipeline lazily on first use."""
-    global _pipeline
-
     if _pipeline is not None:
         return _pipeline
 
@@ -30,18 +64,31 @@ def _load_model():
         logger.warning("TTS is disabled. Enable with BELLE_TTS_ENABLED=true")
         return None
 
+    with _load_lock:
+        if _pipeline is not None:
+            return _pipeline
+        return _load_pipeline()
+
+
+def _load_pipeline():
+    """Load the Kokoro pipeline; callers hold _load_lock."""
+    global _pipeline
+
     logger.info(f"Loading TTS model: {settings.tts_model}")
 
     try:
+        from mlx_audio.tts.models.kokoro.pipeline import KokoroPipeline
         from mlx_audio.tts.utils import load_model
 
-        model = load_model(settings.tts_model)
-
-        from mlx_audio.tts.models.kokoro.pipeline import KokoroPipeline
+        # Fetch weights before taking the lock so other loaders aren't blocked on I/O
+        prefetch_model(settings.tts_model, _MODEL_FILES)
 
-        _pipeline = KokoroPipeline(
-            model=model, repo_id=settings.tts_model, lang_code="a"
-        )
+        # Model loading runs MLX ops; don't overlap with other MLX work
+        with mlx_lock:
+            model = load_model(settings.tts_model)
+            _pipeline = KokoroPipeline(
+                model=model, repo_id=settings.tts_model, lang_code="a"
+            )
 
         logger.info("TTS model loaded successfully")
         return _pipeline
@@ -87,20 +134,24 @@ def synthesize_speech(
     with mlx_lock:
         for result in pipeline(text, voice=voice_id, speed=speed):
             if result.audio is not None:
-                chunk = np.array(result.audio, dtype=np.float32).squeeze()
-                chunks.append(chunk)
+                # asarray + reshape skips the copy when the layout already matches
+                chunks.append(np.asarray(result.audio, dtype=np.float32).reshape(-1))
 
     if not chunks:
         logger.warning("TTS produced no audio chunks")
         return None
 
-    # Concatenate all chunks into a single array
-    audio = np.concatenate(chunks)
+    # Copy the chunks into one preallocated buffer
+    audio = np.empty(sum(chunk.size for chunk in chunks), dtype=np.float32)
+    offset = 0
+    for chunk in chunks:
+        audio[offset : offset + chunk.size] = chunk
+        offset += chunk.size
 
-    # Normalize to [-1, 1]
-    max_val = np.abs(audio).max()
+    # Normalize to [-1, 1]; two reductions avoid an abs() temporary the size of the audio
+    max_val = max(float(audio.max()), -float(audio.min()))
     if max_val > 1.0:
-        audio = audio / max_val
+        audio /= max_val
 
     elapsed = time.time() - start_time
     audio_duration = len(audio) / KOKORO_SAMPLE_RATE
@@ -109,6 +160,53 @@ def synthesize_speech(
     return audio
 
 
+def synthesize_speech_chunks(
+    text: str,
+    voice: str | None = None,
+) -> Iterator[np.ndarray]:
+    """
+    Synthesize speech, yielding audio as Kokoro produces each segment.
+
+    Args:
+        text: The text to speak
+        voice: Optional Kokoro voice ID
+
+    Yields:
+        Audio chunks as numpy arrays (float32, mono, 24kHz)
+    """
+    pipeline = _load_model()
+
+    if pipeline is None:
+        logger.warning("TTS not available, nothing to stream")
+        return
+
+    voice_id = voice or settings.tts_voice
+
+    with mlx_lock:
+        for result in pipeline(
+            text, voice=voice_id, speed=settings.tts_speed, split_pattern=_STREAM_SPLIT_PATTERN
+        ):
+            if result.audio is not None:
+                yield np.asarray(result.audio, dtype=np.float32).reshape(-1)
+
+
+def _to_pcm16(audio: np.ndarray) -> bytes:
+    """Convert float32 audio to 16-bit PCM bytes, clipping out-of-range samples."""
+    # Scale into one new float32 buffer and clip it in place, so out-of-range
+    # samples saturate instead of wrapping around in the int16 cast
+    pcm = np.multiply(audio, 32767.0, dtype=np.float32)
+    np.clip(pcm, -32767.0, 32767.0, out=pcm)
+    return pcm.astype(np.int16).tobytes()
+
+
+def _wav_cache_key(text: str, voice_id: str, sample_rate: int) -> bytes:
+    """Build the WAV cache key for a reply."""
+    return hashlib.blake2b(
+        f"{voice_id}\0{settings.tts_speed}\0{sample_rate}\0{text}".encode(),
+        digest_size=16,
+    ).digest()
+
+
 def synthesize_speech_to_wav(
     text: str,
     voice: str | None = None,
@@ -125,23 +223,30 @@ def synthesize_speech_to_wav(
     Returns:
         WAV file as bytes, or None if TTS is unavailable
     """
-    audio = synthesize_speech(text, voice)
+    voice_id = voice or settings.tts_voice
+    cache_key = _wav_cache_key(text, voice_id, sample_rate)
+    cached = _wav_cache.get(cache_key)
+    if cached is not None:
+        logger.debug(f"TTS cache hit: {len(text)} chars")
+        return cached
+
+    audio = synthesize_speech(text, voice_id)
 
     if audio is None:
         return None
 
-    # Convert to 16-bit PCM
-    audio_int16 = (audio * 32767).astype(np.int16)
-
     # Create WAV file in memory
     buffer = io.BytesIO()
     with wave.open(buffer, "wb") as wav_file:
         wav_file.setnchannels(1)  # Mono
         wav_file.setsampwidth(2)  # 16-bit
         wav_file.setframerate(sample_rate)
-        wav_file.writeframes(audio_int16.tobytes())
+        wav_file.writeframes(_to_pcm16(audio))
 
-    return buffer.getvalue()
+    wav_bytes = buffer.getvalue()
+    if len(text) <= _WAV_CACHE_MAX_CHARS:
+        _wav_cache.set(cache_key, wav_bytes)
+    return wav_bytes
 
 
 async def synthesize_speech_async(
@@ -149,8 +254,8 @@ async def synthesize_speech_async(
     voice: str | None = None,
 ) -> np.ndarray | None:
     """Async wrapper for speech synthesis (runs in thread pool)."""
-    import asyncio
-    return await asyncio.to_thread(synthesize_speech, text, voice)
+    async with mlx_async_lock:
+        return await asyncio.to_thread(synthesize_speech, text, voice)
 
 
 async def synthesize_speech_to_wav_async(
@@ -158,8 +263,88 @@ async def synthesize_speech_to_wav_async(
     voice: str | None = None,
 ) -> bytes | None:
     """Async wrapper for WAV synthesis (runs in thread pool)."""
-    import asyncio
-    return await asyncio.to_thread(synthesize_speech_to_wav, text, voice)
+    # Cached replies don't need to wait for the GPU
+    cache_key = _wav_cache_key(text, voice or settings.tts_voice, KOKORO_SAMPLE_RATE)
+    cached = _wav_cache.get(cache_key)
+    if cached is not None:
+        logger.debug(f"TTS cache hit: {len(text)} chars")
+        return cached
+
+    async def synthesize() -> bytes | None:
+        async with mlx_async_lock:
+            return await asyncio.to_thread(synthesize_speech_to_wav, text, voice)
+
+    # The same reply requested again while it is being synthesized waits for
+    # that synthesis instead of queueing a second one behind the MLX lock
+    task = _wav_flights.get(cache_key)
+    if task is None:
+        task = asyncio.ensure_future(synthesize())
+        _wav_flights[cache_key] = task
+        # Forgotten when the synthesis ends, not when a caller gives up on it
+        task.add_done_callback(functools.partial(_forget_wav_flight, cache_key))
+    # Shielded so one cancelled caller doesn't cancel the synthesis for the rest
+    return await asyncio.shield(task)
+
+
+def _forget_wav_flight(cache_key: bytes, task: asyncio.Task) -> None:
+    """Drop a finished synthesis from the in-flight table."""
+    if _wav_flights.get(cache_key) is task:
+        del _wav_flights[cache_key]
+
+
+async def synthesize_speech_stream_async(
+    text: str,
+    voice: str | None = None,
+) -> AsyncIterator[bytes]:
+    """
+    Stream synthesized speech as raw 16-bit PCM chunks (mono, 24kHz).
+
+    Synthesis runs in a worker thread; each segment is yielded as soon as
+    it is ready so playback can start before the whole reply is done. The
+    GPU lock is held only while synthesizing, not while the consumer drains
+    the audio, and closing the stream early stops synthesis after the
+    current segment.
+    """
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue[bytes | None] = asyncio.Queue()
+    stop = threading.Event()
+
+    def produce() -> None:
+        try:
+            if stop.is_set():
+                return
+            with contextlib.closing(synthesize_speech_chunks(text, voice)) as chunks:
+                for chunk in chunks:
+                    loop.call_soon_threadsafe(queue.put_nowait, _to_pcm16(chunk))
+                    if stop.is_set():
+                        break
+        finally:
+            loop.call_soon_threadsafe(queue.put_nowait, None)
+
+    async def synthesize() -> None:
+        async with mlx_async_lock:
+            await asyncio.to_thread(produce)
+
+    producer = asyncio.ensure_future(synthesize())
+    try:
+        while (chunk := await queue.get()) is not None:
+            yield chunk
+
+        # Surface synthesis errors from the worker thread
+        await producer
+    finally:
+        if not producer.done():
+            # The consumer stopped early; let the worker finish its segment
+            stop.set()
+            try:
+                await producer
+            except Exception as e:
+                logger.warning(f"TTS stream stopped with error: {e}")
+
+
+def clear_cache() -> None:
+    """Clear cached synthesized audio."""
+    _wav_cache.clear()
 
 
 def is_tts_available() -> bool:
@@ -177,7 +362,31 @@ def is_tts_available() -> bool:
 def preload_model() -> None:
     """Pre-load the TTS model to avoid cold start latency."""
     if settings.tts_enabled:
-        _load_model()
+        if _load_model() is not None:
+            _warm_up()
+            _preload_phrases()
         logger.info("TTS model pre-loaded")
     else:
         logger.info("TTS is disabled, skipping pre-load")
+
+
+def _warm_up() -> None:
+    """
+    Synthesize a short phrase and discard it.
+
+    Kokoro compiles its Metal kernels and loads the voice on first use;
+    doing that here keeps it off the first spoken reply.
+    """
+    try:
+        synthesize_speech("Hi.")
+    except Exception as e:
+        logger.warning(f"TTS warm-up failed: {e}")
+
+
+def _preload_phrases() -> None:
+    """Synthesize the configured canned replies into the WAV cache."""
+    for phrase in settings.tts_preload_phrases:
+        try:
+            synthesize_speech_to_wav(phrase)
+        except Exception as e:
+            logger.warning(f"TTS preload failed for {phrase!r}: {e}")
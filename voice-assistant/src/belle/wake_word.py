@@ -194,11 +194,8 @@ class WakeWordListener:
             if not self._running:
                 return
 
-            # Convert to int16
-            audio = (indata[:, 0] * 32767).astype(np.int16)
-
-            # Process frame
-            result = self._detector.process(audio)
+            # Porcupine takes the int16 mono frame as-is
+            result = self._detector.process(indata[:, 0])
 
             if result >= 0:
                 # Wake word detected
@@ -217,7 +214,7 @@ class WakeWordListener:
                 samplerate=sample_rate,
                 blocksize=frame_length,
                 channels=1,
-                dtype=np.float32,
+                dtype=np.int16,
                 callback=audio_callback,
             ):
                 logger.info(f"Listening for wake words at {sample_rate}Hz...")
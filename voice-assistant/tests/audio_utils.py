@@ -6,6 +6,7 @@ for working with audio data in tests.
 """
 
 import base64
+import functools
 import io
 import wave
 from pathlib import Path
@@ -13,6 +14,20 @@ from pathlib import Path
 import numpy as np
 
 
+def _sine(
+    frequency: float,
+    n_samples: int,
+    sample_rate: int,
+    amplitude: float,
+) -> np.ndarray:
+    """Generate an int16 sine wave from a per-sample phase step."""
+    phase = np.arange(n_samples, dtype=np.float32)
+    phase *= np.float32(2 * np.pi * frequency / sample_rate)
+    np.sin(phase, out=phase)
+    phase *= np.float32(amplitude * 32767)
+    return phase.astype(np.int16)
+
+
 def create_silence_wav(
     duration_seconds: float = 1.0,
     sample_rate: int = 16000,
@@ -59,8 +74,7 @@ def create_tone_wav(
     Returns:
         WAV file as bytes
     """
-    t = np.linspace(0, duration_seconds, int(sample_rate * duration_seconds), endpoint=False)
-    audio = (amplitude * np.sin(2 * np.pi * frequency * t) * 32767).astype(np.int16)
+    audio = _sine(frequency, int(sample_rate * duration_seconds), sample_rate, amplitude)
 
     buffer = io.BytesIO()
     with wave.open(buffer, "wb") as wav:
@@ -123,15 +137,11 @@ def create_stereo_wav(
         WAV file as bytes
     """
     n_samples = int(duration_seconds * sample_rate)
-    t = np.linspace(0, duration_seconds, n_samples, endpoint=False)
-
-    left = (0.5 * np.sin(2 * np.pi * left_freq * t) * 32767).astype(np.int16)
-    right = (0.5 * np.sin(2 * np.pi * right_freq * t) * 32767).astype(np.int16)
+    left = _sine(left_freq, n_samples, sample_rate, 0.5)
+    right = _sine(right_freq, n_samples, sample_rate, 0.5)
 
-    # Interleave for stereo
-    stereo = np.empty(n_samples * 2, dtype=np.int16)
-    stereo[0::2] = left
-    stereo[1::2] = right
+    # Interleave for stereo: rows of (left, right) match the WAV frame layout
+    stereo = np.stack((left, right), axis=1)
 
     buffer = io.BytesIO()
     with wave.open(buffer, "wb") as wav:
@@ -280,39 +290,46 @@ def numpy_to_wav(
 
 # Pre-made test fixtures
 class TestAudioFixtures:
-    """Collection of pre-made audio fixtures for testing."""
+    """Collection of pre-made audio fixtures for testing (each built once per session)."""
 
     @staticmethod
+    @functools.cache
     def silence_100ms() -> bytes:
         """100ms of silence."""
         return create_silence_wav(duration_seconds=0.1)
 
     @staticmethod
+    @functools.cache
     def silence_500ms() -> bytes:
         """500ms of silence."""
         return create_silence_wav(duration_seconds=0.5)
 
     @staticmethod
+    @functools.cache
     def silence_1s() -> bytes:
         """1 second of silence."""
         return create_silence_wav(duration_seconds=1.0)
 
     @staticmethod
+    @functools.cache
     def tone_440hz_500ms() -> bytes:
         """500ms A4 tone (440Hz)."""
         return create_tone_wav(frequency=440.0, duration_seconds=0.5)
 
     @staticmethod
+    @functools.cache
     def tone_1khz_100ms() -> bytes:
         """100ms 1kHz tone."""
         return create_tone_wav(frequency=1000.0, duration_seconds=0.1)
 
     @staticmethod
+    @functools.cache
     def white_noise_500ms() -> bytes:
         """500ms of white noise."""
         return create_white_noise_wav(duration_seconds=0.5)
 
     @staticmethod
+    @functools.cache
     def stereo_test() -> bytes:
         """Stereo test audio."""
         return create_stereo_wav(duration_seconds=0.5)
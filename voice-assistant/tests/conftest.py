@@ -1,5 +1,8 @@
 """Pytest configuration and fixtures for Belle tests."""
 
+import asyncio
+from unittest.mock import MagicMock
+
 import pytest
 
 
@@ -8,3 +11,35 @@ def mock_settings(monkeypatch):
     """Mock settings for all tests."""
     monkeypatch.setenv("BELLE_SMART_HOME_API_URL", "http://localhost:3001/api")
     monkeypatch.setenv("BELLE_DEBUG", "true")
+
+    # Don't read or write the persisted device list in the user's home
+    from belle.config import settings
+
+    monkeypatch.setattr(settings, "device_cache_file", "")
+    # Tests mock one PUT per device; bulk updates are tested explicitly
+    monkeypatch.setattr(settings, "bulk_device_updates", False)
+
+
+class ConcurrencyProbe:
+    """Stand-in client whose PUTs record how many of them overlap."""
+
+    def __init__(self):
+        self.in_flight = 0
+        self.peak = 0
+        self.calls: list[tuple[str, dict]] = []
+
+    async def put(self, url, **kwargs):
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        self.calls.append((url, kwargs))
+        try:
+            await asyncio.sleep(0.01)
+        finally:
+            self.in_flight -= 1
+        return MagicMock()
+
+
+@pytest.fixture
+def concurrency_probe():
+    """Fake HTTP client for checking how device PUTs are fanned out."""
+    return ConcurrencyProbe()
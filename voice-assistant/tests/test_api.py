@@ -158,6 +158,17 @@ class TestTranscribeEndpoint:
             _, kwargs = mock.call_args
             assert kwargs.get("language") == "pt" or mock.call_args[0][1] == "pt"
 
+    def test_transcribe_rejects_oversized_audio(self, client):
+        """Should reject audio over the size limit with a validation error."""
+        from belle.config import settings
+
+        response = client.post(
+            "/transcribe",
+            json={"audio": "A" * (settings.max_audio_b64_len + 4), "format": "wav"},
+        )
+
+        assert response.status_code == 422
+
 
 class TestChatEndpoint:
     """Tests for the chat endpoint."""
@@ -295,6 +306,38 @@ class TestVoiceEndpoint:
             assert actions[0]["result"]["devices_controlled"] == 3
 
 
+    async def test_voice_pipeline_emits_transcript_first(self):
+        """Should emit the transcript before the LLM runs."""
+        from belle.main import _run_voice_pipeline
+
+        events = []
+
+        async def emit(message):
+            events.append(message["type"])
+
+        async def fake_chat(text, history):
+            events.append("chat")
+            return {"response": "Done!", "actions": []}
+
+        with (
+            patch("belle.main.is_silent_audio", return_value=False),
+            patch("belle.main.transcribe_audio_async", new_callable=AsyncMock) as mock_stt,
+            patch("belle.main.chat_async", fake_chat),
+            patch("belle.main.settings") as mock_settings,
+        ):
+            mock_settings.tts_enabled = False
+            mock_stt.return_value = {"text": "turn on lights", "language": "en", "confidence": {"no_speech_prob": 0.0, "confidence_score": 0.9}}
+
+            result = await _run_voice_pipeline(
+                np.zeros(1600, dtype=np.float32), None, None, "[test]", emit=emit
+            )
+
+        assert events == ["transcript", "chat"]
+        assert result.transcript == "turn on lights"
+        assert result.response == "Done!"
+        assert result.audio is None
+
+
 class TestWebSocket:
     """Tests for the WebSocket endpoint."""
 
@@ -310,6 +353,7 @@ class TestWebSocket:
             patch("belle.main.settings") as mock_settings,
         ):
             mock_settings.tts_enabled = False
+            mock_settings.max_audio_b64_len = 10_000_000
             mock_stt.return_value = {"text": "turn on lights", "language": "en", "confidence": {"no_speech_prob": 0.0, "confidence_score": 0.9}}
             mock_chat.return_value = {"response": "Done!", "actions": []}
 
@@ -331,6 +375,94 @@ class TestWebSocket:
                 assert response_msg["type"] == "response"
                 assert response_msg["response"] == "Done!"
 
+    def test_websocket_binary_audio(self, client):
+        """Should accept tagged binary audio frames and reply with binary WAV."""
+        with (
+            patch("belle.main.is_silent_audio", return_value=False),
+            patch("belle.main.transcribe_audio_async", new_callable=AsyncMock) as mock_stt,
+            patch("belle.main.chat_async", new_callable=AsyncMock) as mock_chat,
+            patch("belle.main.synthesize_speech_to_wav_async", new_callable=AsyncMock) as mock_wav,
+            patch("belle.main.settings") as mock_settings,
+        ):
+            mock_settings.tts_enabled = True
+            mock_settings.max_audio_b64_len = 10_000_000
+            mock_stt.return_value = {"text": "turn on lights", "language": "en", "confidence": {"no_speech_prob": 0.0, "confidence_score": 0.9}}
+            mock_chat.return_value = {"response": "Done!", "actions": []}
+            mock_wav.return_value = b"RIFF-wav-bytes"
+
+            with client.websocket_connect("/ws") as websocket:
+                websocket.send_bytes(b"\x00" + create_wav_audio())
+
+                assert websocket.receive_json()["type"] == "transcript"
+                response_msg = websocket.receive_json()
+                assert response_msg["type"] == "response"
+                assert response_msg["audio"] is None
+                assert websocket.receive_bytes() == b"\x00RIFF-wav-bytes"
+
+            audio_array = mock_stt.call_args[0][0]
+            assert audio_array.dtype == np.float32
+            assert len(audio_array) == 8000
+
+    def test_websocket_rejects_oversized_audio(self, client):
+        """Should reject audio payloads over the configured size before decoding."""
+        with (
+            patch("belle.main._prepare_audio", new_callable=AsyncMock) as mock_decode,
+            patch("belle.main.settings") as mock_settings,
+        ):
+            mock_settings.max_audio_b64_len = 16
+
+            with client.websocket_connect("/ws") as websocket:
+                websocket.send_json({"type": "audio", "data": "A" * 20, "format": "wav"})
+                response = websocket.receive_json()
+                assert response["type"] == "error"
+                assert "too large" in response["message"]
+
+            mock_decode.assert_not_called()
+
+    def test_websocket_unknown_binary_frame(self, client):
+        """Should reject binary frames with an unknown type tag."""
+        with client.websocket_connect("/ws") as websocket:
+            websocket.send_bytes(b"\x07data")
+            response = websocket.receive_json()
+            assert response["type"] == "error"
+
+    def test_websocket_streams_tts(self, client):
+        """Should stream TTS as binary PCM frames when requested."""
+
+        async def fake_stream(text):
+            yield b"\x01\x00" * 4
+            yield b"\x02\x00" * 4
+
+        with (
+            patch("belle.main.chat_async", new_callable=AsyncMock) as mock_chat,
+            patch("belle.main.synthesize_speech_stream_async", fake_stream),
+            patch("belle.main.synthesize_speech_to_wav_async", new_callable=AsyncMock) as mock_wav,
+            patch("belle.main.settings") as mock_settings,
+        ):
+            mock_settings.tts_enabled = True
+            mock_chat.return_value = {"response": "Done!", "actions": []}
+
+            with client.websocket_connect("/ws") as websocket:
+                websocket.send_json({
+                    "type": "text",
+                    "message": "turn on lights",
+                    "include_audio": True,
+                    "stream_audio": True,
+                })
+
+                response_msg = websocket.receive_json()
+                assert response_msg["type"] == "response"
+                assert response_msg["audio"] is None
+
+                start = websocket.receive_json()
+                assert start["type"] == "audio_start"
+                assert start["codec"] == "pcm16"
+                assert websocket.receive_bytes() == b"\x02" + b"\x01\x00" * 4
+                assert websocket.receive_bytes() == b"\x02" + b"\x02\x00" * 4
+                assert websocket.receive_json()["type"] == "audio_end"
+
+            mock_wav.assert_not_called()
+
     def test_websocket_text_message(self, client):
         """Should process text via WebSocket."""
         with (
@@ -362,6 +494,16 @@ class TestWebSocket:
             response = websocket.receive_json()
             assert response["type"] == "pong"
 
+    def test_websocket_clear_history(self, client):
+        """Should confirm clearing the session history."""
+        with client.websocket_connect("/ws") as websocket:
+            websocket.send_json({"type": "clear_history"})
+            response = websocket.receive_json()
+            assert response == {
+                "type": "history_cleared",
+                "message": "Conversation history cleared",
+            }
+
     def test_websocket_unknown_type(self, client):
         """Should return error for unknown message type."""
         with client.websocket_connect("/ws") as websocket:
@@ -374,6 +516,21 @@ class TestWebSocket:
 class TestAudioDecoding:
     """Tests for audio decoding utilities."""
 
+    def test_detect_audio_format(self):
+        """Should recognize containers from their magic bytes."""
+        from belle.main import _detect_audio_format
+
+        assert _detect_audio_format(b"RIFF\x00\x00\x00\x00WAVEfmt ") == "wav"
+        assert _detect_audio_format(b"RIFF\x00\x00\x00\x00AVI LIST") is None
+        assert _detect_audio_format(b"OggS" + bytes(8)) == "ogg"
+        assert _detect_audio_format(b"\x1a\x45\xdf\xa3" + bytes(8)) == "webm"
+        assert _detect_audio_format(b"fLaC" + bytes(8)) == "flac"
+        assert _detect_audio_format(b"ID3\x04" + bytes(8)) == "mp3"
+        assert _detect_audio_format(b"\xff\xfb\x90\x00" + bytes(8)) == "mp3"
+        assert _detect_audio_format(b"\x00\x00\x00\x20ftypM4A ") == "m4a"
+        assert _detect_audio_format(bytes(12)) is None
+        assert _detect_audio_format(b"RIFF") is None
+
     def test_decode_16bit_mono_wav(self):
         """Should decode 16-bit mono WAV correctly."""
         from belle.main import _decode_audio
@@ -414,6 +571,80 @@ class TestAudioDecoding:
         # Should be mono now
         assert len(result) == n_samples
 
+    def test_decode_wav_without_soundfile(self):
+        """Should parse WAV with the stdlib wave module when soundfile is missing."""
+        from belle.main import _decode_audio
+
+        stereo = np.tile(np.array([0, 1000], dtype=np.int16), 1600)
+        buffer = io.BytesIO()
+        with wave.open(buffer, "wb") as wav:
+            wav.setnchannels(2)
+            wav.setsampwidth(2)
+            wav.setframerate(16000)
+            wav.writeframes(stereo.tobytes())
+
+        with patch.dict("sys.modules", {"soundfile": None}):
+            result = _decode_audio(buffer.getvalue(), "wav")
+
+        assert result.dtype == np.float32
+        assert len(result) == 1600
+        np.testing.assert_allclose(result, 500 / 32768, rtol=1e-6)
+
+    def test_parse_wav_header_skips_extra_chunks(self):
+        """Should find the data chunk after padded metadata chunks."""
+        from belle.main import _decode_audio, _parse_wav_header
+
+        pcm = np.array([0, 16384, -16384], dtype=np.int16).tobytes()
+        fmt = (1).to_bytes(2, "little") + (1).to_bytes(2, "little")
+        fmt += (16000).to_bytes(4, "little") + (32000).to_bytes(4, "little")
+        fmt += (2).to_bytes(2, "little") + (16).to_bytes(2, "little")
+        body = b"WAVE" + b"fmt " + len(fmt).to_bytes(4, "little") + fmt
+        body += b"LIST" + (3).to_bytes(4, "little") + b"abc\x00"  # Odd size, padded
+        body += b"data" + len(pcm).to_bytes(4, "little") + pcm
+        wav_bytes = b"RIFF" + len(body).to_bytes(4, "little") + body
+
+        assert _parse_wav_header(wav_bytes) == (1, 16000, 1, 2, len(wav_bytes) - len(pcm), 6)
+        np.testing.assert_allclose(_decode_audio(wav_bytes, "wav"), [0.0, 0.5, -0.5])
+
+    def test_decode_float_wav_with_soundfile(self):
+        """Should hand non-integer WAV encodings to soundfile."""
+        sf = pytest.importorskip("soundfile")
+        from belle.main import _decode_audio
+
+        buffer = io.BytesIO()
+        sf.write(
+            buffer, np.full(1600, 0.25, dtype=np.float32), 16000, format="WAV", subtype="FLOAT"
+        )
+
+        result = _decode_audio(buffer.getvalue(), "wav")
+        np.testing.assert_allclose(result, 0.25)
+
+    def test_decode_pcm16_16k(self):
+        """Should use headerless 16kHz int16 PCM as is."""
+        from belle.main import _decode_audio
+
+        pcm = np.array([0, 16384, -16384, 32767], dtype=np.int16).tobytes()
+        result = _decode_audio(pcm, "pcm16_16k")
+
+        assert result.dtype == np.float32
+        np.testing.assert_allclose(result, [0.0, 0.5, -0.5, 32767 / 32768])
+
+    def test_decode_pcm16_16k_any_case(self):
+        """Should match the pcm16_16k format tag case-insensitively."""
+        from belle.main import _decode_audio
+
+        pcm = np.array([0, 16384], dtype=np.int16).tobytes()
+        result = _decode_audio(pcm, "PCM16_16K")
+
+        np.testing.assert_allclose(result, [0.0, 0.5])
+
+    def test_decode_invalid_wav(self):
+        """Should raise ValueError for data that isn't a WAV file."""
+        from belle.main import _decode_audio
+
+        with pytest.raises(ValueError):
+            _decode_audio(b"not a wav file at all", "wav")
+
     def test_decode_resample(self):
         """Should resample to 16kHz."""
         from belle.main import _decode_audio
@@ -438,11 +669,75 @@ class TestAudioDecoding:
         expected_samples = int(duration * 16000)
         assert abs(len(result) - expected_samples) <= 1  # Allow for rounding
 
+    def test_resample_without_scipy(self):
+        """Should fall back to linear interpolation when scipy is missing."""
+        from belle.main import _resample
+
+        audio = np.zeros(4410, dtype=np.float32)
+        with patch.dict("sys.modules", {"scipy.signal": None}):
+            result = _resample(audio, 44100, 16000)
+
+        assert result.dtype == np.float32
+        assert len(result) == 1600
+
+    def test_decode_cache_only_in_debug(self):
+        """Should reuse decoded arrays for identical payloads only in debug mode."""
+        from belle.main import _decode_audio_cached, _decode_cache
+
+        audio_bytes = create_wav_audio(0.1)
+        _decode_cache.clear()
+
+        with patch("belle.main.settings") as mock_settings:
+            mock_settings.debug = False
+            first = _decode_audio_cached(audio_bytes, "wav")
+            assert _decode_audio_cached(audio_bytes, "wav") is not first
+            assert len(_decode_cache) == 0
+
+            mock_settings.debug = True
+            first = _decode_audio_cached(audio_bytes, "wav")
+            assert _decode_audio_cached(audio_bytes, "wav") is first
+            assert not first.flags.writeable
+
+        _decode_cache.clear()
+
+    def test_warm_audio_decoder(self):
+        """Should run the decode path without a real request."""
+        from belle.main import _warm_audio_decoder
+
+        _warm_audio_decoder()
+
     def test_unsupported_format(self):
-        """Should raise error for unsupported formats."""
+        """Should raise error for compressed formats when PyAV is missing."""
         from belle.main import _decode_audio
 
-        with pytest.raises(ValueError) as exc_info:
-            _decode_audio(b"fake audio data", "webm")
+        with patch.dict("sys.modules", {"av": None}):
+            with pytest.raises(ValueError) as exc_info:
+                _decode_audio(b"fake audio data", "webm")
 
         assert "not directly supported" in str(exc_info.value)
+
+    def test_decode_compressed_with_pyav(self):
+        """Should decode a compressed container to 16kHz mono float32."""
+        av = pytest.importorskip("av")
+        from belle.main import _decode_audio
+
+        # Encode 0.5s of a 44.1kHz stereo tone as FLAC
+        sample_rate = 44100
+        t = np.arange(int(sample_rate * 0.5)) / sample_rate
+        tone = (0.5 * np.sin(2 * np.pi * 440 * t) * 32767).astype(np.int16)
+        buffer = io.BytesIO()
+        with av.open(buffer, "w", format="flac") as container:
+            stream = container.add_stream("flac", rate=sample_rate, layout="stereo")
+            frame = av.AudioFrame.from_ndarray(
+                np.stack([tone, tone]).reshape(1, -1), format="s16", layout="stereo"
+            )
+            frame.sample_rate = sample_rate
+            for packet in stream.encode(frame):
+                container.mux(packet)
+            for packet in stream.encode(None):
+                container.mux(packet)
+
+        result = _decode_audio(buffer.getvalue(), "flac")
+
+        assert result.dtype == np.float32
+        assert abs(len(result) - 8000) <= 200  # ~0.5s at 16kHz
@@ -1,5 +1,6 @@
 """Tests for the smart home context module."""
 
+import asyncio
 from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
@@ -10,6 +11,7 @@ from belle.context import (
     _format_room_summary,
     clear_context_cache,
     get_smart_home_context,
+    get_smart_home_context_json,
 )
 
 
@@ -321,3 +323,30 @@ class TestGetSmartHomeContext:
             assert "## Current Smart Home State" in context
             # Should indicate no data available
             assert "None" in context or "empty" in context.lower()
+
+    @pytest.mark.asyncio
+    async def test_concurrent_builds_share_one_fetch(self, mock_devices, mock_rooms, mock_groups):
+        """Should fetch once when several context builds start on a cold cache."""
+        calls = []
+
+        async def mock_get(url):
+            calls.append(url)
+            await asyncio.sleep(0.01)
+            response = MagicMock()
+            if "devices" in url:
+                response.json.return_value = mock_devices
+            elif "rooms" in url:
+                response.json.return_value = mock_rooms
+            else:
+                response.json.return_value = mock_groups
+            return response
+
+        with patch("belle.context.get_client", new_callable=AsyncMock) as mock_client_fn:
+            mock_client_fn.return_value = AsyncMock(get=mock_get)
+            await asyncio.gather(
+                get_smart_home_context(),
+                get_smart_home_context_json(),
+                get_smart_home_context_json(),
+            )
+
+        assert sorted(calls) == ["/devices", "/groups", "/rooms"]
@@ -171,6 +171,16 @@ class TestConversationManager:
         # Old session should be gone
         assert "old-session" not in manager._sessions
 
+    def test_expired_session_reset_between_sweeps(self):
+        """Should not return an expired session even if no sweep has run."""
+        manager = ConversationManager(session_ttl=0.05)
+        manager._cleanup_interval = 60.0  # Sweep only once
+
+        manager.add_exchange("session-1", "Q", "A")
+        time.sleep(0.1)
+
+        assert manager.get_history("session-1") == []
+
     def test_get_stats(self):
         """Should return manager statistics."""
         manager = ConversationManager()
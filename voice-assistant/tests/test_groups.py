@@ -2,9 +2,15 @@
 
 from unittest.mock import AsyncMock, MagicMock, patch
 
+import orjson
 import pytest
 
-from belle.tools.groups import _group_cache, control_group, get_all_groups
+from belle.tools.groups import (
+    _apply_state_update,
+    _group_cache,
+    control_group,
+    get_all_groups,
+)
 
 
 class TestGetAllGroups:
@@ -158,7 +164,53 @@ class TestControlGroup:
             # Verify each device was controlled individually
             assert mock_client.put.call_count == 2
             for call in mock_client.put.call_args_list:
-                assert call[1]["json"]["on"] is True
+                assert orjson.loads(call[1]["content"])["on"] is True
+
+    @pytest.mark.asyncio
+    async def test_control_group_sends_puts_concurrently(self, mock_groups, concurrency_probe):
+        """Should have every light's PUT in flight at once, keeping results in order."""
+        with (
+            patch("belle.tools.groups._get_cached_groups", AsyncMock(return_value=mock_groups)),
+            patch("belle.tools.groups.get_client", new_callable=AsyncMock) as mock_get_client,
+        ):
+            mock_get_client.return_value = concurrency_probe
+            result = await control_group("All Lights", on=False)
+
+        assert concurrency_probe.peak == 2
+        assert [r["device"] for r in result["results"]] == ["Kitchen Light", "Living Room Light"]
+
+    @pytest.mark.asyncio
+    async def test_control_group_updates_cache_in_place(self, mock_groups):
+        """Should keep the group cache and record the new state of controlled lights."""
+        _group_cache.set(mock_groups)
+
+        with patch("belle.tools.groups.get_client", new_callable=AsyncMock) as mock_get_client:
+            mock_client = AsyncMock()
+            mock_client.put = AsyncMock(return_value=MagicMock())
+            mock_get_client.return_value = mock_client
+
+            result = await control_group("Movie Mode", brightness=30)
+
+        assert result["success"] is True
+        assert _group_cache.get() is mock_groups
+        device = mock_groups[1]["devices"][0]
+        assert device["state"] == {"brightness": 30, "on": True}
+
+    def test_control_group_patches_only_confirmed_devices(self):
+        """Should only record the new state for lights whose result reports success."""
+        lights = [
+            {"device": {"id": "1", "name": "Lamp A", "state": {"on": False}}},
+            {"device": {"id": "2", "name": "Lamp B", "state": {"on": False}}},
+        ]
+        # Results out of request order, one failed
+        results = [
+            {"device": "Lamp B", "success": False, "error": "unreachable"},
+            {"device": "Lamp A", "success": True},
+        ]
+        _apply_state_update(lights, results, {"on": True})
+
+        assert lights[0]["device"]["state"] == {"on": True}
+        assert lights[1]["device"]["state"] == {"on": False}
 
     @pytest.mark.asyncio
     async def test_control_group_turn_off(self, mock_groups):
@@ -214,8 +266,8 @@ class TestControlGroup:
 
             # Verify brightness and on were sent
             call_args = mock_client.put.call_args
-            assert call_args[1]["json"]["brightness"] == 50
-            assert call_args[1]["json"]["on"] is True
+            assert orjson.loads(call_args[1]["content"])["brightness"] == 50
+            assert orjson.loads(call_args[1]["content"])["on"] is True
 
     @pytest.mark.asyncio
     async def test_control_group_set_color_temp(self, mock_groups):
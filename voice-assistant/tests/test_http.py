@@ -1,5 +1,9 @@
 """Tests for HTTP client and utilities."""
 
+import asyncio
+import time
+from unittest.mock import patch
+
 import httpx
 import pytest
 
@@ -8,12 +12,17 @@ from belle.http import (
     CircuitBreaker,
     CircuitBreakerOpen,
     CircuitState,
+    LRUCache,
+    NameIndex,
     RequestDeduplicator,
+    SingleFlight,
     SmartCache,
+    _use_http2,
     calculate_backoff,
     find_by_name,
     get_close_matches_for_name,
     is_retryable_error,
+    normalize_name,
     with_retry,
 )
 
@@ -112,6 +121,104 @@ class TestSmartCache:
         time.sleep(0.05)  # 50ms < 200ms base TTL
         assert cache.get() == {"key": "value"}
 
+    def test_set_with_age(self):
+        """Should treat data stored with an age as that much older."""
+        cache = SmartCache(base_ttl=10.0)
+        cache.set({"key": "value"}, age=5.0)
+        assert cache.get() == {"key": "value"}
+
+        cache.set({"key": "value"}, age=11.0)
+        assert cache.get() is None
+
+    @pytest.mark.asyncio
+    async def test_get_or_refresh_shares_one_fetch(self):
+        """Should fetch once for concurrent misses and serve the cache afterwards."""
+        cache = SmartCache(base_ttl=10.0)
+        calls = 0
+
+        async def fetch():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            cache.set(["fresh"])
+            return ["fresh"]
+
+        results = await asyncio.gather(*(cache.get_or_refresh(fetch) for _ in range(5)))
+        assert results == [["fresh"]] * 5
+        assert await cache.get_or_refresh(fetch) == ["fresh"]
+        assert calls == 1
+
+    @pytest.mark.asyncio
+    async def test_serves_stale_data_while_refreshing(self):
+        """Should return slightly expired data at once and refresh it in the background."""
+        cache = SmartCache(base_ttl=10.0, max_stale=60.0)
+        cache.set(["old"], age=20.0)
+        calls = 0
+
+        async def fetch():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0)
+            cache.set(["new"])
+            return ["new"]
+
+        assert await cache.get_or_refresh(fetch) == ["old"]
+        assert await cache.get_or_refresh(fetch) == ["old"]
+        await cache._background
+        assert calls == 1
+        assert await cache.get_or_refresh(fetch) == ["new"]
+
+        # Too old to serve: wait for the fetch
+        cache.set(["old"], age=100.0)
+        assert await cache.get_or_refresh(fetch) == ["new"]
+        assert calls == 2
+
+    @pytest.mark.asyncio
+    async def test_background_refresh_errors_are_logged(self, caplog):
+        """Should keep serving stale data when a background refresh fails."""
+        cache = SmartCache(base_ttl=10.0, max_stale=60.0)
+        cache.set(["old"], age=20.0)
+
+        async def fetch():
+            raise httpx.ConnectError("down")
+
+        assert await cache.get_or_refresh(fetch) == ["old"]
+        with pytest.raises(httpx.ConnectError):
+            await cache._background
+        assert cache.get() is None
+        assert "Background cache refresh failed" in caplog.text
+
+
+class TestLRUCache:
+    """Tests for the keyed LRU cache."""
+
+    def test_stores_and_retrieves(self):
+        """Should return stored values by key."""
+        cache = LRUCache(maxsize=4)
+        cache.set("a", 1)
+        assert cache.get("a") == 1
+        assert cache.get("missing") is None
+
+    def test_evicts_least_recently_used(self):
+        """Should evict the oldest untouched entry when full."""
+        cache = LRUCache(maxsize=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")  # "b" is now least recently used
+        cache.set("c", 3)
+
+        assert cache.get("a") == 1
+        assert cache.get("b") is None
+        assert cache.get("c") == 3
+
+    def test_expiry(self):
+        """Should expire entries after TTL."""
+        cache = LRUCache(maxsize=4, ttl=0.05)
+        cache.set("a", 1)
+        time.sleep(0.1)
+        assert cache.get("a") is None
+        assert len(cache) == 0
+
 
 class TestFindByName:
     """Tests for the find_by_name function."""
@@ -178,6 +285,32 @@ class TestFindByName:
         assert result["id"] == "1"
 
 
+class TestNameIndex:
+    """Tests for the NameIndex lookup table."""
+
+    def test_exact_match_uses_index(self):
+        """Should resolve normalized exact names without scanning."""
+        items = [{"id": "1", "name": "Kitchen  Light"}, {"id": "2", "name": "kitchen light"}]
+        index = NameIndex(items)
+
+        with patch("belle.http.find_by_name") as mock_find:
+            assert index.find(items, " KITCHEN light ") is items[0]
+            mock_find.assert_not_called()
+
+    def test_falls_back_to_find_by_name(self):
+        """Should use find_by_name for partial names and foreign lists."""
+        items = [{"id": "1", "name": "Kitchen Light"}]
+        index = NameIndex(items)
+
+        with patch("belle.http.normalize_name", wraps=normalize_name) as mock_normalize:
+            assert index.find(items, "Kitchen") is items[0]
+        # Only the search term is normalized; item names come from the index
+        assert mock_normalize.call_count == 2
+
+        other = [{"id": "9", "name": "Kitchen Light"}]
+        assert index.find(other, "Kitchen Light") is other[0]
+
+
 class TestGetCloseMatches:
     """Tests for the get_close_matches_for_name function."""
 
@@ -479,3 +612,53 @@ class TestCircuitBreaker:
         # Next call should fail fast with CircuitBreakerOpen
         with pytest.raises(CircuitBreakerOpen):
             await failing_func()
+
+
+class TestUseHttp2:
+    """Tests for HTTP/2 negotiation checks."""
+
+    def test_plain_http_stays_on_http1(self):
+        """Should not enable HTTP/2 for cleartext URLs (httpx has no h2c)."""
+        assert _use_http2("http://localhost:3001/api") is False
+
+    def test_https_requires_h2(self):
+        """Should enable HTTP/2 over TLS only when h2 is installed."""
+        with patch("importlib.util.find_spec", return_value=None):
+            assert _use_http2("https://home.example/api") is False
+        with patch("importlib.util.find_spec", return_value=object()):
+            assert _use_http2("https://home.example/api") is True
+
+
+class TestSingleFlight:
+    """Tests for coalescing concurrent calls."""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_callers_share_one_call(self):
+        """Should run func once for overlapping callers and again afterwards."""
+        calls = 0
+
+        async def fetch():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return calls
+
+        flight = SingleFlight()
+        assert await asyncio.gather(flight.run(fetch), flight.run(fetch)) == [1, 1]
+        assert await flight.run(fetch) == 2
+
+    @pytest.mark.asyncio
+    async def test_errors_reach_every_caller(self):
+        """Should propagate a failed call to all waiters and retry next time."""
+        async def fail():
+            await asyncio.sleep(0.01)
+            raise httpx.ConnectError("down")
+
+        flight = SingleFlight()
+        results = await asyncio.gather(flight.run(fail), flight.run(fail), return_exceptions=True)
+        assert all(isinstance(r, httpx.ConnectError) for r in results)
+
+        async def ok():
+            return "up"
+
+        assert await flight.run(ok) == "up"
@@ -17,6 +17,7 @@ import wave
 from unittest.mock import AsyncMock, MagicMock, patch
 
 import numpy as np
+import orjson
 import pytest
 from fastapi.testclient import TestClient
 
@@ -163,7 +164,7 @@ class TestVoiceToDeviceAction:
             mock_http_client.put.assert_called_once()
             call_args = mock_http_client.put.call_args
             assert "/devices/hue-1" in call_args[0][0]
-            assert call_args[1]["json"]["on"] is True
+            assert orjson.loads(call_args[1]["content"])["on"] is True
 
     @pytest.mark.asyncio
     async def test_set_brightness(self, mock_devices):
@@ -194,8 +195,9 @@ class TestVoiceToDeviceAction:
 
             # Verify brightness was sent with on=True
             call_args = mock_http_client.put.call_args
-            assert call_args[1]["json"]["brightness"] == 50
-            assert call_args[1]["json"]["on"] is True
+            payload = orjson.loads(call_args[1]["content"])
+            assert payload["brightness"] == 50
+            assert payload["on"] is True
 
     @pytest.mark.asyncio
     async def test_control_room(self, mock_rooms):
@@ -258,7 +260,7 @@ class TestVoiceToDeviceAction:
             # Verify device was controlled individually
             mock_http_client.put.assert_called_once()
             call_args = mock_http_client.put.call_args
-            assert call_args[1]["json"]["on"] is True
+            assert orjson.loads(call_args[1]["content"])["on"] is True
 
 
 class TestChatToDeviceAction:
@@ -1,8 +1,21 @@
 """Tests for LLM tool call parsing."""
 
+import sys
+import threading
+import time
+import types
+from unittest.mock import AsyncMock, MagicMock, patch
+
 import pytest
 
-from belle.llm import ToolCall, _extract_json_objects, _parse_tool_calls
+import belle.llm.local as local
+from belle.llm import (
+    ToolCall,
+    _extract_json_objects,
+    _parse_tool_calls,
+    chat_async,
+    clear_response_cache,
+)
 
 
 class TestExtractJsonObjects:
@@ -124,3 +137,164 @@ class TestToolCallModel:
 
         with pytest.raises(ValidationError):
             ToolCall.model_validate({"arguments": {}})
+
+
+class TestResponseCache:
+    """Tests for LLM response memoization."""
+
+    @pytest.fixture(autouse=True)
+    def _clear_cache(self):
+        clear_response_cache()
+        yield
+        clear_response_cache()
+
+    async def test_repeated_message_uses_cache(self):
+        """Should skip the provider for an identical plain reply."""
+        reply = {"response": "Hi there!", "tool_calls": [], "actions": []}
+        with patch("belle.llm._chat_uncached", new_callable=AsyncMock) as mock_chat:
+            mock_chat.return_value = reply
+
+            first = await chat_async("Hello Belle")
+            second = await chat_async("  hello belle ")
+
+        assert first == second == reply
+        mock_chat.assert_called_once()
+
+    async def test_tool_call_replies_not_cached(self):
+        """Should run the provider again when the reply controlled a device."""
+        reply = {
+            "response": "Done.",
+            "tool_calls": [{"name": "control_room", "arguments": {"room_name": "Kitchen"}}],
+            "actions": [],
+        }
+        with patch("belle.llm._chat_uncached", new_callable=AsyncMock) as mock_chat:
+            mock_chat.return_value = reply
+
+            await chat_async("turn off the kitchen")
+            await chat_async("turn off the kitchen")
+
+        assert mock_chat.call_count == 2
+
+    async def test_cached_reply_is_isolated(self):
+        """Should keep the cached reply intact when a caller mutates its copy."""
+        reply = {"response": "Hi there!", "tool_calls": [], "actions": []}
+        with patch("belle.llm._chat_uncached", new_callable=AsyncMock) as mock_chat:
+            mock_chat.return_value = reply
+
+            (await chat_async("Hello Belle"))["actions"].append("changed")
+            (await chat_async("Hello Belle"))["response"] = "changed"
+            third = await chat_async("Hello Belle")
+
+        assert third == {"response": "Hi there!", "tool_calls": [], "actions": []}
+        mock_chat.assert_called_once()
+
+    async def test_commands_without_tool_calls_not_cached(self):
+        """Should let a retried command reach the model after it skipped the tool."""
+        reply = {"response": "Done!", "tool_calls": [], "actions": []}
+        with patch("belle.llm._chat_uncached", new_callable=AsyncMock) as mock_chat:
+            mock_chat.return_value = reply
+
+            await chat_async("turn off the lights")
+            await chat_async("turn off the lights")
+            await chat_async("desliga a luz da cozinha")
+            await chat_async("desliga a luz da cozinha")
+
+        assert mock_chat.call_count == 4
+
+    async def test_state_questions_not_cached(self):
+        """Should not replay answers about live device state."""
+        reply = {"response": "The kitchen light is on.", "tool_calls": [], "actions": []}
+        with patch("belle.llm._chat_uncached", new_callable=AsyncMock) as mock_chat:
+            mock_chat.return_value = reply
+
+            await chat_async("is the kitchen light on")
+            await chat_async("is the kitchen light on")
+
+        assert mock_chat.call_count == 2
+
+    async def test_multi_turn_not_cached(self):
+        """Should bypass the cache when conversation history is present."""
+        reply = {"response": "Sure.", "tool_calls": [], "actions": []}
+        history = [{"role": "user", "content": "hi"}]
+        with patch("belle.llm._chat_uncached", new_callable=AsyncMock) as mock_chat:
+            mock_chat.return_value = reply
+
+            await chat_async("thanks", history)
+            await chat_async("thanks", history)
+
+        assert mock_chat.call_count == 2
+
+
+class TestPromptCache:
+    """Tests for KV prompt cache reuse in the local provider."""
+
+    def test_common_prefix_len(self):
+        """Should count leading tokens shared by two prompts."""
+        from belle.llm.local import _common_prefix_len
+
+        assert _common_prefix_len([1, 2, 3, 4], [1, 2, 9]) == 2
+        assert _common_prefix_len([], [1, 2]) == 0
+        assert _common_prefix_len([1, 2], [1, 2, 3]) == 2
+
+    def test_generate_reuses_shared_prefix(self):
+        """Should trim the cache to the shared prefix and prefill only the rest."""
+        cache = [MagicMock(offset=0)]
+        mlx_lm = types.ModuleType("mlx_lm")
+        mlx_lm.generate = MagicMock(return_value="ok")
+        cache_module = types.ModuleType("mlx_lm.models.cache")
+        cache_module.make_prompt_cache = MagicMock(return_value=cache)
+        cache_module.can_trim_prompt_cache = MagicMock(return_value=True)
+        cache_module.trim_prompt_cache = MagicMock()
+
+        modules = {
+            "mlx_lm": mlx_lm,
+            "mlx_lm.models": types.ModuleType("mlx_lm.models"),
+            "mlx_lm.models.cache": cache_module,
+        }
+        with (
+            patch.dict(sys.modules, modules),
+            patch.object(local, "_prompt_cache", None),
+            patch.object(local, "_prompt_cache_tokens", []),
+        ):
+            local._generate_cached("model", "tokenizer", [1, 2, 3, 4])
+            assert mlx_lm.generate.call_args.kwargs["prompt"] == [1, 2, 3, 4]
+
+            # First prompt plus two generated tokens now sit in the cache
+            cache[0].offset = 6
+            local._generate_cached("model", "tokenizer", [1, 2, 3, 7, 8])
+
+            cache_module.make_prompt_cache.assert_called_once()
+            cache_module.trim_prompt_cache.assert_called_once_with(cache, 3)
+            assert mlx_lm.generate.call_args.kwargs["prompt"] == [7, 8]
+
+
+class TestLoadModel:
+    """Tests for lazy LLM loading."""
+
+    def test_concurrent_loads_share_one_model(self):
+        """Should load the weights once when preload and a request race."""
+        loads = []
+
+        def slow_load():
+            loads.append(1)
+            time.sleep(0.05)
+            local._model, local._tokenizer = object(), object()
+            return local._model, local._tokenizer
+
+        with (
+            patch.object(local, "_model", None),
+            patch.object(local, "_tokenizer", None),
+            patch.object(local, "_load_weights", slow_load),
+        ):
+            results = []
+            threads = [
+                threading.Thread(target=lambda: results.append(local._load_model()))
+                for _ in range(4)
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        assert len(loads) == 1
+        assert len(set(results)) == 1
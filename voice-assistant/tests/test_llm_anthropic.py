@@ -32,6 +32,10 @@ class TestConvertTools:
             assert schema["type"] == "object"
             assert "properties" in schema
 
+    def test_conversion_is_reused(self):
+        """Should build the converted tool list once and reuse it."""
+        assert _convert_tools_for_anthropic() is _convert_tools_for_anthropic()
+
 
 class TestChatAsync:
     """Tests for the Anthropic chat_async function."""
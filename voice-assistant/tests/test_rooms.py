@@ -1,9 +1,12 @@
 """Tests for room control tools."""
 
+import asyncio
 from unittest.mock import AsyncMock, MagicMock, patch
 
+import orjson
 import pytest
 
+import belle.tools.rooms as rooms_module
 from belle.tools.rooms import (
     _get_shade_state_update,
     _is_blind_tilt,
@@ -11,6 +14,7 @@ from belle.tools.rooms import (
     _room_cache,
     control_room,
     control_room_shades,
+    describe_state_update,
     get_all_rooms,
 )
 
@@ -207,8 +211,8 @@ class TestControlRoom:
 
             # Verify the state sent includes both brightness and on=True
             call_args = mock_client.put.call_args
-            assert call_args[1]["json"]["brightness"] == 75
-            assert call_args[1]["json"]["on"] is True
+            assert orjson.loads(call_args[1]["content"])["brightness"] == 75
+            assert orjson.loads(call_args[1]["content"])["on"] is True
 
     @pytest.mark.asyncio
     async def test_control_room_partial_name_match(self, mock_rooms):
@@ -268,6 +272,133 @@ class TestControlRoom:
             assert any(r["success"] for r in result["results"])
             assert any(not r["success"] for r in result["results"])
 
+    @pytest.mark.asyncio
+    async def test_control_room_sends_puts_concurrently(self, mock_rooms, concurrency_probe):
+        """Should have every device's PUT in flight at once, keeping results in order."""
+        with (
+            patch("belle.tools.rooms._get_cached_rooms", AsyncMock(return_value=mock_rooms)),
+            patch("belle.tools.rooms.get_client", new_callable=AsyncMock) as mock_get_client,
+        ):
+            mock_get_client.return_value = concurrency_probe
+            result = await control_room("Living Room", on=False)
+
+        assert concurrency_probe.peak == 2
+        assert [r["device"] for r in result["results"]] == ["Living Room Lamp", "Living Room Light"]
+
+    @pytest.mark.asyncio
+    async def test_control_room_keeps_room_cache(self, mock_rooms):
+        """Should keep serving the cached room list after a state change."""
+        _room_cache.set(mock_rooms)
+
+        with patch("belle.tools.rooms.get_client", new_callable=AsyncMock) as mock_get_client:
+            mock_get_client.return_value = AsyncMock(put=AsyncMock(return_value=MagicMock()))
+            result = await control_room("Living Room", on=True)
+
+        assert result["devices_controlled"] == 2
+        assert _room_cache.get() is mock_rooms
+
+
+class TestBulkDeviceUpdates:
+    """Tests for sending a room's updates in one PUT /devices/bulk request."""
+
+    @pytest.fixture(autouse=True)
+    def enable_bulk(self, monkeypatch):
+        monkeypatch.setattr(rooms_module.settings, "bulk_device_updates", True)
+        monkeypatch.setattr(rooms_module, "_bulk_supported", True)
+        _room_cache.clear()
+
+    @pytest.fixture
+    def mock_rooms(self):
+        return [
+            {
+                "id": "room-1",
+                "name": "Living Room",
+                "devices": [
+                    {"id": "dev-1", "name": "Living Room Lamp", "externalId": "hue-1"},
+                    {"id": "dev-2", "name": "Living Room Light", "externalId": "hue-2"},
+                ],
+            },
+        ]
+
+    @pytest.mark.asyncio
+    async def test_one_request_per_room(self, mock_rooms):
+        """Should send every device's update in one request and map the results back."""
+        response = MagicMock(status_code=200)
+        response.content = orjson.dumps({"results": [
+            {"id": "hue-1", "success": True},
+            {"id": "hue-2", "success": False, "error": "unreachable"},
+        ]})
+        mock_client = AsyncMock()
+        mock_client.put = AsyncMock(return_value=response)
+
+        with (
+            patch("belle.tools.rooms._get_cached_rooms", AsyncMock(return_value=mock_rooms)),
+            patch("belle.tools.rooms.get_client", AsyncMock(return_value=mock_client)),
+        ):
+            result = await control_room("Living Room", brightness=40)
+
+        mock_client.put.assert_called_once()
+        url = mock_client.put.call_args[0][0]
+        payload = orjson.loads(mock_client.put.call_args[1]["content"])
+        assert url == "/devices/bulk"
+        assert payload == [
+            {"id": "hue-1", "state": {"brightness": 40, "on": True}},
+            {"id": "hue-2", "state": {"brightness": 40, "on": True}},
+        ]
+        assert result["devices_controlled"] == 1
+        assert result["results"][1] == {
+            "device": "Living Room Light", "success": False, "error": "unreachable",
+        }
+
+    @pytest.mark.asyncio
+    async def test_short_results_fail_every_device(self, mock_rooms):
+        """Should report every device as failed when results can't be paired up."""
+        response = MagicMock(status_code=200)
+        response.content = orjson.dumps({"results": [{"id": "hue-1", "success": True}]})
+        mock_client = AsyncMock()
+        mock_client.put = AsyncMock(return_value=response)
+
+        with (
+            patch("belle.tools.rooms._get_cached_rooms", AsyncMock(return_value=mock_rooms)),
+            patch("belle.tools.rooms.get_client", AsyncMock(return_value=mock_client)),
+        ):
+            result = await control_room("Living Room", on=False)
+
+        assert result["devices_controlled"] == 0
+        assert [r["device"] for r in result["results"]] == ["Living Room Lamp", "Living Room Light"]
+        assert not any(r["success"] for r in result["results"])
+
+    @pytest.mark.asyncio
+    async def test_falls_back_without_bulk_endpoint(self, mock_rooms):
+        """Should PUT each device, and stop trying bulk, when the server lacks the endpoint."""
+        mock_client = AsyncMock()
+        mock_client.put = AsyncMock(return_value=MagicMock(status_code=404))
+
+        with (
+            patch("belle.tools.rooms._get_cached_rooms", AsyncMock(return_value=mock_rooms)),
+            patch("belle.tools.rooms.get_client", AsyncMock(return_value=mock_client)),
+        ):
+            await control_room("Living Room", on=True)
+            urls = [call[0][0] for call in mock_client.put.call_args_list]
+            assert urls[0] == "/devices/bulk"
+            assert sorted(urls[1:]) == ["/devices/hue-1", "/devices/hue-2"]
+            assert rooms_module._bulk_supported is False
+
+            mock_client.put.reset_mock()
+            await control_room("Living Room", on=False)
+            assert mock_client.put.call_count == 2
+
+
+class TestDescribeStateUpdate:
+    """Tests for the action description shared by the control tools."""
+
+    def test_describes_fields_in_order(self):
+        """Should list set fields in a fixed order regardless of dict order."""
+        update = {"colorTemp": 2700, "brightness": 50, "on": True}
+        assert describe_state_update(update) == "on, brightness 50%, color temp 2700K"
+        assert describe_state_update({"on": False, "color": {"hue": 0}}) == "off, color changed"
+        assert describe_state_update({}) == ""
+
 
 class TestShadeHelpers:
     """Tests for shade helper functions in rooms module."""
@@ -357,6 +488,14 @@ class TestShadeHelpers:
         assert state["brightness"] == 25
         assert state["on"] is True
 
+    def test_get_shade_state_update_position_blind_tilt_clamped(self):
+        """Should clamp out-of-range openness to the Blind Tilt range."""
+        device = {"deviceType": "Blind Tilt", "name": "Blinds"}
+
+        assert _get_shade_state_update(device, "position", 100)["brightness"] == 50
+        assert _get_shade_state_update(device, "position", 200)["brightness"] == 50
+        assert _get_shade_state_update(device, "position", -5)["brightness"] == 0
+
     def test_get_shade_state_update_position_curtain(self):
         """Should pass position directly for Curtain."""
         device = {"deviceType": "Curtain", "name": "Curtain"}
@@ -480,7 +619,7 @@ class TestControlRoomShades:
             assert len(calls) == 3
 
             # Blind Tilt devices should get brightness=50, Curtain should get brightness=100
-            brightness_values = [call[1]["json"]["brightness"] for call in calls]
+            brightness_values = [orjson.loads(call[1]["content"])["brightness"] for call in calls]
             assert 50 in brightness_values  # Blind Tilt
             assert 100 in brightness_values  # Curtain
 
@@ -598,4 +737,40 @@ class TestControlRoomShades:
 
             # Verify brightness=0 was sent
             call_args = mock_client.put.call_args
-            assert call_args[1]["json"]["brightness"] == 0
+            assert orjson.loads(call_args[1]["content"])["brightness"] == 0
+
+    @pytest.mark.asyncio
+    async def test_shades_move_concurrently(self, mock_rooms_with_shades, concurrency_probe):
+        """Should send every shade its own state update with all PUTs in flight at once."""
+        with (
+            patch(
+                "belle.tools.rooms._get_cached_rooms",
+                AsyncMock(return_value=mock_rooms_with_shades),
+            ),
+            patch("belle.tools.rooms.get_client", new_callable=AsyncMock) as mock_get_client,
+        ):
+            mock_get_client.return_value = concurrency_probe
+            result = await control_room_shades("Living Room", "open")
+
+        assert concurrency_probe.peak == 3
+        assert result["shades_controlled"] == 3
+        sent = {url: orjson.loads(kwargs["content"]) for url, kwargs in concurrency_probe.calls}
+        assert sent["/devices/sb-1"]["brightness"] == 50
+        assert sent["/devices/sb-3"]["brightness"] == 100
+
+    @pytest.mark.asyncio
+    async def test_shade_fan_out_is_bounded(self, mock_rooms_with_shades, concurrency_probe):
+        """Should keep at most max_concurrent_device_puts PUTs in flight."""
+        with (
+            patch(
+                "belle.tools.rooms._get_cached_rooms",
+                AsyncMock(return_value=mock_rooms_with_shades),
+            ),
+            patch("belle.tools.rooms.get_client", new_callable=AsyncMock) as mock_get_client,
+            patch("belle.http._device_put_semaphore", asyncio.Semaphore(2)),
+        ):
+            mock_get_client.return_value = concurrency_probe
+            result = await control_room_shades("Living Room", "close")
+
+        assert concurrency_probe.peak == 2
+        assert result["shades_controlled"] == 3
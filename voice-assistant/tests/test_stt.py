@@ -0,0 +1,235 @@
+"""Tests for speech-to-text helpers."""
+
+import asyncio
+import sys
+import threading
+import types
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+import pytest
+
+import belle.stt as stt
+from belle.mlx_lock import prefetch_model
+from belle.stt import (
+    _calculate_confidence,
+    is_silent_audio,
+    is_valid_speech,
+    transcribe_audio,
+    transcribe_audio_async,
+    transcribe_audio_file,
+)
+
+
+@pytest.fixture
+def fake_whisper():
+    """Stand-in mlx_whisper module with a freshly loaded model and empty cache."""
+    whisper = types.ModuleType("mlx_whisper")
+    whisper.transcribe = MagicMock(return_value={"text": "lights on", "language": "en"})
+
+    with (
+        patch.dict(sys.modules, {"mlx_whisper": whisper}),
+        patch.object(stt, "prefetch_model"),
+        patch.object(stt, "_model", None),
+        patch.object(stt, "_base_options", None),
+    ):
+        stt.clear_cache()
+        yield whisper
+        stt.clear_cache()
+
+
+class TestCalculateConfidence:
+    """Tests for segment confidence metrics."""
+
+    def test_no_segments(self):
+        """Should report low quality when there are no segments."""
+        confidence = _calculate_confidence([])
+        assert confidence["confidence_score"] == 0.0
+        assert confidence["quality"] == "low"
+
+    def test_averages_segments(self):
+        """Should average logprob and no-speech probability across segments."""
+        segments = [
+            {"avg_logprob": -0.2, "no_speech_prob": 0.1},
+            {"avg_logprob": -0.4, "no_speech_prob": 0.3},
+        ]
+        confidence = _calculate_confidence(segments)
+
+        assert confidence["avg_logprob"] == pytest.approx(-0.3)
+        assert confidence["no_speech_prob"] == pytest.approx(0.2)
+        assert confidence["confidence_score"] == pytest.approx(0.7 * 0.7 + 0.3 * 0.8)
+        assert confidence["quality"] == "high"
+
+    def test_missing_metrics_use_defaults(self):
+        """Should fall back to defaults for metrics no segment reports."""
+        confidence = _calculate_confidence([{"text": "hi"}])
+
+        assert confidence["avg_logprob"] == -1.0
+        assert confidence["no_speech_prob"] == 0.5
+        assert confidence["confidence_score"] == pytest.approx(0.15)
+
+    def test_values_are_plain_floats(self):
+        """Should return JSON-serializable floats, not NumPy scalars."""
+        confidence = _calculate_confidence([{"avg_logprob": -0.1, "no_speech_prob": 0.0}])
+        assert all(
+            type(confidence[key]) is float
+            for key in ("avg_logprob", "no_speech_prob", "confidence_score")
+        )
+
+
+class TestSpeechGates:
+    """Tests for the silence and valid-speech checks."""
+
+    def test_silent_audio(self):
+        """Should flag empty and near-silent audio."""
+        assert is_silent_audio(np.zeros(0, dtype=np.float32))
+        assert is_silent_audio(np.full(1600, 0.001, dtype=np.float32))
+        assert not is_silent_audio(np.full(1600, 0.5, dtype=np.float32))
+
+    def test_valid_speech(self):
+        """Should accept confident speech and reject hallucinations."""
+        confidence = {"no_speech_prob": 0.1, "confidence_score": 0.9}
+        assert is_valid_speech({"text": "turn on the lights", "confidence": confidence})
+        assert not is_valid_speech({"text": "Thanks for watching!", "confidence": confidence})
+        assert not is_valid_speech({"text": "", "confidence": confidence})
+
+
+class TestTranscribeOptions:
+    """Tests for the prebuilt transcription options."""
+
+    def test_language_override_does_not_leak(self, fake_whisper):
+        """Should apply a per-request language without changing the shared options."""
+        fake_whisper.transcribe.return_value = {"text": " oi ", "language": "pt"}
+
+        audio = np.full(1600, 0.25, dtype=np.float32)
+        result = transcribe_audio(audio, language="pt")
+        assert fake_whisper.transcribe.call_args.kwargs["language"] == "pt"
+
+        transcribe_audio(audio)
+        assert "language" not in fake_whisper.transcribe.call_args.kwargs
+        assert "language" not in stt._base_options
+
+        assert result["text"] == "oi"
+
+
+class TestTranscriptCache:
+    """Tests for the repeated-audio transcription cache."""
+
+    def test_repeated_audio_hits_cache(self, fake_whisper):
+        """Should transcribe identical audio only once per language."""
+        audio = np.linspace(-0.5, 0.5, 1600, dtype=np.float32)
+        first = transcribe_audio(audio)
+        second = asyncio.run(transcribe_audio_async(audio.copy()))
+
+        assert second == first
+        assert fake_whisper.transcribe.call_count == 1
+
+        transcribe_audio(audio, language="pt")
+        transcribe_audio(audio[::-1].copy())
+        assert fake_whisper.transcribe.call_count == 3
+
+    def test_cached_result_is_isolated(self, fake_whisper):
+        """Should keep the cached transcript intact when a caller mutates its result."""
+        audio = np.linspace(-0.5, 0.5, 1600, dtype=np.float32)
+        transcribe_audio(audio)["text"] = "changed"
+        transcribe_audio(audio)["confidence"]["quality"] = "changed"
+
+        result = transcribe_audio(audio)
+        assert result["text"] == "lights on"
+        assert result["confidence"]["quality"] != "changed"
+        assert fake_whisper.transcribe.call_count == 1
+
+    def test_sampling_temperature_skips_cache(self, fake_whisper):
+        """Should not reuse results when decoding isn't deterministic."""
+        audio = np.linspace(-0.5, 0.5, 1600, dtype=np.float32)
+        with patch.object(stt.settings, "whisper_temperature", 0.4):
+            transcribe_audio(audio)
+            transcribe_audio(audio)
+
+        assert fake_whisper.transcribe.call_count == 2
+
+
+class TestPcmInput:
+    """Tests for raw PCM input."""
+
+    def test_pcm_bytes_are_scaled(self, fake_whisper):
+        """Should pass raw int16 PCM to Whisper as scaled float32, ignoring a stray byte."""
+        pcm = np.array([0, 16384, -32768], dtype="<i2").tobytes() + b"\x01"
+        transcribe_audio(pcm)
+
+        audio = fake_whisper.transcribe.call_args.args[0]
+        assert audio.dtype == np.float32
+        np.testing.assert_array_equal(audio, [0.0, 0.5, -1.0])
+
+
+class TestWhisperThread:
+    """Tests for the dedicated Whisper worker thread."""
+
+    def test_async_runs_on_whisper_thread(self, fake_whisper):
+        """Should run async transcriptions on the dedicated Whisper thread."""
+        threads = []
+        fake_whisper.transcribe.side_effect = lambda *a, **kw: (
+            threads.append(threading.current_thread().name) or {"text": "hi"}
+        )
+        asyncio.run(transcribe_audio_async(np.ones(1600, dtype=np.float32)))
+
+        assert threads and threads[0].startswith("whisper")
+
+
+class TestSilenceSkip:
+    """Tests for answering silent audio without running Whisper."""
+
+    def test_silent_audio_skips_whisper(self, fake_whisper):
+        """Should answer silent audio with an empty low-confidence result."""
+        silence = np.zeros(16000, dtype=np.float32)
+        result = transcribe_audio(silence, language="en")
+        assert result["text"] == ""
+        assert result["language"] == "en"
+        assert result["confidence"]["quality"] == "low"
+
+        assert asyncio.run(transcribe_audio_async(bytes(3200)))["text"] == ""
+        fake_whisper.transcribe.assert_not_called()
+
+
+class TestTranscribeFile:
+    """Tests for transcribing audio files."""
+
+    def test_wav_file_read_in_process(self, fake_whisper, tmp_path):
+        """Should decode 16 kHz WAV files with soundfile instead of ffmpeg."""
+        sf = pytest.importorskip("soundfile")
+
+        stereo = np.full((1600, 2), 0.25, dtype=np.float32)
+        sf.write(tmp_path / "clip.wav", stereo, 16000)
+        sf.write(tmp_path / "clip_44k.wav", stereo, 44100)
+
+        transcribe_audio_file(tmp_path / "clip.wav")
+        audio = fake_whisper.transcribe.call_args.args[0]
+        assert isinstance(audio, np.ndarray) and audio.shape == (1600,)
+
+        transcribe_audio_file(tmp_path / "clip_44k.wav")
+        assert fake_whisper.transcribe.call_args.args[0] == str(tmp_path / "clip_44k.wav")
+
+
+class TestPreload:
+    """Tests for Whisper preload and warm-up."""
+
+    def test_prefetch_fetches_only_model_files(self):
+        """Should download just the files mlx_whisper reads, not the whole repo."""
+        hub = types.ModuleType("huggingface_hub")
+        hub.snapshot_download = MagicMock()
+
+        with patch.dict(sys.modules, {"huggingface_hub": hub}):
+            prefetch_model("mlx-community/whisper-tiny", stt._MODEL_FILES)
+
+        hub.snapshot_download.assert_called_once_with(
+            "mlx-community/whisper-tiny", allow_patterns=["*.json", "*.npz", "*.safetensors"]
+        )
+
+    def test_preload_warms_up_whisper(self, fake_whisper):
+        """Should run one silent transcription at preload, tolerating failures."""
+        stt.preload_model()
+        audio = fake_whisper.transcribe.call_args.args[0]
+        assert audio.shape == (16000,) and not audio.any()
+
+        fake_whisper.transcribe.side_effect = RuntimeError("no GPU")
+        stt._warm_up()
@@ -1,14 +1,22 @@
 """Tests for tool functions."""
 
-from unittest.mock import AsyncMock, patch
+import asyncio
+import os
+import time
+from unittest.mock import AsyncMock, MagicMock, patch
 
+import orjson
 import pytest
 
+import belle.tools.devices as devices_module
 from belle.tools.devices import (
     TILT_POSITIONS,
     _is_blind_tilt,
+    _project_device,
     control_device,
     control_shade,
+    get_all_devices,
+    get_device_help,
     get_device_status,
 )
 
@@ -45,6 +53,19 @@ class TestControlDevice:
             assert result["success"] is False
             assert "not found" in result["error"]
 
+    @pytest.mark.asyncio
+    async def test_control_device_room_hint(self, mock_devices):
+        """Should point room-like names at control_room."""
+        with patch("belle.tools.devices._get_cached_devices", new_callable=AsyncMock) as mock:
+            mock.return_value = mock_devices
+
+            result = await control_device("Bedroom Ceiling", on=True)
+            assert "control_room" in result["error"]
+            assert result["hint"] is not None
+
+            result = await control_device("Toaster", on=True)
+            assert result["hint"] is None
+
     @pytest.mark.asyncio
     async def test_control_device_no_state(self, mock_devices):
         """Should return error when no state changes specified."""
@@ -77,6 +98,8 @@ class TestControlDevice:
             assert result["success"] is True
             assert result["device"] == "Kitchen Light"
             assert "off" in result["action"]
+            # The response body is only decoded for debug logging
+            mock_response.json.assert_not_called()
 
 
 class TestGetDeviceStatus:
@@ -116,6 +139,214 @@ class TestGetDeviceStatus:
             assert result["device"]["state"]["brightness"] == 75
 
 
+class TestDeviceNameIndex:
+    """Tests for the device name index built on refresh."""
+
+    @pytest.mark.asyncio
+    async def test_refresh_builds_index(self):
+        """Should resolve exact names via the index and fall back for partial names."""
+        devices = [
+            {"id": "1", "name": "Desk Lamp"},
+            {"id": "2", "name": "Kitchen  Light"},
+        ]
+        response = MagicMock()
+        response.content = orjson.dumps(devices)
+        client = AsyncMock()
+        client.get.return_value = response
+
+        with (
+            patch("belle.tools.devices.get_client", AsyncMock(return_value=client)),
+            patch.object(devices_module, "_device_views", None),
+        ):
+            fetched = await devices_module._refresh_device_cache()
+            devices_module._device_cache.clear()
+
+            with patch("belle.http.find_by_name") as mock_find:
+                assert devices_module._find_device(fetched, "kitchen light") is fetched[1]
+                mock_find.assert_not_called()
+
+            assert devices_module._find_device(fetched, "Desk") is fetched[0]
+            # A list the index wasn't built from is searched directly
+            assert devices_module._find_device([{"name": "Fan"}], "desk lamp") is None
+
+    @pytest.mark.asyncio
+    async def test_repeated_miss_is_remembered(self):
+        """Should run the fuzzy search once per unknown name and device list."""
+        mock_devices = [{"id": "1", "name": "Kitchen Light"}]
+        devices_module._device_misses.clear()
+        with (
+            patch("belle.tools.devices._get_cached_devices", AsyncMock(return_value=mock_devices)),
+            patch.object(devices_module, "_device_views", None),
+            patch("belle.tools.devices.find_by_name", return_value=None) as mock_find,
+            patch(
+                "belle.tools.devices.get_close_matches_for_name", return_value=["Kitchen Light"]
+            ) as mock_close,
+        ):
+            for _ in range(3):
+                result = await get_device_status("Kitchn Lihgt")
+                assert result["suggestions"] == ["Kitchen Light"]
+
+            assert mock_find.call_count == 1
+            assert mock_close.call_count == 1
+
+            # A different (refreshed) device list searches again
+            devices_module._find_device(list(mock_devices), "Kitchn Lihgt")
+            assert mock_find.call_count == 2
+        devices_module._device_misses.clear()
+
+
+class TestProjectDevice:
+    """Tests for trimming API device payloads before caching."""
+
+    def test_keeps_only_used_fields(self):
+        """Should drop unused fields and reduce the room to its name."""
+        device = {
+            "id": "1",
+            "name": "Desk Lamp",
+            "deviceType": "Color Bulb",
+            "state": {"on": True},
+            "room": {"id": "r1", "name": "Office", "devices": [{"id": "1"}]},
+            "externalId": "abc",
+            "createdAt": "2024-01-01",
+        }
+
+        assert _project_device(device) == {
+            "id": "1",
+            "name": "Desk Lamp",
+            "deviceType": "Color Bulb",
+            "state": {"on": True},
+            "room": {"name": "Office"},
+        }
+
+
+class TestGetAllDevices:
+    """Tests for the get_all_devices function."""
+
+    @pytest.mark.asyncio
+    async def test_uses_cache_unless_forced(self):
+        """Should list cached devices and only refetch when forced."""
+        devices = [{"id": "1", "name": "Desk Lamp"}]
+        with (
+            patch("belle.tools.devices._get_cached_devices", AsyncMock(return_value=devices)),
+            patch(
+                "belle.tools.devices._refresh_device_cache", AsyncMock(return_value=devices)
+            ) as mock_refresh,
+        ):
+            assert (await get_all_devices())["count"] == 1
+            mock_refresh.assert_not_called()
+
+            await get_all_devices(force=True)
+            mock_refresh.assert_awaited_once()
+
+
+class TestDeviceViews:
+    """Tests for per-refresh shade names and capabilities."""
+
+    def test_shade_names_and_capabilities(self):
+        """Should precompute shade suggestions and capabilities once per list."""
+        devices = [
+            {"id": "1", "name": "Desk Lamp", "state": {"on": True, "brightness": 40}},
+            {"id": "2", "name": "Bedroom Persiana", "deviceType": "Roller Shade", "state": {}},
+            {"id": "3", "name": "Office", "deviceType": "Blind Tilt", "state": {}},
+        ]
+        views = devices_module._build_views(devices)
+
+        assert views.names == ["Desk Lamp", "Bedroom Persiana", "Office"]
+        assert views.shade_names == ["Bedroom Persiana", "Office"]
+        assert views.capabilities["1"]["brightness"] is True
+        assert views.capabilities["3"]["is_blind_tilt"] is True
+
+    @pytest.mark.asyncio
+    async def test_device_help_uses_precomputed_capabilities(self):
+        """Should reuse capabilities built on refresh in get_device_help."""
+        devices = [{"id": "1", "name": "Desk Lamp", "state": {"on": True}}]
+        views = devices_module._build_views(devices)
+
+        with (
+            patch.object(devices_module, "_device_views", views),
+            patch("belle.tools.devices._get_cached_devices", AsyncMock(return_value=devices)),
+            patch("belle.tools.devices._get_device_capabilities") as mock_caps,
+        ):
+            result = await get_device_help("Desk Lamp")
+
+        mock_caps.assert_not_called()
+        assert result["capabilities"] is views.capabilities["1"]
+
+    @pytest.mark.asyncio
+    async def test_device_help_summary_lists_every_capability(self):
+        """Should list all capabilities in the summary, not just on/off."""
+        devices = [{"id": "1", "name": "Desk Lamp", "state": {"on": True, "brightness": 40}}]
+        with patch("belle.tools.devices._get_cached_devices", AsyncMock(return_value=devices)):
+            result = await get_device_help("Desk Lamp")
+
+        assert result["summary"].endswith("You can: turn it on/off, adjust brightness")
+        assert result["help"][1].startswith("• Set brightness: 'set Desk Lamp to 50%'")
+
+
+class TestDeviceRefresh:
+    """Tests for coalescing device cache refreshes."""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_refreshes_share_one_request(self):
+        """Should issue a single GET /devices for concurrent cache misses."""
+        devices = [{"id": "1", "name": "Desk Lamp"}]
+        response = MagicMock()
+        response.content = orjson.dumps(devices)
+
+        async def slow_get(path):
+            await asyncio.sleep(0.01)
+            return response
+
+        client = AsyncMock()
+        client.get.side_effect = slow_get
+
+        devices_module._device_cache.invalidate_only()
+        with patch("belle.tools.devices.get_client", AsyncMock(return_value=client)):
+            results = await asyncio.gather(
+                devices_module._get_cached_devices(),
+                devices_module._get_cached_devices(),
+                devices_module.get_all_devices(),
+            )
+        devices_module._device_cache.invalidate_only()
+
+        assert client.get.await_count == 1
+        assert results[0] == devices and results[1] is results[0]
+        assert results[2]["devices"] == [{
+            "id": "1", "name": "Desk Lamp", "type": None, "room": None,
+            "on": None, "brightness": None, "reachable": True,
+        }]
+
+
+class TestPersistedDevices:
+    """Tests for restoring the device list saved by a previous run."""
+
+    def test_round_trip(self, tmp_path, monkeypatch):
+        """Should restore a fresh saved list and ignore one older than the TTL."""
+        from belle.config import settings
+
+        path = tmp_path / "belle" / "devices.json"
+        monkeypatch.setattr(settings, "device_cache_file", str(path))
+        devices = [{"id": "1", "name": "Desk Lamp"}]
+
+        devices_module._persist_devices(orjson.dumps(devices))
+        try:
+            restored = devices_module._restore_devices()
+            assert restored == devices
+            assert devices_module._device_cache.get() is restored
+            assert devices_module._find_device(restored, "desk lamp") is restored[0]
+
+            stale = time.time() - devices_module._device_cache.base_ttl - 1
+            os.utime(path, (stale, stale))
+            assert devices_module._restore_devices() is None
+        finally:
+            devices_module._device_cache.invalidate_only()
+
+    def test_disabled(self):
+        """Should neither read nor write when no cache file is configured."""
+        devices_module._persist_devices(b"[]")
+        assert devices_module._restore_devices() is None
+
+
 class TestBlindTiltHelpers:
     """Tests for Blind Tilt helper functions."""
 
@@ -207,8 +438,9 @@ class TestControlShade:
 
             # Verify the state sent: tiltPosition should be closed-down
             call_args = mock_http.put.call_args
-            assert call_args[1]["json"]["tiltPosition"] == "closed-down"
-            assert call_args[1]["json"]["on"] is False
+            payload = orjson.loads(call_args[1]["content"])
+            assert payload["tiltPosition"] == "closed-down"
+            assert payload["on"] is False
 
     @pytest.mark.asyncio
     async def test_open_blind_tilt(self, mock_devices):
@@ -232,8 +464,9 @@ class TestControlShade:
 
             # Verify the state sent: tiltPosition should be open
             call_args = mock_http.put.call_args
-            assert call_args[1]["json"]["tiltPosition"] == "open"
-            assert call_args[1]["json"]["on"] is True
+            payload = orjson.loads(call_args[1]["content"])
+            assert payload["tiltPosition"] == "open"
+            assert payload["on"] is True
 
     @pytest.mark.asyncio
     async def test_open_regular_curtain(self, mock_devices):
@@ -256,7 +489,8 @@ class TestControlShade:
 
             # Verify the state sent: brightness should be 100 for regular curtain
             call_args = mock_http.put.call_args
-            assert call_args[1]["json"]["brightness"] == 100
+            payload = orjson.loads(call_args[1]["content"])
+            assert payload["brightness"] == 100
 
     @pytest.mark.asyncio
     async def test_close_regular_curtain(self, mock_devices):
@@ -279,7 +513,8 @@ class TestControlShade:
 
             # Verify the state sent: brightness should be 0
             call_args = mock_http.put.call_args
-            assert call_args[1]["json"]["brightness"] == 0
+            payload = orjson.loads(call_args[1]["content"])
+            assert payload["brightness"] == 0
 
     @pytest.mark.asyncio
     async def test_set_position_blind_tilt(self, mock_devices):
@@ -304,7 +539,33 @@ class TestControlShade:
 
             # Verify the state sent: 50% maps to 'open' tilt position
             call_args = mock_http.put.call_args
-            assert call_args[1]["json"]["tiltPosition"] == "open"
+            payload = orjson.loads(call_args[1]["content"])
+            assert payload["tiltPosition"] == "open"
+
+    @pytest.mark.asyncio
+    async def test_blind_tilt_position_rounding(self, mock_devices):
+        """Should clamp out-of-range positions and round to the nearest tilt step."""
+        with (
+            patch("belle.tools.devices._get_cached_devices", new_callable=AsyncMock) as mock_cache,
+            patch("belle.tools.devices.get_client", new_callable=AsyncMock) as mock_client,
+        ):
+            mock_cache.return_value = mock_devices
+            mock_http = AsyncMock()
+            mock_http.put = AsyncMock(return_value=MagicMock())
+            mock_client.return_value = mock_http
+
+            expected = {
+                -10: "closed-down",
+                12: "closed-down",
+                13: "half-closed",
+                62: "open",
+                63: "half-open",
+                150: "closed-up",
+            }
+            for position, tilt in expected.items():
+                await control_shade("Living Room Blinds", "position", position=position)
+                payload = orjson.loads(mock_http.put.call_args[1]["content"])
+                assert payload["tiltPosition"] == tilt
 
     @pytest.mark.asyncio
     async def test_set_position_regular_shade(self, mock_devices):
@@ -328,7 +589,8 @@ class TestControlShade:
 
             # Verify the state sent: position should be passed directly
             call_args = mock_http.put.call_args
-            assert call_args[1]["json"]["brightness"] == 75
+            payload = orjson.loads(call_args[1]["content"])
+            assert payload["brightness"] == 75
 
     @pytest.mark.asyncio
     async def test_position_requires_value(self, mock_devices):
@@ -0,0 +1,295 @@
+"""Tests for text-to-speech helpers."""
+
+import asyncio
+import io
+import re
+import threading
+import time
+import wave
+from contextlib import aclosing
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+
+import belle.tts as tts
+from belle.mlx_lock import mlx_async_lock
+from belle.tts import (
+    clear_cache,
+    synthesize_speech,
+    synthesize_speech_chunks,
+    synthesize_speech_stream_async,
+    synthesize_speech_to_wav,
+    synthesize_speech_to_wav_async,
+)
+
+
+@pytest.fixture(autouse=True)
+def _clear_tts_cache():
+    clear_cache()
+    yield
+    clear_cache()
+
+
+def _fake_pipeline(*segments):
+    """Build a Kokoro-like pipeline that yields the given audio segments."""
+    return lambda text, voice, speed: (SimpleNamespace(audio=a) for a in segments)
+
+
+class TestSynthesizeSpeech:
+    """Tests for whole-utterance synthesis."""
+
+    def test_joins_segments(self):
+        """Should flatten and join segments, skipping ones without audio."""
+        pipeline = _fake_pipeline(
+            np.full((1, 3), 0.25, dtype=np.float32), None, np.full(2, -0.5, dtype=np.float32)
+        )
+        with patch("belle.tts._load_model", return_value=pipeline):
+            audio = synthesize_speech("Hello")
+
+        assert audio.dtype == np.float32
+        assert audio.tolist() == [0.25, 0.25, 0.25, -0.5, -0.5]
+
+    def test_normalizes_peak(self):
+        """Should scale the utterance down when its peak exceeds 1."""
+        pipeline = _fake_pipeline(np.array([0.5, -2.0, 1.0], dtype=np.float32))
+        with patch("belle.tts._load_model", return_value=pipeline):
+            audio = synthesize_speech("Hello")
+
+        assert audio.tolist() == [0.25, -1.0, 0.5]
+
+    def test_no_segments(self):
+        """Should return None when the pipeline produces no audio."""
+        with patch("belle.tts._load_model", return_value=_fake_pipeline(None)):
+            assert synthesize_speech("Hello") is None
+
+
+class TestSynthesizeSpeechToWav:
+    """Tests for WAV synthesis and caching."""
+
+    def test_repeated_text_is_cached(self):
+        """Should only synthesize a repeated reply once."""
+        audio = np.zeros(2400, dtype=np.float32)
+        with patch("belle.tts.synthesize_speech", return_value=audio) as mock_synth:
+            first = synthesize_speech_to_wav("Done!")
+            second = synthesize_speech_to_wav("Done!")
+
+        assert first == second
+        assert first[:4] == b"RIFF"
+        mock_synth.assert_called_once()
+
+    def test_different_voice_not_shared(self):
+        """Should synthesize separately for a different voice."""
+        audio = np.zeros(2400, dtype=np.float32)
+        with patch("belle.tts.synthesize_speech", return_value=audio) as mock_synth:
+            synthesize_speech_to_wav("Done!", voice="af_heart")
+            synthesize_speech_to_wav("Done!", voice="am_adam")
+
+        assert mock_synth.call_count == 2
+
+    def test_out_of_range_samples_saturate(self):
+        """Should clip samples beyond [-1, 1] instead of wrapping around."""
+        audio = np.array([0.5, 1.5, -2.0, -1.0], dtype=np.float32)
+        with patch("belle.tts.synthesize_speech", return_value=audio):
+            wav_bytes = synthesize_speech_to_wav("Loud")
+
+        with wave.open(io.BytesIO(wav_bytes)) as wav_file:
+            frames = wav_file.readframes(wav_file.getnframes())
+        assert np.frombuffer(frames, dtype=np.int16).tolist() == [16383, 32767, -32767, -32767]
+
+    def test_long_text_not_cached(self):
+        """Should not cache long replies that are unlikely to repeat."""
+        audio = np.zeros(2400, dtype=np.float32)
+        text = "word " * 50
+        with patch("belle.tts.synthesize_speech", return_value=audio) as mock_synth:
+            synthesize_speech_to_wav(text)
+            synthesize_speech_to_wav(text)
+
+        assert mock_synth.call_count == 2
+
+    def test_unavailable_not_cached(self):
+        """Should not cache a missing result."""
+        with patch("belle.tts.synthesize_speech", return_value=None) as mock_synth:
+            assert synthesize_speech_to_wav("Done!") is None
+            assert synthesize_speech_to_wav("Done!") is None
+
+        assert mock_synth.call_count == 2
+
+    async def test_cached_reply_skips_gpu_lock(self):
+        """Should serve a cached reply while another request holds the MLX lock."""
+        audio = np.zeros(2400, dtype=np.float32)
+        with patch("belle.tts.synthesize_speech", return_value=audio):
+            expected = synthesize_speech_to_wav("Done!")
+
+        async with mlx_async_lock:
+            assert await synthesize_speech_to_wav_async("Done!") == expected
+
+    async def test_concurrent_requests_share_synthesis(self):
+        """Should synthesize a reply once when it is requested concurrently."""
+        def slow_synth(text, voice=None):
+            time.sleep(0.05)
+            return np.zeros(240, dtype=np.float32)
+
+        text = "word " * 50  # too long to be cached, so only the flight dedupes
+        with patch("belle.tts.synthesize_speech", side_effect=slow_synth) as mock_synth:
+            results = await asyncio.gather(
+                *(synthesize_speech_to_wav_async(text) for _ in range(3))
+            )
+            await synthesize_speech_to_wav_async(text)
+
+        assert len(set(results)) == 1
+        assert mock_synth.call_count == 2
+        assert tts._wav_flights == {}
+
+    async def test_cancelled_caller_keeps_shared_synthesis(self):
+        """Should let a new identical request join a synthesis whose first caller gave up."""
+        def slow_synth(text, voice=None):
+            time.sleep(0.05)
+            return np.zeros(240, dtype=np.float32)
+
+        text = "word " * 50
+        with patch("belle.tts.synthesize_speech", side_effect=slow_synth) as mock_synth:
+            first = asyncio.ensure_future(synthesize_speech_to_wav_async(text))
+            await asyncio.sleep(0.01)
+            first.cancel()
+            second = await synthesize_speech_to_wav_async(text)
+
+        assert second is not None
+        assert mock_synth.call_count == 1
+        assert tts._wav_flights == {}
+
+
+class TestSynthesizeSpeechStream:
+    """Tests for streamed PCM synthesis."""
+
+    def test_chunks_split_per_sentence(self):
+        """Should ask Kokoro for one segment per sentence when streaming."""
+        calls = []
+
+        def pipeline(text, voice, speed, split_pattern):
+            calls.append(re.split(split_pattern, text))
+            return (SimpleNamespace(audio=np.zeros(2, dtype=np.float32)) for _ in calls[-1])
+
+        with patch("belle.tts._load_model", return_value=pipeline):
+            chunks = list(synthesize_speech_chunks("Done! The lights are off. Anything else?"))
+
+        assert calls == [["Done!", "The lights are off.", "Anything else?"]]
+        assert len(chunks) == 3
+
+    async def test_yields_pcm16_per_segment(self):
+        """Should yield one clipped PCM16 chunk per synthesized segment."""
+        segments = [np.full(4, 0.5, dtype=np.float32), np.full(2, 2.0, dtype=np.float32)]
+        with patch("belle.tts.synthesize_speech_chunks", return_value=(s for s in segments)):
+            chunks = [c async for c in synthesize_speech_stream_async("Hello there")]
+
+        assert len(chunks) == 2
+        assert np.frombuffer(chunks[0], dtype=np.int16).tolist() == [16383] * 4
+        assert np.frombuffer(chunks[1], dtype=np.int16).tolist() == [32767] * 2
+
+    async def test_propagates_errors(self):
+        """Should raise synthesis errors from the worker thread."""
+        def failing(text, voice=None):
+            raise RuntimeError("boom")
+            yield  # pragma: no cover
+
+        with patch("belle.tts.synthesize_speech_chunks", failing):
+            with pytest.raises(RuntimeError):
+                async for _ in synthesize_speech_stream_async("Hello"):
+                    pass
+
+    async def test_lock_released_while_consumer_drains(self):
+        """Should release the GPU lock once synthesis is done, before the audio is consumed."""
+        segments = [np.zeros(4, dtype=np.float32)] * 2
+        with patch("belle.tts.synthesize_speech_chunks", return_value=(s for s in segments)):
+            async with aclosing(synthesize_speech_stream_async("Hello there")) as stream:
+                await anext(stream)
+                for _ in range(100):
+                    if not mlx_async_lock.locked():
+                        break
+                    await asyncio.sleep(0.01)
+                assert not mlx_async_lock.locked()
+                assert len([c async for c in stream]) == 1
+
+    async def test_early_close_stops_synthesis(self):
+        """Should stop synthesizing and release the GPU lock when the consumer stops early."""
+        produced = []
+        closed = threading.Event()
+
+        def chunks(text, voice=None):
+            try:
+                for i in range(10):
+                    time.sleep(0.01)
+                    produced.append(i)
+                    yield np.zeros(4, dtype=np.float32)
+            finally:
+                closed.set()
+
+        with patch("belle.tts.synthesize_speech_chunks", chunks):
+            async with aclosing(synthesize_speech_stream_async("Hello")) as stream:
+                await anext(stream)
+
+        assert closed.is_set()
+        assert len(produced) < 10
+        assert not mlx_async_lock.locked()
+
+
+class TestPreload:
+    """Tests for TTS model loading and warm-up."""
+
+    def test_concurrent_loads_share_one_pipeline(self):
+        """Should load the pipeline once when preload and a request race."""
+        loads = []
+
+        def slow_load():
+            loads.append(1)
+            time.sleep(0.05)
+            tts._pipeline = object()
+            return tts._pipeline
+
+        with (
+            patch.object(tts, "_pipeline", None),
+            patch.object(tts.settings, "tts_enabled", True),
+            patch.object(tts, "_load_pipeline", slow_load),
+        ):
+            results = []
+            threads = [
+                threading.Thread(target=lambda: results.append(tts._load_model()))
+                for _ in range(4)
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        assert len(loads) == 1
+        assert len(set(map(id, results))) == 1
+
+    def test_preload_warms_up_tts(self):
+        """Should synthesize once at preload, tolerating failures."""
+        pipeline = _fake_pipeline(np.zeros(240, dtype=np.float32))
+        with (
+            patch.object(tts.settings, "tts_enabled", True),
+            patch.object(tts, "_load_model", return_value=pipeline),
+            patch.object(tts, "synthesize_speech") as mock_synth,
+        ):
+            tts.preload_model()
+            mock_synth.assert_called_once()
+
+            mock_synth.side_effect = RuntimeError("no GPU")
+            tts._warm_up()
+
+    def test_preload_caches_phrases(self):
+        """Should synthesize configured phrases into the WAV cache at startup."""
+        audio = np.zeros(240, dtype=np.float32)
+        with (
+            patch.object(tts.settings, "tts_enabled", True),
+            patch.object(tts.settings, "tts_preload_phrases", ["Done!"]),
+            patch.object(tts, "_load_model", return_value=object()),
+            patch.object(tts, "_warm_up"),
+            patch.object(tts, "synthesize_speech", return_value=audio) as mock_synth,
+        ):
+            tts.preload_model()
+            synthesize_speech_to_wav("Done!")
+
+        mock_synth.assert_called_once()